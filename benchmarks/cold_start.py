@@ -0,0 +1,135 @@
+"""Measure cold-start and first-paint time of the app, per stage.
+
+Usage::
+
+    python benchmarks/cold_start.py                       # every stage, 3 runs
+    python benchmarks/cold_start.py --stages character_setup --repeat 10
+
+Each run starts a fresh Python process, so nothing is already imported or
+cached, and drives the script with Streamlit's ``AppTest``:
+
+* ``import`` is the time to import Streamlit itself;
+* ``first_paint`` is the first script run of the stage (module imports, case
+  generation and figure building included);
+* ``rerun`` is a second run in the same process, i.e. a warm interaction.
+
+The heavy modules loaded by the first run are listed too, so an import that
+sneaks back into the Character Setup path shows up here.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "data_adventure_rpg.py")
+
+STAGES = [
+    "character_setup",
+    "case_selection",
+    "data_lab",
+    "puzzle_room",
+    "report_station",
+]
+# Streamlit itself imports plotly.graph_objects, so it is not listed
+HEAVY_MODULES = [
+    "pandas",
+    "plotly.express",
+    "data_adventure.cases",
+]
+
+# Runs in the child process; prints one JSON line
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+before = set(sys.modules)
+
+at = AppTest.from_file({app!r}, default_timeout=600)
+if {state!r}:
+    from data_adventure.game import new_game_state
+    at.session_state["player"] = new_game_state(**{state!r})
+at.run()
+painted = time.perf_counter()
+loaded = sorted(
+    name for name in {heavy!r} if name in sys.modules and name not in before
+)
+at.run()
+rerun = time.perf_counter() - painted
+
+print(json.dumps({{
+    "import": imported - start,
+    "first_paint": painted - imported,
+    "rerun": rerun,
+    "loaded": loaded,
+    "errors": [str(e.value) for e in at.exception],
+}}))
+"""
+
+
+def stage_state(stage):
+    """Player fields that put the app straight into ``stage``."""
+    if stage == "character_setup":
+        return {}
+    return {"progress": stage, "name": "Benchmark", "case": "Missing Data"}
+
+
+def run_once(stage):
+    code = CHILD.format(app=APP, state=stage_state(stage), heavy=HEAVY_MODULES)
+    # In-memory stores, as in load_test.py, so no run writes .db files into ROOT
+    env = dict(os.environ)
+    env.setdefault("DATA_ADVENTURE_LEADERBOARD_URL", "memory://")
+    env.setdefault("DATA_ADVENTURE_LEDGER_URL", "memory://")
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(stages, repeat):
+    results = {}
+    for stage in stages:
+        runs = [run_once(stage) for _ in range(repeat)]
+        errors = runs[-1]["errors"]
+        results[stage] = {
+            phase: statistics.median(r[phase] for r in runs)
+            for phase in ("import", "first_paint", "rerun")
+        }
+        results[stage]["loaded"] = runs[-1]["loaded"]
+        print(
+            f"{stage:<16} import {results[stage]['import'] * 1000:>8.0f} ms"
+            f"   first paint {results[stage]['first_paint'] * 1000:>8.0f} ms"
+            f"   rerun {results[stage]['rerun'] * 1000:>7.0f} ms"
+            f"   loaded: {', '.join(results[stage]['loaded']) or '-'}",
+            flush=True,
+        )
+        if errors:
+            print(f"  script raised: {errors[0]}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.stages, args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
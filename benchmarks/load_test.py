@@ -0,0 +1,347 @@
+"""Load-test the whole game with simulated players, entirely offline.
+
+Usage::
+
+    python benchmarks/load_test.py --players 20          # one at a time
+    python benchmarks/load_test.py --players 200 --concurrency 8 \
+        --case-rows 1000000
+    python benchmarks/load_test.py --players 50 --max-p95-ms 800 \
+        --max-rss-per-player-mb 5
+
+Every simulated player is its own Streamlit ``AppTest`` session, driven
+through Character Setup, Case Selection, a few random Data Lab interactions
+(filters, chart types, bins), the Puzzle Room and the Report Station.
+
+``AppTest.run()`` swaps Streamlit's process-wide Runtime in and out, so two
+sessions cannot run in one process at the same time. Players therefore run
+in ``--concurrency`` worker processes, one AppTest at a time per worker.
+Players handled by the same worker share its case, filter and figure caches,
+like sessions on one server process.
+
+The report gives rerun latency percentiles (overall and per stage),
+throughput and resident memory growth per player, summed over the workers.
+With ``--max-p95-ms`` or ``--max-rss-per-player-mb`` the script exits with
+status 1 when a limit is exceeded, so it can gate a release. The leaderboard
+and the score ledger run in memory unless ``DATA_ADVENTURE_LEADERBOARD_URL``
+or ``DATA_ADVENTURE_LEDGER_URL`` is set.
+"""
+
+import argparse
+import json
+import os
+import multiprocessing
+import random
+import resource
+import statistics
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "data_adventure_rpg.py")
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("DATA_ADVENTURE_LEADERBOARD_URL", "memory://")
+os.environ.setdefault("DATA_ADVENTURE_LEDGER_URL", "memory://")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from data_adventure.game import CASES  # noqa: E402
+
+CHART_TYPES = [
+    "Line Chart",
+    "Bar Chart",
+    "Scatter Plot",
+    "Histogram",
+    "Box Plot",
+    "Heatmap",
+]
+PERCENTILES = (50, 90, 95, 99)
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Not Linux: fall back to the peak RSS (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    rank = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+class Player:
+    """One simulated detective; records the latency of every rerun."""
+
+    def __init__(self, number, rng, case_rows, interactions, timeout):
+        self.number = number
+        self.rng = rng
+        self.case_rows = case_rows
+        self.interactions = interactions
+        self.at = AppTest.from_file(APP, default_timeout=timeout)
+        self.timings = []  # (stage, seconds)
+        self.errors = []
+
+    def run(self, stage):
+        start = time.perf_counter()
+        self.at.run()
+        self.timings.append((stage, time.perf_counter() - start))
+        self.errors.extend(f"{stage}: {error.value}" for error in self.at.exception)
+
+    def button(self, label):
+        return next(b for b in self.at.button if b.label.startswith(label))
+
+    def widget(self, kind, label):
+        return next(w for w in getattr(self.at, kind) if w.label == label)
+
+    def play(self):
+        at = self.at
+
+        self.run("character_setup")
+        at.text_input[0].input(f"Detective {self.number}")
+        self.run("character_setup")
+        self.button("🚀 Begin Adventure").click()
+        self.run("case_selection")
+
+        case = self.rng.choice(list(CASES))
+        at.button(key=f"case_{case}").click()
+        self.run("data_lab")
+        if self.case_rows:
+            at.select_slider(key=f"case_rows_{case}").set_value(self.case_rows)
+            self.run("data_lab")
+
+        for _ in range(self.interactions):
+            self.interact()
+            self.run("data_lab")
+
+        self.button("🔍 I found a clue!").click()
+        self.run("puzzle_room")
+        # Puzzles are dealt per player, so read this player's answers
+        puzzles = at.session_state["player"].puzzles
+        at.text_input(key="text_puzzle").input(puzzles["text"].answer)
+        at.button(key="submit_text").click()
+        self.run("puzzle_room")
+        at.number_input(key="math_puzzle").set_value(float(puzzles["math"].answer))
+        at.button(key="submit_math").click()
+        self.run("puzzle_room")
+        self.button("Continue to Report").click()
+        self.run("report_station")
+        return self
+
+    def interact(self):
+        """Make one random Data Lab change: a filter, a chart type or a chart option."""
+        filters = [s for s in self.at.slider if s.label.startswith("Filter ")]
+        action = self.rng.choice(
+            ["filter", "chart", "option"] if filters else ["chart", "option"]
+        )
+        if action == "filter":
+            slider = self.rng.choice(filters)
+            low, high = slider.min, slider.max
+            span = high - low
+            low += self.rng.uniform(0, 0.3) * span
+            high -= self.rng.uniform(0, 0.3) * span
+            if isinstance(slider.min, int):
+                low, high = round(low), round(high)
+            slider.set_range(low, high)
+        elif action == "chart":
+            self.widget("selectbox", "Select Chart Type").select(
+                self.rng.choice(CHART_TYPES)
+            )
+        else:
+            self.widget("selectbox", "Select Chart Type").select("Histogram")
+            self.run("data_lab")
+            self.widget("slider", "Number of bins").set_value(self.rng.randint(5, 50))
+
+
+# RSS of this worker process once it is ready to play (set by _start_worker)
+_worker_rss = None
+
+
+def _start_worker():
+    global _worker_rss
+    _worker_rss = rss_bytes()
+
+
+def play_player(number, seed, case_rows, interactions, timeout):
+    """Play one player in this worker process; returns picklable results."""
+    # Streamlit runs the app as sys.modules["__main__"]; put this script back
+    # afterwards so the worker can still unpickle its next play_player task
+    main = sys.modules["__main__"]
+    player = Player(
+        number, random.Random(seed + number), case_rows, interactions, timeout
+    )
+    try:
+        player.play()
+    except Exception as exc:  # keep the other players going
+        player.errors.append(f"aborted: {exc!r}")
+    finally:
+        sys.modules["__main__"] = main
+    return {
+        "number": number,
+        "timings": player.timings,
+        "errors": player.errors,
+        "worker": os.getpid(),
+        "worker_rss_start": _worker_rss,
+        "worker_rss": rss_bytes(),
+    }
+
+
+def run_load_test(players, concurrency, case_rows, interactions, seed, timeout):
+    # spawn: each worker starts from a clean interpreter, not a fork of this one
+    context = multiprocessing.get_context("spawn")
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=concurrency, mp_context=context, initializer=_start_worker
+    ) as pool:
+        futures = [
+            pool.submit(play_player, number, seed, case_rows, interactions, timeout)
+            for number in range(players)
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+            print(f"\r{len(results)}/{players} players finished", end="", flush=True)
+    wall = time.perf_counter() - start
+    print()
+    results.sort(key=lambda result: result["number"])
+
+    # Each worker's memory from when it was ready to its last player
+    workers = {}
+    for result in results:
+        workers[result["worker"]] = (result["worker_rss_start"], result["worker_rss"])
+    rss_start = sum(first for first, _ in workers.values())
+    rss_end = sum(last for _, last in workers.values())
+
+    by_stage = defaultdict(list)
+    for result in results:
+        for stage, seconds in result["timings"]:
+            by_stage[stage].append(seconds)
+    latencies = [seconds for values in by_stage.values() for seconds in values]
+
+    def summary(values):
+        return {
+            "count": len(values),
+            **{
+                f"p{pct}_ms": round(percentile(values, pct) * 1000, 1)
+                for pct in PERCENTILES
+            },
+            "mean_ms": round(statistics.mean(values) * 1000, 1),
+        }
+
+    return {
+        "players": players,
+        "concurrency": concurrency,
+        "workers": len(workers),
+        "case_rows": case_rows,
+        "wall_seconds": round(wall, 2),
+        "reruns_per_second": round(len(latencies) / wall, 2),
+        "players_per_minute": round(players / wall * 60, 2),
+        "latency": summary(latencies),
+        "stages": {
+            stage: summary(values) for stage, values in sorted(by_stage.items())
+        },
+        "rss_start_mb": round(rss_start / 1024**2, 1),
+        "rss_end_mb": round(rss_end / 1024**2, 1),
+        "rss_per_player_mb": round((rss_end - rss_start) / players / 1024**2, 3),
+        "errors": [f"player {r['number']}: {e}" for r in results for e in r["errors"]],
+    }
+
+
+def print_report(report):
+    print(
+        f"{report['players']} players, {report['concurrency']} at a time "
+        f"in {report['workers']} worker process(es), {report['wall_seconds']} s"
+    )
+    print(
+        f"throughput: {report['reruns_per_second']} reruns/s, "
+        f"{report['players_per_minute']} players/min"
+    )
+    print(
+        f"RSS (all workers): {report['rss_start_mb']} MB -> {report['rss_end_mb']} MB "
+        f"({report['rss_per_player_mb']} MB per player)"
+    )
+    print()
+    header = "".join(f"{f'p{pct}':>10}" for pct in PERCENTILES)
+    print(f"{'stage':<18}{'reruns':>8}{header}   (ms)")
+    rows = list(report["stages"].items()) + [("all", report["latency"])]
+    for stage, stats in rows:
+        cells = "".join(f"{stats[f'p{pct}_ms']:>10.1f}" for pct in PERCENTILES)
+        print(f"{stage:<18}{stats['count']:>8}{cells}")
+    if report["errors"]:
+        print(f"\n{len(report['errors'])} error(s), first: {report['errors'][0]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="players at once, one worker process each (default: 1)",
+    )
+    parser.add_argument(
+        "--case-rows",
+        type=int,
+        help="case size to pick in the Data Lab (one of cases.CASE_SIZES)",
+    )
+    parser.add_argument(
+        "--interactions",
+        type=int,
+        default=5,
+        help="random Data Lab interactions per player",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120, help="seconds per rerun")
+    parser.add_argument(
+        "--max-p95-ms", type=float, help="fail above this p95 rerun latency"
+    )
+    parser.add_argument(
+        "--max-rss-per-player-mb",
+        type=float,
+        help="fail above this RSS growth per player",
+    )
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(
+        args.players,
+        args.concurrency,
+        args.case_rows,
+        args.interactions,
+        args.seed,
+        args.timeout,
+    )
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    if report["errors"]:
+        failures.append(f"{len(report['errors'])} player error(s)")
+    if args.max_p95_ms is not None and report["latency"]["p95_ms"] > args.max_p95_ms:
+        failures.append(f"p95 {report['latency']['p95_ms']} ms > {args.max_p95_ms} ms")
+    if (
+        args.max_rss_per_player_mb is not None
+        and report["rss_per_player_mb"] > args.max_rss_per_player_mb
+    ):
+        failures.append(
+            f"RSS {report['rss_per_player_mb']} MB/player "
+            f"> {args.max_rss_per_player_mb} MB"
+        )
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
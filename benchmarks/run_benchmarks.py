@@ -0,0 +1,195 @@
+"""Benchmark the Data Lab hot paths at several case sizes.
+
+Usage::
+
+    python benchmarks/run_benchmarks.py                      # run and compare
+    python benchmarks/run_benchmarks.py --save-baseline      # record baseline
+    python benchmarks/run_benchmarks.py --sizes 100 10000    # quick run
+
+Every benchmark calls the uncached engine functions directly, so the numbers
+measure real work rather than cache hits. Each result is the median of
+``--repeat`` samples (default 5), capped at :data:`LARGE_RUNS` (3) from
+:data:`LARGE_ROWS` rows up. As with ``timeit``, a sample loops a fast call
+until it lasts :data:`MIN_SAMPLE_SECONDS`, after a calibration call that
+doubles as a warm-up, with the garbage collector off. Results are compared with
+``benchmarks/baseline.json``; the script exits with status 1 if any
+benchmark got slower than ``--threshold`` times its baseline, and with
+status 2 before running anything if there is no baseline to compare with.
+Sizes missing from the baseline are run but not compared.
+
+This is a script rather than a pytest-benchmark suite so that the 1e7-row
+cases, which need gigabytes of memory and tens of minutes in total, stay out
+of the ``pytest`` run of ``tests/``, and so that the run counts per size are
+fixed here instead of being calibrated per benchmark.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_adventure import charts  # noqa: E402
+from data_adventure.cases import CASE_GENERATORS, generate_case  # noqa: E402
+from data_adventure.correlation import compute_correlation  # noqa: E402
+from data_adventure.filters import apply_filters, range_predicate  # noqa: E402
+from data_adventure.outliers import compute_outliers  # noqa: E402
+from data_adventure.profile import compute_profile  # noqa: E402
+
+DEFAULT_SIZES = [100, 10_000, 1_000_000, 10_000_000]
+# Runs per benchmark from LARGE_ROWS up: enough for a median, short enough to wait
+LARGE_ROWS = 1_000_000
+LARGE_RUNS = 3
+# Fast calls are looped so one sample lasts at least this long
+MIN_SAMPLE_SECONDS = 0.2
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+
+
+def _filters(df, profile):
+    # Narrow every numeric column to its middle 80%, like a player dragging sliders
+    predicates = []
+    for col in profile.numeric_columns:
+        low, high = profile.minimum[col], profile.maximum[col]
+        span = high - low
+        predicates.append(range_predicate(col, low + 0.1 * span, high - 0.1 * span))
+    return predicates
+
+
+def benchmarks_for(case, df):
+    """Return ``{name: callable}`` for one generated case frame."""
+    profile = compute_profile(df)
+    numeric = list(profile.numeric_columns)
+    predicates = _filters(df, profile)
+    x, y = numeric[0], numeric[-1]
+    return {
+        "generate": lambda: generate_case(case, rows=len(df)),
+        "filter": lambda: apply_filters(df, predicates),
+        "profile": lambda: compute_profile(df),
+        "outliers_iqr": lambda: compute_outliers(df, numeric),
+        "correlation": lambda: compute_correlation(df, numeric),
+        "figure_line": lambda: charts.line_figure(df, x, y),
+        "figure_scatter": lambda: charts.scatter_figure(df, x, y),
+        "figure_histogram": lambda: charts.histogram_figure(df, y, 20),
+        "figure_box": lambda: charts.box_figure(df, y),
+    }
+
+
+def _sample(func, loops):
+    """Seconds per call over ``loops`` back-to-back calls."""
+    start = time.perf_counter()
+    for _ in range(loops):
+        func()
+    return (time.perf_counter() - start) / loops
+
+
+def time_call(func, repeat):
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        first = _sample(func, 1)
+        loops = max(1, int(MIN_SAMPLE_SECONDS / first)) if first else 1000
+        timings = [_sample(func, loops) for _ in range(repeat)]
+    finally:
+        if enabled:
+            gc.enable()
+    return {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "runs": repeat,
+        "loops": loops,
+    }
+
+
+def run(sizes, cases, repeat, only=None):
+    results = {}
+    for rows in sizes:
+        runs = repeat if rows < LARGE_ROWS else min(repeat, LARGE_RUNS)
+        for case in cases:
+            df = generate_case(case, rows=rows)
+            for name, func in benchmarks_for(case, df).items():
+                if only and name not in only:
+                    continue
+                key = f"{case}|{name}|{rows}"
+                results[key] = time_call(func, runs)
+                print(
+                    f"{key:<45} {results[key]['median'] * 1000:>12.2f} ms", flush=True
+                )
+            del df
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the comparison with ``baseline``; return the regressed keys."""
+    regressions = []
+    for key, result in sorted(results.items()):
+        if key not in baseline:
+            continue
+        ratio = result["median"] / baseline[key]["median"]
+        flag = "REGRESSION" if ratio > threshold else ""
+        print(f"{key:<45} {ratio:>7.2f}x baseline {flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", default=list(CASE_GENERATORS))
+    parser.add_argument("--only", nargs="+", help="run only these benchmark names")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="fail when a median is this many times its baseline",
+    )
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    # Comparing with nothing would pass every run, so refuse up front
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        print(
+            f"No baseline at {args.baseline}; run with --save-baseline to record one.",
+            file=sys.stderr,
+        )
+        return 2
+
+    results = run(args.sizes, args.cases, args.repeat, args.only)
+    payload = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(payload, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(payload, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    print()
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than {args.threshold}x baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
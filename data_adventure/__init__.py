@@ -0,0 +1,5 @@
+"""Data Adventure RPG engine.
+
+Everything in this package is plain Python/pandas so it can be shared by all
+Streamlit sessions in one server process and used without a Streamlit runtime.
+"""
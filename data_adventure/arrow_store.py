@@ -0,0 +1,78 @@
+"""Arrow IPC files as shared, memory-mapped DataFrame storage.
+
+:func:`write_frame` stores a DataFrame as an uncompressed Arrow IPC (Feather
+v2) file and :func:`read_frame` memory-maps it back. Numeric and datetime
+columns without nulls become pandas columns that point straight into the
+map, so every session, and every server process on the host, reads the same
+pages from the OS page cache instead of holding its own copy. Such columns
+are read-only, which matches how shared case data must be treated anyway.
+
+pyarrow is optional: ``pip install "data-adventure-rpg[arrow]"``.
+"""
+
+import os
+import tempfile
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError(
+            "pyarrow is not installed; install it with: "
+            'pip install "data-adventure-rpg[arrow]"'
+        ) from exc
+    return pyarrow
+
+
+def frame_to_table(df):
+    """Convert ``df`` to an Arrow table, keeping float NaN as values, not nulls.
+
+    ``pa.Table.from_pandas`` turns NaN into nulls, and a column with nulls
+    has to be copied to become a pandas column again.
+    """
+    pa = require_pyarrow()
+    arrays = []
+    for col in df.columns:
+        series = df[col]
+        if series.dtype.kind in "iufbM":
+            arrays.append(pa.array(series.to_numpy(), from_pandas=False))
+        else:
+            # Categoricals become dictionary arrays, strings stay strings
+            arrays.append(pa.array(series, from_pandas=True))
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+
+
+def write_table(table, path):
+    """Write ``table`` to ``path`` atomically (readers never see a partial file)."""
+    pa = require_pyarrow()
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(
+            sink, table.schema
+        ) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_frame(df, path):
+    write_table(frame_to_table(df), path)
+
+
+def read_table(path):
+    pa = require_pyarrow()
+    # Buffers point into the memory map, so nothing is read until used
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def read_frame(path):
+    """Memory-map the IPC file at ``path`` as a pandas DataFrame."""
+    # split_blocks keeps each column in its own block, so pandas does not
+    # consolidate (copy) the zero-copy columns into one 2-D array
+    return read_table(path).to_pandas(split_blocks=True)
@@ -0,0 +1,92 @@
+"""Avatar uploads, decoded once and kept as small thumbnails.
+
+:func:`load_avatar` validates an uploaded image, decodes it a single time and
+re-encodes it as a :data:`THUMBNAIL_SIZE` thumbnail (JPEG, or PNG when the
+image has transparency). Only the thumbnail bytes are kept in session state,
+so a 12 MB phone photo costs a few KB per session and per rerun.
+
+Results are cached by the SHA-256 of the upload, so the uploader handing back
+the same file on every rerun, or two players uploading the same picture,
+decode it once and share one :class:`Avatar`.
+"""
+
+import hashlib
+import io
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from data_adventure.cache import LRUCache
+
+THUMBNAIL_SIZE = (256, 256)
+MAX_UPLOAD_BYTES = 10 * 1024**2
+# Decoding a bigger image is refused instead of risking a decompression bomb
+MAX_PIXELS = 50_000_000
+# MPO is a multi-picture JPEG, as many phone cameras write; its first
+# picture is the photo itself
+ALLOWED_FORMATS = {"PNG", "JPEG", "MPO"}
+JPEG_QUALITY = 85
+
+_avatar_cache = LRUCache(
+    max_entries=512, max_bytes=64 * 1024**2, sizeof=lambda avatar: len(avatar.data)
+)
+
+
+class AvatarError(ValueError):
+    """The upload is not an image we can use as an avatar."""
+
+
+@dataclass(frozen=True)
+class Avatar:
+    """A re-encoded avatar thumbnail, ready for ``st.image``."""
+
+    digest: str  # SHA-256 of the original upload
+    data: bytes
+    mime: str
+    width: int
+    height: int
+
+
+def upload_digest(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+
+def make_avatar(raw):
+    """Validate ``raw`` image bytes and return its thumbnail :class:`Avatar`."""
+    if len(raw) > MAX_UPLOAD_BYTES:
+        limit = MAX_UPLOAD_BYTES // 1024**2
+        raise AvatarError(f"Avatar images must be smaller than {limit} MB.")
+    try:
+        image = Image.open(io.BytesIO(raw))
+        if image.format not in ALLOWED_FORMATS:
+            raise AvatarError("Avatars must be PNG or JPEG images.")
+        if image.width * image.height > MAX_PIXELS:
+            raise AvatarError("This image is too large to use as an avatar.")
+        image.seek(0)
+        # JPEG can decode straight at a reduced scale, which is much cheaper
+        image.draft("RGB", THUMBNAIL_SIZE)
+        image = ImageOps.exif_transpose(image)
+        transparent = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        image = image.convert("RGBA" if transparent else "RGB")
+        image.thumbnail(THUMBNAIL_SIZE)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as exc:
+        # Pillow decodes lazily, so truncated files only fail here
+        raise AvatarError("The upload could not be read as an image.") from exc
+
+    out = io.BytesIO()
+    if transparent:
+        image.save(out, format="PNG", optimize=True)
+        mime = "image/png"
+    else:
+        image.save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        mime = "image/jpeg"
+    return Avatar(upload_digest(raw), out.getvalue(), mime, image.width, image.height)
+
+
+def load_avatar(raw):
+    """Return the cached :class:`Avatar` for ``raw``, building it on first use."""
+    return _avatar_cache.get_or_create(upload_digest(raw), lambda: make_avatar(raw))
+
+
+def clear_avatar_cache():
+    _avatar_cache.clear()
@@ -0,0 +1,116 @@
+"""Background batched writes for the leaderboard and the scoring ledger.
+
+A :class:`BatchWriter` queues items in memory and hands them to a ``write``
+callback in batches from a daemon thread, every ``flush_interval`` seconds
+or as soon as ``batch_size`` items are waiting, so a page rerun never waits
+on storage. A batch that fails with one of :data:`STORAGE_ERRORS` goes back
+to the front of the queue and is retried; the queue is flushed one last time
+at interpreter exit.
+
+Items are queued under a key: queuing a key that is still waiting replaces
+its item in place (a detective's latest leaderboard entry), and unique keys
+keep every item in order (ledger events).
+
+:func:`open_url` and :func:`file_location` parse the ``scheme://location``
+URLs both stores are configured with.
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+
+# Errors a failed write is retried on; anything else is a bug and propagates
+STORAGE_ERRORS = (OSError, sqlite3.Error)
+
+
+class BatchWriter:
+    """Writes queued items with ``write(items)`` from a background thread.
+
+    ``on_close`` is called after the final flush, e.g. to close a connection.
+    """
+
+    def __init__(self, write, name, flush_interval=0.5, batch_size=500, on_close=None):
+        self.write = write
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.on_close = on_close
+
+        self._lock = threading.Lock()  # the queue
+        self._write_lock = threading.Lock()  # one batch written at a time
+        self._pending = {}
+        self._wake = threading.Event()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._write_loop, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def put(self, key, item):
+        with self._lock:
+            self._pending[key] = item
+            pending = len(self._pending)
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def pending(self):
+        """The items still waiting to be written, oldest first."""
+        with self._lock:
+            return list(self._pending.values())
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        try:
+            with self._write_lock:
+                self.write(list(batch.values()))
+        except STORAGE_ERRORS:
+            # Back in front of newer items, unless a newer one replaced it
+            with self._lock:
+                newer, self._pending = self._pending, batch
+                self._pending.update(newer)
+            raise
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        if self.on_close is not None:
+            with self._write_lock:
+                self.on_close()
+
+    def _write_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except STORAGE_ERRORS:
+                # Keep the writer alive; the requeued batch is retried
+                time.sleep(self.flush_interval)
+
+
+def file_location(location, default):
+    # scheme:///relative.db and scheme:////absolute/path.db, as in SQLAlchemy
+    path = location[1:] if location.startswith("/") else location
+    return path or default
+
+
+def open_url(url, factories, what):
+    """Call the ``factories`` entry for ``url``'s scheme with its location.
+
+    ``what`` names the store in the error for an unsupported URL.
+    """
+    scheme, sep, location = url.partition("://")
+    if not sep or scheme not in factories:
+        raise ValueError(f"Unsupported {what} URL: {url!r}")
+    return factories[scheme](location)
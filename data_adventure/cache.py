@@ -0,0 +1,100 @@
+"""Small process-wide LRU cache shared by the Data Lab engines."""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and (optionally) bytes.
+
+    Streamlit serves every session from its own thread, so all access goes
+    through a lock. ``sizeof`` is called once per stored value to estimate its
+    footprint; the least recently used entries are evicted until both limits
+    hold again. ``hits`` and ``misses`` count lookups for monitoring.
+    """
+
+    def __init__(self, max_entries=8, max_bytes=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._building = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key][0]
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            self._evict()
+        return value
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for ``key``, building it with ``factory``."""
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key][0]
+            self.misses += 1
+            build_lock = self._building.setdefault(key, threading.Lock())
+        # Concurrent sessions asking for the same key wait for one build
+        # instead of generating their own copy; other keys stay available.
+        with build_lock:
+            with self._lock:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    return self._data[key][0]
+            try:
+                return self.put(key, factory())
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        # Always keep the newest entry, even if it alone exceeds max_bytes.
+        while len(self._data) > 1 and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, size) = self._data.popitem(last=False)
+            self._bytes -= size
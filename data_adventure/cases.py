@@ -0,0 +1,241 @@
+"""Case datasets for the Data Lab.
+
+Each case is produced by a generator registered with :func:`register_case`.
+Generators take their own ``np.random.Generator`` so building a case never
+touches NumPy's global random state, and :func:`load_case` memoizes the result
+per ``(case, seed, rows)`` in a process-wide cache shared by every session.
+
+Generators fill preallocated column arrays in blocks of :data:`CHUNK_ROWS`
+using compact dtypes (float32, int8, categoricals), so a 10M-row case needs
+roughly the memory of its final columns instead of several float64 copies.
+
+With ``DATA_ADVENTURE_CASE_STORE=arrow`` (needs pyarrow) each case is written
+once to an Arrow IPC file under :data:`CASE_DIR` and memory-mapped (see
+:mod:`data_adventure.arrow_store`), so all server processes on a host share
+one copy through the page cache and cases survive restarts.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_adventure.cache import LRUCache
+
+DEFAULT_SEED = 42
+CHUNK_ROWS = 1_000_000
+MAX_ROWS = 50_000_000
+
+# Row counts offered in the Data Lab on top of each case's default size
+CASE_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+# Registered generators: case name -> (generator, default row count)
+CASE_GENERATORS = {}
+
+# "memory" keeps generated frames on the heap, "arrow" in memory-mapped files
+CASE_STORE = os.environ.get("DATA_ADVENTURE_CASE_STORE", "memory")
+CASE_DIR = os.environ.get(
+    "DATA_ADVENTURE_CASE_DIR", os.path.join(".data_adventure", "cases")
+)
+
+
+def memory_footprint(df):
+    """Return the in-memory size of ``df`` in bytes."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def format_bytes(n_bytes):
+    """Format a byte count for display, e.g. ``'12.3 MB'``."""
+    size = float(n_bytes)
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+# One shared copy per (case, seed, rows); bounded so large cases get evicted.
+_case_cache = LRUCache(max_entries=8, max_bytes=2 * 1024**3, sizeof=memory_footprint)
+
+
+def register_case(name, default_rows):
+    """Register ``func(rng, rows)`` as the generator for case ``name``."""
+
+    def decorator(func):
+        CASE_GENERATORS[name] = (func, default_rows)
+        return func
+
+    return decorator
+
+
+def default_rows(case):
+    return CASE_GENERATORS[case][1]
+
+
+def case_sizes(case):
+    """Return the row counts a player can pick for ``case``, smallest first."""
+    return sorted({default_rows(case), *CASE_SIZES})
+
+
+def case_key(case, seed=DEFAULT_SEED, rows=None):
+    """Return the normalized cache key for a case request."""
+    if case not in CASE_GENERATORS:
+        raise KeyError(f"Unknown case: {case!r}")
+    if rows is None:
+        rows = CASE_GENERATORS[case][1]
+    rows = int(rows)
+    if not 1 <= rows <= MAX_ROWS:
+        raise ValueError(f"rows must be between 1 and {MAX_ROWS:,}, got {rows:,}")
+    return (case, int(seed), rows)
+
+
+def generate_case(case, seed=DEFAULT_SEED, rows=None):
+    """Build a fresh DataFrame for ``case`` without using the cache."""
+    case, seed, rows = case_key(case, seed, rows)
+    generator, _ = CASE_GENERATORS[case]
+    return generator(np.random.default_rng(seed), rows)
+
+
+def load_case(case, seed=DEFAULT_SEED, rows=None):
+    """Return the shared DataFrame for ``case``.
+
+    The frame is shared by every session, so callers must treat it as
+    read-only and derive new frames (filtering, ``assign``...) instead of
+    mutating it in place.
+    """
+    key = case_key(case, seed, rows)
+    if CASE_STORE == "arrow":
+        return _case_cache.get_or_create(key, lambda: _load_arrow_case(*key))
+    return _case_cache.get_or_create(key, lambda: generate_case(*key))
+
+
+def case_path(case, seed, rows):
+    slug = case.lower().replace(" ", "_")
+    return os.path.join(CASE_DIR, f"{slug}-{seed}-{rows}.arrow")
+
+
+def _load_arrow_case(case, seed, rows):
+    from data_adventure.arrow_store import read_frame, write_frame
+
+    path = case_path(case, seed, rows)
+    if not os.path.exists(path):
+        # Generated once per host; the heap copy is dropped after writing
+        write_frame(generate_case(case, seed, rows), path)
+    return read_frame(path)
+
+
+def clear_case_cache():
+    _case_cache.clear()
+
+
+def _chunks(rows):
+    for start in range(0, rows, CHUNK_ROWS):
+        yield start, min(start + CHUNK_ROWS, rows)
+
+
+def _timeline(start, rows):
+    """Return ``rows`` timestamps from ``start`` and the samples per year.
+
+    Daily data stops fitting in pandas' timestamp range after a few hundred
+    thousand rows, so bigger cases switch to hourly or minute-level data.
+    """
+    for freq, per_year in [("D", 365), ("h", 365 * 24), ("min", 365 * 24 * 60)]:
+        if rows <= 100 * per_year:
+            break
+    return pd.date_range(start, periods=rows, freq=freq), per_year
+
+
+def _categorical(rng, categories, rows):
+    codes = np.empty(rows, dtype=np.int8)
+    for start, stop in _chunks(rows):
+        n = stop - start
+        codes[start:stop] = rng.integers(0, len(categories), n, dtype=np.int8)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+@register_case("Missing Data", default_rows=100)
+def missing_data_case(rng, rows):
+    # Daily sales with gaps in Sales and Customers
+    sales = np.empty(rows, dtype=np.float32)
+    customers = np.empty(rows, dtype=np.float32)
+    for start, stop in _chunks(rows):
+        n = stop - start
+        chunk = rng.standard_normal(n, dtype=np.float32)
+        chunk *= 200
+        chunk += 1000
+        sales[start:stop] = chunk
+        customers[start:stop] = rng.poisson(50, n)
+
+        # ~15% of rows lose Sales, a third of those also lose Customers
+        missing = rng.random(n, dtype=np.float32) < 0.15
+        sales[start:stop][missing] = np.nan
+        missing &= rng.random(n, dtype=np.float32) < 1 / 3
+        customers[start:stop][missing] = np.nan
+
+    dates, _ = _timeline("2024-01-01", rows)
+    return pd.DataFrame(
+        {
+            "Date": dates,
+            "Sales": sales,
+            "Customers": customers,
+            "Product_ID": _categorical(rng, ["A", "B", "C"], rows),
+        }
+    )
+
+
+@register_case("Outlier Detective", default_rows=100)
+def outlier_case(rng, rows):
+    # Transactions where the last 5% are suspiciously large
+    first_outlier = rows - max(1, rows // 20)
+    amount = np.empty(rows, dtype=np.float32)
+    hour = np.empty(rows, dtype=np.int8)
+    for start, stop in _chunks(rows):
+        n = stop - start
+        chunk = rng.standard_normal(n, dtype=np.float32)
+        chunk *= 20
+        chunk += 100
+        tail = max(0, stop - max(start, first_outlier))
+        if tail:
+            chunk[n - tail :] = rng.uniform(200, 300, tail)
+        amount[start:stop] = chunk
+        hour[start:stop] = rng.integers(0, 24, n, dtype=np.int8)
+
+    id_dtype = np.int32 if rows < np.iinfo(np.int32).max else np.int64
+    return pd.DataFrame(
+        {
+            "Transaction_ID": np.arange(1, rows + 1, dtype=id_dtype),
+            "Amount": amount,
+            "Category": _categorical(
+                rng, ["Electronics", "Clothing", "Food", "Books"], rows
+            ),
+            "Customer_Type": _categorical(rng, ["Regular", "VIP", "New"], rows),
+            "Hour": hour,
+        }
+    )
+
+
+@register_case("Trend Analyzer", default_rows=365)
+def trend_case(rng, rows):
+    # Yearly seasonality on top of a linear trend
+    dates, per_year = _timeline("2023-01-01", rows)
+    sales = np.empty(rows, dtype=np.float32)
+    temperature = np.empty(rows, dtype=np.float32)
+    marketing = np.empty(rows, dtype=np.float32)
+    step = 50 / (rows - 1) if rows > 1 else 0.0
+    for start, stop in _chunks(rows):
+        n = stop - start
+        t = np.arange(start, stop, dtype=np.float64)
+        trend = 100 + step * t
+        seasonal = 10 * np.sin(2 * np.pi * t / per_year)
+        sales[start:stop] = trend + seasonal + rng.normal(0, 5, n)
+        temperature[start:stop] = rng.normal(20, 10, n)
+        marketing[start:stop] = rng.uniform(100, 500, n)
+
+    return pd.DataFrame(
+        {
+            "Date": dates,
+            "Sales": sales,
+            "Temperature": temperature,
+            "Marketing_Spend": marketing,
+            "Day_of_Week": dates.dayofweek.to_numpy().astype(np.int8),
+        }
+    )
@@ -0,0 +1,356 @@
+"""Plotly figures for the Visualizations tab with bounded payloads.
+
+Every builder reduces the data on the server before it reaches Plotly, so
+the JSON sent to the browser stays roughly the same size whatever the case
+size:
+
+* line charts are decimated with LTTB or min/max buckets;
+* scatter plots switch to WebGL, then to a pre-binned density heatmap;
+* histograms are binned with ``np.histogram``;
+* box plots are drawn from precomputed quartiles and fences;
+* bar charts are aggregated per category;
+* trend charts plot resampled series with a rolling mean and forecast.
+
+Each builder returns ``(figure, note)`` where ``note`` describes any
+reduction that was applied (``None`` when the raw data was plotted).
+
+Built figures are kept in a process-wide cache keyed by their chart spec
+(see :func:`cached_figure`), so reruns with unchanged inputs skip Plotly.
+Plotly itself is imported by the builders on first use, which keeps it (and
+``plotly.express``, the heavier of the two) out of the app's cold start.
+"""
+
+import numpy as np
+
+from data_adventure.cache import LRUCache
+from data_adventure.instrumentation import timed
+
+LINE_METHODS = ["lttb", "minmax"]
+MAX_LINE_POINTS = 2_000
+SVG_MAX_POINTS = 5_000
+WEBGL_MAX_POINTS = 100_000
+DENSITY_BINS = 200
+
+
+def figure_nbytes(entry):
+    """Rough size of a cached ``(figure, note)`` entry from its trace data."""
+    total = 0
+    for trace in entry[0].data:
+        for value in trace.to_plotly_json().values():
+            if isinstance(value, np.ndarray):
+                total += value.nbytes
+            elif isinstance(value, (list, tuple)):
+                total += 8 * len(value)
+    return total + 4096  # layout and trace overhead
+
+
+_figure_cache = LRUCache(max_entries=128, max_bytes=128 * 1024**2, sizeof=figure_nbytes)
+
+
+def cached_figure(spec, build):
+    """Return the ``(figure, note)`` cached for ``spec``, building it if needed.
+
+    ``spec`` is a hashable description of everything the figure depends on:
+    chart type, columns and options, plus the dataset/filter fingerprint (see
+    :func:`data_adventure.filters.view_key`) for figures built from case
+    data. ``build`` returns ``(figure, note)``. Cached figures are shared
+    between sessions and must not be modified.
+    """
+
+    def timed_build():
+        with timed("plotly_build"):
+            return build()
+
+    return _figure_cache.get_or_create(spec, timed_build)
+
+
+def figure_cache_stats():
+    return _figure_cache.stats()
+
+
+def clear_figure_cache():
+    _figure_cache.clear()
+
+
+def _finite_xy(df, x, y):
+    xs = df[x].to_numpy(dtype=np.float64, na_value=np.nan)
+    ys = df[y].to_numpy(dtype=np.float64, na_value=np.nan)
+    keep = np.isfinite(xs) & np.isfinite(ys)
+    return xs[keep], ys[keep]
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    ``x`` must be sorted. The first and last points are always kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+        # Keep the point forming the largest triangle with the previous
+        # kept point and the average of the next bucket.
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def minmax_indices(y, n_buckets):
+    """Indices of the minimum and maximum of ``y`` in each of ``n_buckets``."""
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    full = n // size * size
+    blocks = y[:full].reshape(-1, size)
+    offsets = np.arange(len(blocks)) * size
+    picked = [blocks.argmin(axis=1) + offsets, blocks.argmax(axis=1) + offsets]
+    if full < n:
+        picked.append([full + y[full:].argmin(), full + y[full:].argmax()])
+    return np.unique(np.concatenate(picked))
+
+
+def line_figure(df, x, y, method="lttb", max_points=MAX_LINE_POINTS):
+    import plotly.express as px
+
+    title = f"{y} vs {x}"
+    if len(df) <= max_points:
+        return px.line(df, x=x, y=y, title=title), None
+
+    xs, ys = _finite_xy(df, x, y)
+    order = np.argsort(xs, kind="stable")
+    xs, ys = xs[order], ys[order]
+    if method == "lttb":
+        keep = lttb_indices(xs, ys, max_points)
+    elif method == "minmax":
+        keep = minmax_indices(ys, max_points // 2)
+    else:
+        raise ValueError(f"Unknown line decimation method: {method!r}")
+
+    fig = px.line(x=xs[keep], y=ys[keep], title=title, labels={"x": x, "y": y})
+    note = (
+        f"Showing {len(keep):,} of {len(df):,} points "
+        f"({method.upper()} decimation, sorted by {x})."
+    )
+    return fig, note
+
+
+def scatter_figure(df, x, y, color=None):
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    title = f"{y} vs {x}"
+    if len(df) <= SVG_MAX_POINTS:
+        return px.scatter(df, x=x, y=y, color=color, title=title), None
+    if len(df) <= WEBGL_MAX_POINTS:
+        fig = px.scatter(df, x=x, y=y, color=color, title=title, render_mode="webgl")
+        return fig, "Rendered with WebGL."
+
+    xs, ys = _finite_xy(df, x, y)
+    counts, x_edges, y_edges = np.histogram2d(xs, ys, bins=DENSITY_BINS)
+    fig = go.Figure(
+        go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=np.where(counts > 0, counts, np.nan).T,
+            colorscale="Viridis",
+            colorbar={"title": "Rows"},
+        )
+    )
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y)
+    note = f"{len(df):,} points binned into a {DENSITY_BINS}x{DENSITY_BINS} grid"
+    if color is not None:
+        note += f"; coloring by {color} is not available at this size"
+    return fig, note + "."
+
+
+def histogram_figure(df, column, bins):
+    import plotly.graph_objects as go
+
+    values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    fig = go.Figure(
+        go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            name=column,
+        )
+    )
+    fig.update_layout(
+        title=f"Distribution of {column}",
+        xaxis_title=column,
+        yaxis_title="count",
+        bargap=0,
+    )
+    return fig, None
+
+
+def box_stats(values):
+    """Quartiles, whisker fences and mean of ``values`` (NaNs ignored)."""
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    spread = 1.5 * (q3 - q1)
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "lowerfence": values[values >= q1 - spread].min(),
+        "upperfence": values[values <= q3 + spread].max(),
+        "mean": values.mean(),
+    }
+
+
+def box_figure(df, y, x=None):
+    import plotly.graph_objects as go
+
+    if x is None:
+        groups = [(y, df[y])]
+        title = f"Box Plot of {y}"
+    else:
+        groups = [(str(name), group) for name, group in df.groupby(x, observed=True)[y]]
+        title = f"Box Plot of {y} by {x}"
+
+    fig = go.Figure()
+    for name, series in groups:
+        stats = box_stats(series.to_numpy(dtype=np.float64, na_value=np.nan))
+        if stats is None:
+            continue
+        fig.add_trace(
+            go.Box(
+                name=name,
+                x=[name],
+                boxpoints=False,
+                **{key: [value] for key, value in stats.items()},
+            )
+        )
+    fig.update_layout(title=title, yaxis_title=y, xaxis_title=x, showlegend=False)
+    return fig, None
+
+
+def bar_figure(df, x, y):
+    import plotly.express as px
+
+    # Summing per category gives the same bar heights as stacking every row
+    totals = df.groupby(x, observed=True)[y].sum().reset_index()
+    fig = px.bar(totals, x=x, y=y, title=f"{y} by {x}")
+    note = None if len(df) == len(totals) else f"{y} summed per {x}."
+    return fig, note
+
+
+def trend_figure(series, report, window, forecast=None, max_points=MAX_LINE_POINTS):
+    """Observed series, its rolling mean, the fitted trend and a forecast.
+
+    ``series`` is usually already resampled; longer ones are thinned with
+    min/max buckets after the rolling mean is computed on every point.
+    """
+    import plotly.graph_objects as go
+
+    from data_adventure.timeseries import rolling_mean
+
+    times = series.index.to_numpy()
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    smooth = rolling_mean(values, window, min_periods=1)
+    note = None
+    if len(values) > max_points:
+        finite = np.flatnonzero(np.isfinite(values))
+        keep = finite[minmax_indices(values[finite], max_points // 2)]
+        times, values, smooth = times[keep], values[keep], smooth[keep]
+        note = f"Showing {len(keep):,} of {len(series):,} points (min/max decimation)."
+
+    ends = np.array([report.start, report.end], dtype="datetime64[ns]")
+    days = (ends - ends[0]) / np.timedelta64(1, "D")
+    fig = go.Figure(
+        [
+            go.Scatter(
+                x=times, y=values, name=report.column, mode="lines", opacity=0.5
+            ),
+            go.Scatter(
+                x=times, y=smooth, name=f"{window}-point rolling mean", mode="lines"
+            ),
+            go.Scatter(
+                x=ends,
+                y=report.fit.predict(days),
+                name="Linear trend",
+                mode="lines",
+                line={"dash": "dot"},
+            ),
+        ]
+    )
+    if forecast is not None and len(forecast):
+        fig.add_trace(
+            go.Scatter(
+                x=forecast.index,
+                y=forecast.to_numpy(),
+                name="Forecast",
+                mode="lines",
+                line={"dash": "dash"},
+            )
+        )
+    fig.update_layout(
+        title=f"{report.column} over time",
+        xaxis_title="Time",
+        yaxis_title=report.column,
+    )
+    return fig, note
+
+
+def skills_figure(skills):
+    """Bar chart of ``(skill, level)`` pairs from Character Setup."""
+    import plotly.graph_objects as go
+
+    names, levels = zip(*skills) if skills else ((), ())
+    # Plain graph_objects so Character Setup does not pay for plotly.express
+    fig = go.Figure(go.Bar(x=list(names), y=list(levels)))
+    fig.update_layout(
+        title="Your Skills Profile", xaxis_title="Skill", yaxis_title="Level"
+    )
+    return fig, None
+
+
+def missing_figure(missing_percentage):
+    import plotly.express as px
+
+    fig = px.bar(
+        x=list(missing_percentage.index),
+        y=missing_percentage.to_numpy(),
+        title="Missing Data Percentage by Column",
+        labels={"x": "Column", "y": "Missing_Percentage"},
+    )
+    return fig, None
+
+
+def correlation_figure(matrix, title):
+    import plotly.express as px
+
+    return px.imshow(matrix, title=title, color_continuous_scale="RdBu"), None
+
+
+def leaderboard_figure(entries):
+    """Bar chart of ``(name, score)`` pairs, highest score first."""
+    import plotly.express as px
+
+    names, scores = zip(*entries) if entries else ((), ())
+    fig = px.bar(
+        x=list(names),
+        y=list(scores),
+        title="Top 10 Detectives by Score",
+        labels={"x": "Name", "y": "Score"},
+    )
+    return fig, None
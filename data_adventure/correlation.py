@@ -0,0 +1,160 @@
+"""Correlation matrices for the Analysis Tools and Heatmap views.
+
+Matrices are cached per ``(dataset key, filter predicates, mode)``. Besides
+pandas' exact ``corr()`` there are two modes for large frames:
+
+* ``"streaming"`` walks the data in chunks with :class:`PearsonAccumulator`,
+  so no full float64 copy of the numeric columns is ever made;
+* ``"sampled"`` correlates a random sample and reports a 95% error bound.
+
+A filtered view is read through its row positions, chunk by chunk in
+streaming mode.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data_adventure.cache import LRUCache
+from data_adventure.cases import CHUNK_ROWS
+from data_adventure.filters import normalize_predicates, take_rows
+
+CORRELATION_MODES = ["auto", "exact", "streaming", "sampled"]
+
+# "auto" switches from exact to streaming above this many rows
+EXACT_MAX_ROWS = 1_000_000
+SAMPLE_SIZE = 100_000
+
+_correlation_cache = LRUCache(max_entries=32)
+
+
+@dataclass(frozen=True)
+class CorrelationResult:
+    matrix: pd.DataFrame
+    mode: str
+    rows_used: int
+    # For sampled results: 95% half-width of the error on any coefficient
+    error_bound: float = None
+
+
+class PearsonAccumulator:
+    """Pairwise-complete Pearson correlation built up chunk by chunk.
+
+    Keeps the pair counts, sums, sums of squares and cross-products for every
+    column pair, which matches ``DataFrame.corr()``'s handling of missing
+    values. Values are shifted by the first chunk's means to keep the sums
+    numerically stable.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self._shift = None
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+
+    def update(self, chunk):
+        # copy=True: a single float64 column may otherwise be a read-only view
+        # of shared (e.g. memory-mapped) case data, and it is modified below
+        values = chunk[self.columns].to_numpy(
+            dtype=np.float64, na_value=np.nan, copy=True
+        )
+        if self._shift is None:
+            with np.errstate(all="ignore"):
+                self._shift = np.nan_to_num(np.nanmean(values, axis=0))
+        values -= self._shift
+        present = ~np.isnan(values)
+        values[~present] = 0.0
+        present = present.astype(np.float64)
+
+        # Entry [i, j] only counts rows where both column i and j are present
+        self.n += present.T @ present
+        self.sx += values.T @ present
+        self.sxx += (values * values).T @ present
+        self.sxy += values.T @ values
+        return self
+
+    def correlation(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n = self.n
+            sy, syy = self.sx.T, self.sxx.T
+            cov = self.sxy - self.sx * sy / n
+            var_x = self.sxx - self.sx**2 / n
+            var_y = syy - sy**2 / n
+            r = cov / np.sqrt(var_x * var_y)
+        r[n < 2] = np.nan
+        r = np.clip(r, -1.0, 1.0)
+        return pd.DataFrame(r, index=self.columns, columns=self.columns)
+
+
+def streaming_correlation(df, columns, chunk_rows=CHUNK_ROWS, positions=None):
+    accumulator = PearsonAccumulator(columns)
+    if positions is None:
+        for start in range(0, len(df), chunk_rows):
+            accumulator.update(df.iloc[start : start + chunk_rows])
+    else:
+        for start in range(0, len(positions), chunk_rows):
+            chunk = positions[start : start + chunk_rows]
+            accumulator.update(take_rows(df, chunk, columns))
+    return accumulator.correlation()
+
+
+def sampled_error_bound(sample_rows):
+    """95% half-width of a Pearson coefficient estimated from ``sample_rows``.
+
+    Uses the Fisher z-transform at r = 0, where the interval is widest.
+    """
+    if sample_rows <= 3:
+        return 1.0
+    return float(np.tanh(1.96 / np.sqrt(sample_rows - 3)))
+
+
+def compute_correlation(
+    df, columns, mode="auto", sample_size=SAMPLE_SIZE, positions=None
+):
+    if mode not in CORRELATION_MODES:
+        raise ValueError(f"Unknown correlation mode: {mode!r}")
+    columns = list(columns)
+    rows = len(df) if positions is None else len(positions)
+    if mode == "auto":
+        mode = "exact" if rows <= EXACT_MAX_ROWS else "streaming"
+    if mode == "sampled" and rows <= sample_size:
+        mode = "exact"
+
+    if mode == "exact":
+        return CorrelationResult(take_rows(df, positions, columns).corr(), mode, rows)
+    if mode == "streaming":
+        matrix = streaming_correlation(df, columns, positions=positions)
+        return CorrelationResult(matrix, mode, rows)
+    # The rows DataFrame.sample(n=sample_size, random_state=0) would pick
+    picks = np.random.RandomState(0).choice(rows, size=sample_size, replace=False)
+    if positions is not None:
+        picks = positions[picks]
+    sample = take_rows(df, picks, columns)
+    return CorrelationResult(
+        sample.corr(), mode, sample_size, sampled_error_bound(sample_size)
+    )
+
+
+def correlation_matrix(
+    df, columns, mode="auto", dataset_key=None, predicates=(), positions=None
+):
+    """Return the (cached) :class:`CorrelationResult` for ``columns`` of ``df``.
+
+    With ``positions`` only those rows of ``df`` are correlated.
+    """
+
+    def build():
+        return compute_correlation(df, columns, mode, positions=positions)
+
+    if dataset_key is None:
+        return build()
+    key = (dataset_key, normalize_predicates(predicates), tuple(columns), mode)
+    return _correlation_cache.get_or_create(key, build)
+
+
+def clear_correlation_cache():
+    _correlation_cache.clear()
@@ -0,0 +1,115 @@
+"""Single-pass filter engine for the Data Explorer.
+
+Filters are collected as hashable predicates and combined into one boolean
+mask, so the frame is indexed once no matter how many filters are active.
+
+The result of a filter is cached as the row positions it selects (4 bytes a
+row at most, whatever the number of columns) per ``(dataset key,
+predicates)``, and shared by every session. The filtered frame is never
+kept: the engines take the full frame plus those positions and gather only
+the columns they need with :func:`take_rows`, when their own cache misses.
+"""
+
+import numpy as np
+
+from data_adventure.cache import LRUCache
+
+_selection_cache = LRUCache(
+    max_entries=256, max_bytes=512 * 1024**2, sizeof=lambda positions: positions.nbytes
+)
+
+
+def range_predicate(column, low, high):
+    """Keep rows where ``low <= column <= high``."""
+    return ("range", column, float(low), float(high))
+
+
+def isin_predicate(column, values):
+    """Keep rows whose ``column`` value is one of ``values``."""
+    return ("isin", column, tuple(sorted(values, key=str)))
+
+
+def normalize_predicates(predicates):
+    """Return ``predicates`` as a canonical, hashable tuple.
+
+    Predicates are ANDed together, so their order does not matter and sorting
+    them lets equivalent widget states share a cache entry.
+    """
+    return tuple(sorted(predicates, key=repr))
+
+
+def view_key(dataset_key, predicates=()):
+    """Identify the filtered view of a dataset, e.g. as part of a cache key."""
+    return (dataset_key, normalize_predicates(predicates))
+
+
+def build_mask(df, predicates):
+    """Combine all ``predicates`` into one boolean NumPy mask over ``df``."""
+    mask = np.ones(len(df), dtype=bool)
+    for predicate in predicates:
+        kind, column = predicate[0], predicate[1]
+        if kind == "range":
+            values = df[column].to_numpy()
+            mask &= values >= predicate[2]
+            mask &= values <= predicate[3]
+        elif kind == "isin":
+            mask &= df[column].isin(predicate[2]).to_numpy()
+        else:
+            raise ValueError(f"Unknown filter predicate: {kind!r}")
+    return mask
+
+
+def _positions(mask):
+    positions = np.flatnonzero(mask)
+    if len(mask) < np.iinfo(np.int32).max:
+        positions = positions.astype(np.int32)
+    return positions
+
+
+def select_rows(df, predicates, dataset_key=None):
+    """Return the positions of the rows of ``df`` matching every predicate.
+
+    When ``dataset_key`` identifies ``df`` (e.g. a case key) the positions
+    are cached and shared with other sessions using the same filters.
+    """
+    predicates = normalize_predicates(predicates)
+    if dataset_key is None:
+        return _positions(build_mask(df, predicates))
+    return _selection_cache.get_or_create(
+        (dataset_key, predicates), lambda: _positions(build_mask(df, predicates))
+    )
+
+
+def take_rows(df, positions=None, columns=None):
+    """Return ``columns`` (all by default) of ``df`` at row ``positions``.
+
+    ``positions=None`` stands for every row. Only the requested columns are
+    gathered, so the result is a short-lived copy for one computation.
+    """
+    if columns is not None:
+        columns = list(dict.fromkeys(columns))
+    if positions is None:
+        return df if columns is None else df[columns]
+    if columns is None:
+        return df.take(positions)
+    return df.iloc[positions, df.columns.get_indexer(columns)]
+
+
+def apply_filters(df, predicates, dataset_key=None):
+    """Return the rows of ``df`` matching every predicate, as a new frame.
+
+    With no predicates the original frame is returned as-is. ``dataset_key``
+    reuses the cached positions (see :func:`select_rows`); the frame itself
+    is not cached, so prefer passing the positions on where a copy of the
+    rows is not needed.
+    """
+    predicates = normalize_predicates(predicates)
+    if not predicates:
+        return df
+    if dataset_key is None:
+        return df[build_mask(df, predicates)]
+    return df.take(select_rows(df, predicates, dataset_key))
+
+
+def clear_filter_cache():
+    _selection_cache.clear()
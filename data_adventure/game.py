@@ -0,0 +1,438 @@
+"""Game rules for each stage, independent of Streamlit.
+
+The Streamlit script only draws widgets and calls into this module, so every
+stage (``character_setup``, ``case_selection``, ``data_lab``,
+``puzzle_room``, ``report_station``) can be timed, tested or driven under
+load without a Streamlit runtime.
+
+Stage functions take a :class:`~data_adventure.state.PlayerState`: the one
+kept in ``st.session_state`` (see :func:`player_state`) in the app, or one
+from :func:`new_game_state` when running headless.
+
+The pandas-backed engine modules are imported by the Data Lab functions that
+use them, so the first stages load without them.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from data_adventure.ledger import get_ledger
+from data_adventure.state import PlayerState
+
+STAGES = [
+    "character_setup",
+    "case_selection",
+    "data_lab",
+    "puzzle_room",
+    "report_station",
+]
+
+SPECIALTIES = [
+    "Data Analyst",
+    "Machine Learning Engineer",
+    "Data Visualization Expert",
+    "Statistical Detective",
+    "Business Intelligence Agent",
+]
+
+# Case cards shown in Case Selection, in display order
+CASES = {
+    "Missing Data": {
+        "title": "🔍 Missing Data Case",
+        "difficulty": "Easy",
+        "skills": "Data cleaning, basic analysis",
+        "reward": "100 XP",
+        "description": (
+            "A local business has missing sales data. "
+            "Help them recover and analyze the information."
+        ),
+        "score": 25,
+    },
+    "Outlier Detective": {
+        "title": "📊 Outlier Detective",
+        "difficulty": "Medium",
+        "skills": "Statistical analysis, visualization",
+        "reward": "200 XP",
+        "description": "Detect and investigate suspicious patterns in financial data.",
+        "score": 50,
+    },
+    "Trend Analyzer": {
+        "title": "📈 Trend Analyzer",
+        "difficulty": "Hard",
+        "skills": "Time series analysis, forecasting",
+        "reward": "300 XP",
+        "description": "Analyze market trends and predict future patterns.",
+        "score": 75,
+    },
+}
+
+
+def player_state(session):
+    """Return the player in ``session`` (e.g. ``st.session_state``), creating it."""
+    if "player" not in session:
+        session["player"] = PlayerState()
+    return session["player"]
+
+
+def new_game_state(**fields):
+    """Return a fresh headless game state."""
+    return PlayerState(**fields)
+
+
+def award(state, reason, score=0, experience=0, achievement=None):
+    """Award ``state`` once for ``reason``; returns ``False`` if already awarded.
+
+    Score, experience and level are updated through the shared ledger (see
+    :mod:`data_adventure.ledger`), which also logs the award.
+    """
+    return (
+        get_ledger().record(state, reason, score, experience, achievement) is not None
+    )
+
+
+def elapsed_seconds(state, now=None):
+    return int(((now or datetime.now()) - state.start_time).total_seconds())
+
+
+# --- Character Setup -------------------------------------------------------
+
+
+def begin_adventure(state):
+    """Start the adventure; returns ``False`` while the name is missing."""
+    if not state.name:
+        return False
+    state.progress = "case_selection"
+    award(
+        state,
+        "character_created",
+        score=50,
+        experience=20,
+        achievement="Character created!",
+    )
+    return True
+
+
+# --- Case Selection --------------------------------------------------------
+
+
+def select_case(state, case):
+    if case not in CASES:
+        raise KeyError(f"Unknown case: {case!r}")
+    state.case = case
+    state.progress = "data_lab"
+    # A new case gets a new set of puzzles
+    state.puzzles = {}
+    award(
+        state,
+        f"case:{case}",
+        score=CASES[case]["score"],
+        achievement=f"Case selected: {case}",
+    )
+
+
+# --- Data Lab --------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class CaseData:
+    """A case dataset, optionally filtered, with its cached column profile.
+
+    ``df`` is always the whole dataset, shared by every session; a filtered
+    view is only the row ``positions`` its predicates select (``None`` for
+    every row). Pass ``positions`` on to the engines rather than copying the
+    rows, or use :meth:`frame` for the few columns a computation needs.
+    """
+
+    dataset_key: tuple
+    df: object  # pd.DataFrame
+    profile: object  # ColumnProfile
+    predicates: tuple = ()
+    positions: object = None  # np.ndarray
+
+    @property
+    def view(self):
+        from data_adventure.filters import view_key
+
+        return view_key(self.dataset_key, self.predicates)
+
+    @property
+    def rows(self):
+        return len(self.df) if self.positions is None else len(self.positions)
+
+    def frame(self, columns=None):
+        """Return ``columns`` (all by default) of the view's rows, as a copy."""
+        from data_adventure.filters import take_rows
+
+        return take_rows(self.df, self.positions, columns)
+
+    def filtered(self, predicates):
+        """Return this data narrowed by ``predicates`` (always from the full case)."""
+        from data_adventure.filters import select_rows
+        from data_adventure.profile import get_profile
+
+        if self.predicates:
+            raise ValueError("filtered() must be called on the unfiltered case data")
+        if not predicates:
+            return self
+        positions = select_rows(self.df, predicates, self.dataset_key)
+        profile = get_profile(self.df, self.dataset_key, predicates, positions)
+        return CaseData(
+            self.dataset_key, self.df, profile, tuple(predicates), positions
+        )
+
+
+def open_case(case, rows=None, seed=None):
+    """Load the shared dataset for ``case`` and its profile."""
+    from data_adventure.cases import DEFAULT_SEED, case_key, load_case
+    from data_adventure.profile import get_profile
+
+    if seed is None:
+        seed = DEFAULT_SEED
+    dataset_key = case_key(case, seed, rows)
+    df = load_case(*dataset_key)
+    return CaseData(dataset_key, df, get_profile(df, dataset_key))
+
+
+def open_dataset(source, filename, digest=None):
+    """Ingest a player's CSV/Parquet file (see :mod:`data_adventure.ingest`).
+
+    Raises ``ImportError`` without pyarrow and ``IngestError`` for bad files.
+    """
+    from data_adventure.ingest import ingest
+
+    dataset = ingest(source, filename, digest)
+    return CaseData(dataset.key, dataset.df, dataset.profile)
+
+
+@dataclass(frozen=True)
+class Insight:
+    metric_label: str
+    metric_value: object
+    level: str  # "success", "info" or "warning"
+    message: str
+    tip: str = None
+
+
+def case_insight(case, data):
+    """Return the headline :class:`Insight` for ``case`` on ``data``."""
+    df, profile, positions = data.df, data.profile, data.positions
+    if case == "Missing Data":
+        missing_count = profile.total_missing
+        if missing_count > 0:
+            return Insight(
+                "Total Missing Values",
+                missing_count,
+                "success",
+                "🔍 **Insight:** You found missing data! "
+                "Consider imputation strategies.",
+                "💡 **Tip:** Use forward fill, backward fill, or interpolation for "
+                "time series data. Compare them in the Imputation Workbench under "
+                "Analysis Tools.",
+            )
+        return Insight(
+            "Total Missing Values",
+            missing_count,
+            "success",
+            "✅ **Insight:** No missing data found! Your data is clean.",
+        )
+
+    if case == "Outlier Detective":
+        from data_adventure.outliers import detect_outliers
+
+        if not profile.numeric_columns or not data.rows:
+            return None
+        report = detect_outliers(
+            df,
+            profile.numeric_columns,
+            dataset_key=data.dataset_key,
+            predicates=data.predicates,
+            positions=positions,
+        )
+        column, count = report.most_outliers
+        return Insight(
+            "Most Outliers Found",
+            f"{count} in {column}",
+            "warning",
+            f"⚠️ **Alert:** {column} has the most outliers. Investigate further!",
+        )
+
+    # Trend Analyzer
+    from data_adventure.timeseries import analyze_series, time_columns
+
+    times = time_columns(df)
+    if "Sales" not in df.columns or not times or not data.rows:
+        return None
+    report = analyze_series(
+        df,
+        times[0],
+        "Sales",
+        dataset_key=data.dataset_key,
+        predicates=data.predicates,
+        positions=positions,
+    )
+    if report is None:
+        return None
+    # Least-squares slope over the whole period, not just first vs last row
+    message = (
+        f"📈 **Trend:** Sales are {report.direction} by about "
+        f"{abs(report.fit.slope) * 30:,.2f} per month"
+    )
+    if report.fit.r_squared == report.fit.r_squared:  # not NaN
+        message += f" (R² = {report.fit.r_squared:.2f})"
+    tip = None
+    if report.decomposition is not None:
+        tip = (
+            f"💡 **Tip:** A {report.season} cycle explains "
+            f"{report.decomposition.strength:.0%} of the variation around the trend."
+        )
+    return Insight(
+        "Trend Direction", report.direction.title(), "info", message + ".", tip
+    )
+
+
+def save_analysis(state, data, now=None):
+    """Record a snapshot of the current analysis on ``state``."""
+    analysis = {
+        "case": state.case,
+        "timestamp": (now or datetime.now()).isoformat(),
+        "data_shape": (data.rows, data.df.shape[1]),
+        "missing_values": data.profile.missing.to_dict(),
+    }
+    # A ring buffer: only the latest MAX_SAVED_ANALYSES snapshots are kept
+    state.saved_analyses.append(analysis)
+    return analysis
+
+
+def find_clue(state, data=None):
+    """Move on to the Puzzle Room, dealing puzzles about ``data`` (the case data)."""
+    state.progress = "puzzle_room"
+    award(
+        state,
+        f"clue:{state.case}",
+        score=100,
+        experience=30,
+        achievement="Clue found in data!",
+    )
+    deal_puzzles(state, data)
+
+
+# --- Puzzle Room -----------------------------------------------------------
+
+
+def deal_puzzles(state, data=None):
+    """Return ``{kind: Puzzle}`` for ``state``, dealing them on first use.
+
+    Puzzles match the player's case and difficulty preference; with ``data``
+    a question about the case data is dealt too.
+    """
+    if not state.puzzles:
+        from data_adventure.puzzles import deal
+
+        difficulty = state.preferences.get("difficulty", "Medium")
+        state.puzzles = deal(state.player_id, state.case, difficulty, data)
+    return state.puzzles
+
+
+def check_puzzle(state, kind, answer):
+    """Check ``answer`` to the player's ``kind`` puzzle; awards its reward when correct.
+
+    Returns ``(correct, message)``.
+    """
+    puzzle = deal_puzzles(state)[kind]
+    if not puzzle.check(answer):
+        return False, puzzle.failure
+    score, experience = puzzle.reward
+    if not award(
+        state,
+        f"puzzle:{puzzle.puzzle_id}",
+        score=score,
+        experience=experience,
+        achievement=puzzle.achievement,
+    ):
+        return True, f"{puzzle.success} (Already solved: no extra points.)"
+    return True, puzzle.success
+
+
+# --- Report Station --------------------------------------------------------
+
+
+def build_report(state, now=None):
+    """Return the Markdown case report shown and downloaded at the end."""
+    now = now or datetime.now()
+    achievements = chr(10).join(
+        [f"- {achievement}" for achievement in state.achievements]
+    )
+    skills = chr(10).join(
+        [f"- {skill}: {level}/10" for skill, level in state.skills.items()]
+    )
+    return f"""
+    # Data Adventure RPG Case Report
+
+    ## Detective Information
+    **Name:** {state.name}
+    **Specialty:** {state.specialty}
+    **Level:** {state.level}
+    **Score:** {state.score}
+
+    ## Case Details
+    **Case Type:** {state.case}
+    **Completion Date:** {now.strftime('%Y-%m-%d %H:%M:%S')}
+    **Time Elapsed:** {elapsed_seconds(state, now) // 60} minutes
+
+    ## Achievements Earned
+    {achievements}
+
+    ## Skills Demonstrated
+    {skills}
+
+    ## Analysis Summary
+    - Data exploration completed
+    - Visualizations created
+    - Insights discovered
+    - Puzzle challenges solved
+
+    ## Recommendations
+    - Continue practicing data analysis
+    - Explore more advanced techniques
+    - Share findings with the team
+
+    **Report Generated by:** Data Adventure RPG System
+    """
+
+
+def build_json_report(state, now=None):
+    return {
+        "detective": state.name,
+        "specialty": state.specialty,
+        "case": state.case,
+        "score": state.score,
+        "level": state.level,
+        "achievements": list(state.achievements),
+        "skills": dict(state.skills),
+        "completion_date": (now or datetime.now()).isoformat(),
+    }
+
+
+def leaderboard_entry(state, now=None):
+    """Return this player's leaderboard entry (one per player and case)."""
+    return {
+        "entry_id": f"{state.player_id}:{state.case}",
+        "Name": state.name,
+        "Case": state.case,
+        "Score": state.score,
+        "Level": state.level,
+        "Achievements": len(state.achievements),
+        "Completion_Date": (now or datetime.now()).strftime("%Y-%m-%d"),
+    }
+
+
+def check_level_up(state):
+    """Return ``True`` once for each level gained since the last check.
+
+    Levels are gained by the ledger as experience is awarded; this only
+    tracks which ones have been celebrated.
+    """
+    if state.level <= state.celebrated_level:
+        return False
+    state.celebrated_level = state.level
+    return True
@@ -0,0 +1,416 @@
+"""Bring-your-own datasets: CSV and Parquet files ingested into Arrow.
+
+:func:`ingest` streams a file through pyarrow in record batches, so a
+multi-GB file never has to fit in memory as a whole:
+
+1. the file is hashed (SHA-256) in blocks; the digest names the dataset;
+2. a first pass over the batches builds the column profile: missing
+   values, min/max, mean and standard deviation, quartiles from a uniform
+   sample of :data:`QUANTILE_SAMPLE_ROWS` values, and for text columns the
+   distinct values (up to :data:`MAX_DICTIONARY_VALUES`);
+3. a second pass casts every batch to compact types (the smallest integer
+   type that fits, dictionary-encoded text for low-cardinality columns) and
+   writes an uncompressed Arrow IPC (Feather v2) file;
+4. the profile is stored next to it as JSON.
+
+Empty CSV fields are read as missing values, as they are in Parquet files.
+
+Ingesting the same content again, from any session or server process, finds
+the IPC file and skips straight to :func:`load_dataset`, which memory-maps it:
+numeric columns without missing values become pandas columns without a copy,
+backed by the OS page cache.
+
+pyarrow is optional: ``pip install "data-adventure-rpg[arrow]"``.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data_adventure.arrow_store import read_frame, require_pyarrow
+from data_adventure.cache import LRUCache
+from data_adventure.cases import CHUNK_ROWS, memory_footprint
+from data_adventure.profile import MAX_FILTER_CATEGORIES, ColumnProfile
+
+DATA_DIR = os.environ.get(
+    "DATA_ADVENTURE_DATA_DIR", os.path.join(".data_adventure", "datasets")
+)
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+HASH_BLOCK_BYTES = 8 * 1024**2
+CSV_BLOCK_BYTES = 64 * 1024**2
+# Text columns with at most this many distinct values are stored as categories
+MAX_DICTIONARY_VALUES = 1_000
+QUANTILES = [0.25, 0.5, 0.75]
+# Numeric values kept per column to estimate the quartiles (exact below this)
+QUANTILE_SAMPLE_ROWS = 100_000
+
+# (path, size, mtime) -> digest, so files on disk are not re-hashed every rerun
+_digest_cache = LRUCache(max_entries=256)
+_dataset_cache = LRUCache(
+    max_entries=4,
+    max_bytes=4 * 1024**3,
+    sizeof=lambda dataset: memory_footprint(dataset.df),
+)
+
+
+class IngestError(ValueError):
+    """The file cannot be loaded as a dataset."""
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """An ingested dataset, shared read-only by every session."""
+
+    key: tuple  # ("dataset", digest), usable wherever a case key is
+    name: str
+    path: str  # the Arrow IPC file
+    df: object  # pd.DataFrame
+    profile: object  # ColumnProfile
+
+
+def file_format(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in FORMATS:
+        raise IngestError(
+            f"Unsupported file type {ext or filename!r}; use CSV or Parquet."
+        )
+    return FORMATS[ext]
+
+
+def _rewind(source):
+    """Return a binary stream over ``source`` (a path or file object) from the start."""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb")
+    source.seek(0)
+    return source
+
+
+def content_digest(source):
+    """SHA-256 of a path or binary file object, read in blocks."""
+    if isinstance(source, (str, os.PathLike)):
+        stat = os.stat(source)
+        key = (os.path.abspath(source), stat.st_size, stat.st_mtime_ns)
+        return _digest_cache.get_or_create(key, lambda: _hash_stream(source))
+    return _hash_stream(source)
+
+
+def _hash_stream(source):
+    digest = hashlib.sha256()
+    stream = _rewind(source)
+    try:
+        for block in iter(lambda: stream.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    finally:
+        if stream is not source:
+            stream.close()
+    return digest.hexdigest()
+
+
+def _batches(fmt, stream):
+    pa = require_pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        yield from pq.ParquetFile(stream).iter_batches(batch_size=CHUNK_ROWS)
+        return
+
+    from pyarrow import csv
+
+    reader = csv.open_csv(
+        stream,
+        read_options=csv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+        # Empty text fields are missing values, not "" (as in Parquet)
+        convert_options=csv.ConvertOptions(strings_can_be_null=True),
+    )
+    while True:
+        try:
+            yield reader.read_next_batch()
+        except StopIteration:
+            return
+        except pa.ArrowInvalid as exc:
+            # Types are inferred from the first block; a later block that
+            # does not parse the same way ends up here.
+            raise IngestError(f"Could not parse the CSV file: {exc}") from exc
+
+
+class _ColumnScan:
+    """Running statistics of one column, updated batch by batch.
+
+    Every column counts its missing values (nulls, and NaN in float columns).
+    Numeric columns keep their min/max, sums shifted by the first batch's
+    mean (so they stay accurate) and a uniform sample for the quartiles;
+    text columns keep their distinct values.
+    """
+
+    def __init__(self, seed=0):
+        self.missing = 0
+        self.numeric = False
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self.shift = None
+        self.sum = 0.0
+        self.sum_squares = 0.0
+        self.values = set()
+        self.dictionary = True
+        self._rng = np.random.default_rng(seed)
+        self._sample = np.empty(0)
+        self._sample_keys = np.empty(0)
+
+    def update(self, array):
+        pa = require_pyarrow()
+        import pyarrow.compute as pc
+
+        if pa.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+        self.missing += array.null_count
+        if pa.types.is_integer(array.type) or pa.types.is_floating(array.type):
+            self.numeric = True
+            values = pc.drop_null(array).to_numpy(zero_copy_only=False)
+            if values.dtype.kind == "f":
+                present = ~np.isnan(values)
+                self.missing += len(values) - int(present.sum())
+                values = values[present]
+            self._update_numeric(values)
+        elif _is_text(array.type) and self.dictionary:
+            self.values.update(
+                value for value in pc.unique(array).to_pylist() if value is not None
+            )
+            if len(self.values) > MAX_DICTIONARY_VALUES:
+                self.dictionary = False
+                self.values = set()
+
+    def _update_numeric(self, values):
+        if not len(values):
+            return
+        # min/max in the column's own type, so int64 bounds stay exact
+        low, high = values.min().item(), values.max().item()
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+        values = values.astype(np.float64)
+        if self.shift is None:
+            self.shift = float(values.mean())
+        centered = values - self.shift
+        self.count += len(values)
+        self.sum += float(centered.sum())
+        self.sum_squares += float(centered @ centered)
+
+        # Keep the values with the smallest random keys: a uniform sample
+        keys = np.concatenate([self._sample_keys, self._rng.random(len(values))])
+        sample = np.concatenate([self._sample, values])
+        if len(keys) > QUANTILE_SAMPLE_ROWS:
+            keep = np.argpartition(keys, QUANTILE_SAMPLE_ROWS)[:QUANTILE_SAMPLE_ROWS]
+            keys, sample = keys[keep], sample[keep]
+        self._sample_keys, self._sample = keys, sample
+
+    def numeric_stats(self):
+        """``describe()``-style statistics, ``None`` where they are undefined."""
+        stats = {"count": self.count, "mean": None, "std": None, "min": None}
+        stats.update({f"{q:.0%}": None for q in QUANTILES})
+        stats["max"] = None
+        if self.count:
+            mean = self.sum / self.count
+            stats["mean"] = self.shift + mean
+            if self.count > 1:
+                variance = (self.sum_squares - self.sum * mean) / (self.count - 1)
+                stats["std"] = max(variance, 0.0) ** 0.5
+            quartiles = np.quantile(self._sample, QUANTILES)
+            stats.update({f"{q:.0%}": float(v) for q, v in zip(QUANTILES, quartiles)})
+            stats["min"], stats["max"] = self.minimum, self.maximum
+        return stats
+
+
+def _is_text(arrow_type):
+    pa = require_pyarrow()
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+
+
+def _compact_type(field, scan):
+    """Return the Arrow type to store ``field`` as, and its dictionary if any."""
+    pa = require_pyarrow()
+    if pa.types.is_integer(field.type) and scan.minimum is not None:
+        for candidate in (pa.int8(), pa.int16(), pa.int32(), pa.int64()):
+            info = np.iinfo(candidate.to_pandas_dtype())
+            if info.min <= scan.minimum and scan.maximum <= info.max:
+                return candidate, None
+    if _is_text(field.type) and scan.dictionary:
+        dictionary = pa.array(sorted(scan.values), type=pa.string())
+        index = pa.int8() if len(dictionary) <= 127 else pa.int16()
+        return pa.dictionary(index, pa.string()), dictionary
+    if pa.types.is_dictionary(field.type):
+        return field.type.value_type, None
+    return field.type, None
+
+
+def _convert(array, arrow_type, dictionary):
+    pa = require_pyarrow()
+    import pyarrow.compute as pc
+
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    if dictionary is None:
+        return array.cast(arrow_type)
+    # Every batch shares one sorted dictionary, as the IPC file format needs
+    indices = pc.index_in(array.cast(pa.string()), value_set=dictionary)
+    return pa.DictionaryArray.from_arrays(
+        indices.cast(arrow_type.index_type), dictionary
+    )
+
+
+def _write_ipc(source, fmt, path):
+    """Stream ``source`` into a compact Arrow IPC file at ``path``.
+
+    Returns the profile statistics gathered on the way (see
+    :func:`_scan_profile`).
+    """
+    pa = require_pyarrow()
+
+    stream = _rewind(source)
+    try:
+        schema, scans, rows = None, None, 0
+        for batch in _batches(fmt, stream):
+            if schema is None:
+                schema = batch.schema
+                scans = [_ColumnScan() for _ in schema]
+            rows += batch.num_rows
+            for scan, column in zip(scans, batch.columns):
+                scan.update(column)
+    finally:
+        if stream is not source:
+            stream.close()
+    if schema is None:
+        raise IngestError("The file contains no rows.")
+
+    targets = [_compact_type(field, scan) for field, scan in zip(schema, scans)]
+    target_schema = pa.schema(
+        [
+            pa.field(field.name, arrow_type)
+            for field, (arrow_type, _) in zip(schema, targets)
+        ]
+    )
+
+    # Write to a temporary file first so readers never see a partial dataset
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    stream = _rewind(source)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(
+            sink, target_schema
+        ) as writer:
+            for batch in _batches(fmt, stream):
+                arrays = [
+                    _convert(column, arrow_type, dictionary)
+                    for column, (arrow_type, dictionary) in zip(batch.columns, targets)
+                ]
+                writer.write_batch(
+                    pa.RecordBatch.from_arrays(arrays, schema=target_schema)
+                )
+        os.replace(tmp_path, path)
+    finally:
+        if stream is not source:
+            stream.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return _scan_profile(schema, scans, rows)
+
+
+def _scan_profile(schema, scans, rows):
+    """Profile statistics from the first pass, as plain JSON-able values."""
+    stats = {"rows": rows, "missing": {}, "numeric": {}, "categories": {}}
+    for field, scan in zip(schema, scans):
+        stats["missing"][field.name] = scan.missing
+        if scan.numeric:
+            stats["numeric"][field.name] = scan.numeric_stats()
+        elif _is_text(field.type) and scan.dictionary:
+            # The same sorted values the stored dictionary holds
+            if len(scan.values) < MAX_FILTER_CATEGORIES:
+                stats["categories"][field.name] = sorted(scan.values)
+    return stats
+
+
+def _build_profile(df, stats):
+    """Turn the stored statistics back into a :class:`ColumnProfile` for ``df``."""
+    numeric_columns = tuple(df.select_dtypes(include=[np.number]).columns)
+    categorical_columns = tuple(
+        df.select_dtypes(include=["object", "category"]).columns
+    )
+    numeric = {
+        col: stats["numeric"][col] for col in numeric_columns if col in stats["numeric"]
+    }
+    describe = pd.DataFrame(numeric, columns=list(numeric_columns), dtype=float)
+    return ColumnProfile(
+        rows=stats["rows"],
+        dtypes=df.dtypes,
+        numeric_columns=numeric_columns,
+        categorical_columns=categorical_columns,
+        missing=pd.Series(stats["missing"], dtype=np.int64).reindex(df.columns),
+        minimum=describe.loc["min"] if len(describe) else pd.Series(dtype=float),
+        maximum=describe.loc["max"] if len(describe) else pd.Series(dtype=float),
+        describe=describe,
+        category_values={
+            col: stats["categories"][col]
+            for col in categorical_columns
+            if col in stats["categories"]
+        },
+    )
+
+
+def load_dataset(digest, name=None):
+    """Return the ingested :class:`Dataset` with ``digest``, memory-mapped."""
+
+    def build():
+        path = os.path.join(DATA_DIR, f"{digest}.arrow")
+        if not os.path.exists(path):
+            raise KeyError(f"No ingested dataset {digest!r}")
+        df = read_frame(path)
+        with open(os.path.join(DATA_DIR, f"{digest}.profile.json")) as f:
+            meta = json.load(f)
+        return Dataset(
+            ("dataset", digest),
+            name or meta["name"],
+            path,
+            df,
+            _build_profile(df, meta["stats"]),
+        )
+
+    return _dataset_cache.get_or_create(digest, build)
+
+
+def ingest(source, filename, digest=None):
+    """Ingest a CSV or Parquet file (a path or a binary file object).
+
+    Returns the shared :class:`Dataset`. Files already ingested, by content,
+    are not read again beyond hashing; pass ``digest`` when the caller
+    already knows it (see :func:`content_digest`).
+    """
+    fmt = file_format(filename)
+    pa = require_pyarrow()
+    digest = digest or content_digest(source)
+    if digest in _dataset_cache:
+        return load_dataset(digest)
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"{digest}.arrow")
+    profile_path = os.path.join(DATA_DIR, f"{digest}.profile.json")
+    if not (os.path.exists(path) and os.path.exists(profile_path)):
+        try:
+            stats = _write_ipc(source, fmt, path)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, OSError) as exc:
+            raise IngestError(f"Could not load {filename}: {exc}") from exc
+        meta = {"name": os.path.basename(filename), "stats": stats}
+        with open(profile_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(profile_path + ".tmp", profile_path)
+    return load_dataset(digest, os.path.basename(filename))
+
+
+def clear_dataset_cache():
+    _dataset_cache.clear()
@@ -0,0 +1,310 @@
+"""Opt-in timing of Streamlit reruns and the sections inside them.
+
+Set ``DATA_ADVENTURE_PROFILE=1`` to turn it on. Every rerun is then recorded
+with the time spent in each :func:`timed` section, aggregated per section
+(process-wide and per session) into p50/p95/p99 summaries. Optional extras:
+
+* ``DATA_ADVENTURE_PROFILE_TRACES=1`` runs cProfile (or pyinstrument, with
+  ``DATA_ADVENTURE_PROFILER=pyinstrument``) during reruns and keeps the trace
+  of reruns slower than ``DATA_ADVENTURE_SLOW_RERUN_MS`` (default 1000);
+* ``DATA_ADVENTURE_PROFILE_LOG=path`` appends one JSON line per rerun.
+
+The timings cover every session, so the admin panel showing them is only
+for requests carrying ``DATA_ADVENTURE_ADMIN_TOKEN`` (see :func:`is_admin`).
+
+When disabled, :func:`timed` is a no-op context manager.
+
+Python 3.12+ allows one active cProfile per process, so at most one rerun is
+traced at a time. The active profiler is tracked process-wide: a rerun cut
+short by ``st.stop()`` or an exception leaves its profiler running, and the
+next :meth:`Recorder.begin_rerun` disables it. Skipped traces are logged.
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+SAMPLES_PER_SECTION = 2_000
+SAMPLES_PER_SESSION = 200
+KEPT_RERUNS = 5_000
+KEPT_SLOW_RERUNS = 20
+PERCENTILES = (50, 95, 99)
+# A trace running longer than this is dropped even if its thread is alive
+STALE_TRACE_SECONDS = 600
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return None
+    rank = max(
+        0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[rank]
+
+
+class Recorder:
+    """Collects rerun and section timings; safe to share between sessions."""
+
+    def __init__(
+        self,
+        enabled=False,
+        capture_traces=False,
+        profiler="cprofile",
+        slow_rerun_ms=1000,
+        log_path=None,
+    ):
+        self.enabled = enabled
+        self.capture_traces = capture_traces
+        self.profiler = profiler
+        self.slow_rerun_ms = slow_rerun_ms
+        self.log_path = log_path
+
+        self._lock = threading.Lock()
+        # Kept apart so a slow disk never holds up recording or the admin panel
+        self._log_lock = threading.Lock()
+        self._local = threading.local()
+        # The one active trace in the process: (thread, start, kind, profiler)
+        self._trace_lock = threading.Lock()
+        self._trace = None
+        self.skipped_traces = 0
+        self._aggregate = defaultdict(lambda: deque(maxlen=SAMPLES_PER_SECTION))
+        self._sessions = defaultdict(
+            lambda: defaultdict(lambda: deque(maxlen=SAMPLES_PER_SESSION))
+        )
+        self._reruns = deque(maxlen=KEPT_RERUNS)
+        self._slow_reruns = deque(maxlen=KEPT_SLOW_RERUNS)
+
+    # --- recording ---------------------------------------------------------
+
+    def record(self, section, seconds, session_id=None):
+        rerun = getattr(self._local, "rerun", None)
+        if session_id is None and rerun is not None:
+            session_id = rerun["session"]
+        with self._lock:
+            self._aggregate[section].append(seconds)
+            if session_id is not None:
+                self._sessions[session_id][section].append(seconds)
+        if rerun is not None:
+            sections = rerun["sections"]
+            sections[section] = sections.get(section, 0.0) + seconds * 1000
+
+    @contextmanager
+    def timed(self, section):
+        """Time the enclosed block as ``section`` (no-op when disabled)."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(section, time.perf_counter() - start)
+
+    def begin_rerun(self, session_id, stage):
+        """Start timing a rerun on this thread.
+
+        Streamlit aborts a script on ``st.rerun()``/``st.stop()``, so a rerun
+        that never reached :meth:`end_rerun` is simply dropped here, and a
+        profiler it left running is disabled.
+        """
+        if not self.enabled:
+            return
+        unfinished = getattr(self._local, "rerun", None)
+        if unfinished is not None:
+            logger.debug(
+                "Dropping unfinished %s rerun of session %s",
+                unfinished["stage"],
+                unfinished["session"],
+            )
+        self._release_stale_trace()
+        self._local.rerun = {
+            "session": session_id,
+            "stage": stage,
+            "start": time.perf_counter(),
+            "sections": {},
+        }
+        if self.capture_traces:
+            self._start_trace()
+
+    def end_rerun(self):
+        rerun = getattr(self._local, "rerun", None)
+        if not self.enabled or rerun is None:
+            return None
+        total = time.perf_counter() - rerun["start"]
+        trace = self._stop_trace()
+        self._local.rerun = None
+
+        record = {
+            "ts": time.time(),
+            "session": rerun["session"],
+            "stage": rerun["stage"],
+            "total_ms": round(total * 1000, 3),
+            "sections": {name: round(ms, 3) for name, ms in rerun["sections"].items()},
+        }
+        self.record("rerun", total, rerun["session"])
+        self.record(f"stage.{rerun['stage']}", total, rerun["session"])
+        with self._lock:
+            self._reruns.append(record)
+            if trace is not None and record["total_ms"] >= self.slow_rerun_ms:
+                self._slow_reruns.append((record, trace))
+        if self.log_path:
+            self._append_log(record)
+        return record
+
+    # --- reporting ---------------------------------------------------------
+
+    def summary(self, session_id=None):
+        """Return one row per section with count and p50/p95/p99 in ms."""
+        with self._lock:
+            source = (
+                self._sessions.get(session_id, {}) if session_id else self._aggregate
+            )
+            samples = {section: sorted(values) for section, values in source.items()}
+        rows = []
+        for section, values in sorted(samples.items()):
+            row = {"section": section, "count": len(values)}
+            for pct in PERCENTILES:
+                row[f"p{pct}_ms"] = round(percentile(values, pct) * 1000, 2)
+            rows.append(row)
+        return rows
+
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions)
+
+    def slow_reruns(self):
+        """Return ``(record, trace_text)`` pairs for the slowest kept reruns."""
+        with self._lock:
+            return list(self._slow_reruns)
+
+    def export_jsonl(self):
+        with self._lock:
+            return "".join(json.dumps(record) + "\n" for record in self._reruns)
+
+    def reset(self):
+        with self._lock:
+            self._aggregate.clear()
+            self._sessions.clear()
+            self._reruns.clear()
+            self._slow_reruns.clear()
+
+    # --- internals ---------------------------------------------------------
+
+    def _start_trace(self):
+        with self._trace_lock:
+            if self._trace is not None:
+                self.skipped_traces += 1
+                logger.info("Skipping trace: another rerun is being profiled")
+                return
+            if self.profiler == "pyinstrument":
+                try:
+                    from pyinstrument import Profiler
+                except ImportError:
+                    logger.warning("pyinstrument is not installed; using cProfile")
+                    self.profiler = "cprofile"
+                else:
+                    profiler = Profiler()
+                    profiler.start()
+                    self._trace = (
+                        threading.current_thread(),
+                        time.perf_counter(),
+                        "pyinstrument",
+                        profiler,
+                    )
+                    return
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as exc:
+                # Some other profiler (not ours) is active in this process
+                self.skipped_traces += 1
+                logger.warning("Skipping trace: %s", exc)
+                return
+            self._trace = (
+                threading.current_thread(),
+                time.perf_counter(),
+                "cprofile",
+                profiler,
+            )
+
+    def _stop_trace(self):
+        """Stop this thread's trace and return its text (``None`` if not tracing)."""
+        with self._trace_lock:
+            trace = self._trace
+            if trace is None or trace[0] is not threading.current_thread():
+                return None
+            self._trace = None
+        _, _, kind, profiler = trace
+        if kind == "pyinstrument":
+            profiler.stop()
+            return profiler.output_text(unicode=True)
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(30)
+        return out.getvalue()
+
+    def _release_stale_trace(self):
+        """Disable a profiler whose rerun never reached :meth:`end_rerun`."""
+        with self._trace_lock:
+            if self._trace is None:
+                return
+            thread, started, kind, profiler = self._trace
+            stale = (
+                thread is threading.current_thread()
+                or not thread.is_alive()
+                or time.perf_counter() - started > STALE_TRACE_SECONDS
+            )
+            if not stale:
+                return
+            self._trace = None
+        logger.warning(
+            "Disabling the profiler of a rerun on thread %s that ended "
+            "without end_rerun (st.stop() or an exception)",
+            thread.name,
+        )
+        if kind == "pyinstrument":
+            profiler.stop()
+        else:
+            profiler.disable()
+
+    def _append_log(self, record):
+        line = json.dumps(record) + "\n"
+        with self._log_lock:
+            with open(self.log_path, "a") as f:
+                f.write(line)
+
+
+recorder = Recorder(
+    enabled=os.environ.get("DATA_ADVENTURE_PROFILE") == "1",
+    capture_traces=os.environ.get("DATA_ADVENTURE_PROFILE_TRACES") == "1",
+    profiler=os.environ.get("DATA_ADVENTURE_PROFILER", "cprofile"),
+    slow_rerun_ms=float(os.environ.get("DATA_ADVENTURE_SLOW_RERUN_MS", 1000)),
+    log_path=os.environ.get("DATA_ADVENTURE_PROFILE_LOG"),
+)
+
+
+def timed(section):
+    """Time the enclosed block as ``section`` on the shared :data:`recorder`."""
+    return recorder.timed(section)
+
+
+def is_admin(token):
+    """Whether ``token`` (e.g. the ``?admin=`` query value) is the admin token.
+
+    Always ``False`` while ``DATA_ADVENTURE_ADMIN_TOKEN`` is unset or empty.
+    """
+    expected = os.environ.get("DATA_ADVENTURE_ADMIN_TOKEN")
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(str(token).encode(), expected.encode())
@@ -0,0 +1,173 @@
+"""Leaderboard shared by every detective on the server.
+
+Stores implement :class:`LeaderboardStore`; :func:`open_leaderboard` picks one
+from a URL so deployments can plug in their own backend:
+
+* ``sqlite:///path/to/leaderboard.db`` (default) persists entries in SQLite
+  with an index on score, so top-N reads never scan the whole table;
+* ``memory://`` keeps entries in process memory, e.g. for local runs.
+
+Submissions are queued and written in batches by a background thread (see
+:mod:`data_adventure.batching`) so the report page never waits on the
+database, and top-N reads are cached for a short TTL.
+"""
+
+import sqlite3
+import threading
+import time
+
+from data_adventure.batching import BatchWriter, file_location, open_url
+
+DEFAULT_URL = "sqlite:///leaderboard.db"
+COLUMNS = ["Name", "Case", "Score", "Level", "Achievements", "Completion_Date"]
+
+
+class LeaderboardStore:
+    """Base class for leaderboard backends.
+
+    Entries are dicts with an ``entry_id`` plus the :data:`COLUMNS` fields.
+    Submitting an entry with an existing ``entry_id`` replaces it, so a
+    detective appears once per case however often the report page reruns.
+    """
+
+    def submit(self, entry):
+        raise NotImplementedError
+
+    def top(self, n=10):
+        """Return the ``n`` best entries, highest score first."""
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class MemoryLeaderboardStore(LeaderboardStore):
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def submit(self, entry):
+        with self._lock:
+            self._entries[entry["entry_id"]] = dict(entry)
+
+    def top(self, n=10):
+        with self._lock:
+            entries = list(self._entries.values())
+        return _best(entries, n)
+
+
+class SQLiteLeaderboardStore(LeaderboardStore):
+    """SQLite-backed store with batched background writes and a read cache."""
+
+    def __init__(self, path, flush_interval=0.5, batch_size=500, read_ttl=2.0):
+        self.path = path
+        self.read_ttl = read_ttl
+
+        self._lock = threading.Lock()  # the read cache
+        self._db_lock = threading.Lock()  # the shared connection
+        self._read_cache = {}
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS leaderboard ("
+                " entry_id TEXT PRIMARY KEY,"
+                " name TEXT, case_name TEXT, score INTEGER, level INTEGER,"
+                " achievements INTEGER, completion_date TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS leaderboard_score"
+                " ON leaderboard (score DESC)"
+            )
+
+        self._writer = BatchWriter(
+            self._write,
+            "leaderboard-writer",
+            flush_interval,
+            batch_size,
+            on_close=self._close_connection,
+        )
+
+    def submit(self, entry):
+        self._writer.put(entry["entry_id"], dict(entry))
+
+    def top(self, n=10):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._read_cache.get(n)
+        pending = self._writer.pending()
+        if cached is None or now - cached[0] > self.read_ttl:
+            rows = self._query_top(n)
+            with self._lock:
+                self._read_cache[n] = (now, rows)
+        else:
+            rows = cached[1]
+
+        # Entries still waiting for the writer are merged in so a detective
+        # sees their own result immediately.
+        pending_ids = {entry["entry_id"] for entry in pending}
+        stored = [row for row in rows if row["entry_id"] not in pending_ids]
+        return _best(stored + pending, n)
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
+
+    def _write(self, batch):
+        rows = [
+            (
+                entry["entry_id"],
+                entry["Name"],
+                entry["Case"],
+                int(entry["Score"]),
+                int(entry["Level"]),
+                int(entry["Achievements"]),
+                entry["Completion_Date"],
+            )
+            for entry in batch
+        ]
+        with self._db_lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO leaderboard VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        with self._lock:
+            self._read_cache.clear()
+
+    def _close_connection(self):
+        with self._db_lock:
+            self._conn.close()
+
+    def _query_top(self, n):
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "SELECT entry_id, name, case_name, score, level, achievements,"
+                " completion_date FROM leaderboard ORDER BY score DESC LIMIT ?",
+                (n,),
+            )
+            rows = cursor.fetchall()
+        return [dict(zip(["entry_id"] + COLUMNS, row)) for row in rows]
+
+
+# URL scheme -> factory taking the part after "scheme://"
+STORE_FACTORIES = {
+    "sqlite": lambda location: SQLiteLeaderboardStore(
+        file_location(location, "leaderboard.db")
+    ),
+    "memory": lambda location: MemoryLeaderboardStore(),
+}
+
+
+def open_leaderboard(url=None):
+    """Open the leaderboard store described by ``url`` (default: SQLite)."""
+    return open_url(url or DEFAULT_URL, STORE_FACTORIES, "leaderboard")
+
+
+def _best(entries, n):
+    return sorted(entries, key=lambda entry: entry["Score"], reverse=True)[:n]
@@ -0,0 +1,206 @@
+"""Append-only ledger of score and experience awards.
+
+Every award is an :class:`Event` identified by the player and the reason it
+was given (``"case:Outlier Detective"``, ``"puzzle:math-mean"``...). Recording
+the same reason twice for a player is a no-op, so rerunning a page or
+resubmitting a solved puzzle never pays out again. Each new event updates
+the player's score, experience and level, and the cohort totals in
+:meth:`Ledger.summary`, in place; nothing is recomputed from session state.
+
+Events are queued and written in batches by a background thread, like
+leaderboard submissions (see :mod:`data_adventure.batching`), to a sink
+picked from a URL:
+
+* ``sqlite:///path/to/ledger.db`` (default) keeps an ``events`` table whose
+  primary key is the event id, so a batch written twice is stored once;
+* ``jsonl:///path/to/ledger.jsonl`` appends one JSON line per event;
+* ``memory://`` keeps the latest events in process memory, e.g. for local runs.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from data_adventure.batching import BatchWriter, file_location, open_url
+
+DEFAULT_URL = "sqlite:///ledger.db"
+EXPERIENCE_PER_LEVEL = 100
+# Events kept by the memory:// sink
+MEMORY_EVENTS = 100_000
+
+
+@dataclass(frozen=True)
+class Event:
+    event_id: str  # "<player id>:<reason>"
+    player_id: str
+    reason: str
+    score: int
+    experience: int
+    level: int  # the player's level after this event
+    achievement: str = None
+    timestamp: str = ""
+
+
+class LedgerSink:
+    """Base class for event stores; ``write`` gets batches in recording order."""
+
+    def write(self, events):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemorySink(LedgerSink):
+    def __init__(self, max_events=MEMORY_EVENTS):
+        self.events = deque(maxlen=max_events)
+
+    def write(self, events):
+        self.events.extend(events)
+
+
+class JSONLSink(LedgerSink):
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, events):
+        lines = "".join(json.dumps(asdict(event)) + "\n" for event in events)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class SQLiteSink(LedgerSink):
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                " event_id TEXT PRIMARY KEY, player_id TEXT, reason TEXT,"
+                " score INTEGER, experience INTEGER, level INTEGER,"
+                " achievement TEXT, timestamp TEXT)"
+            )
+
+    def write(self, events):
+        rows = [
+            (
+                e.event_id,
+                e.player_id,
+                e.reason,
+                e.score,
+                e.experience,
+                e.level,
+                e.achievement,
+                e.timestamp,
+            )
+            for e in events
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+class Ledger:
+    """Records idempotent awards and flushes them to ``sink`` in the background."""
+
+    def __init__(self, sink, flush_interval=0.5, batch_size=500):
+        self.sink = sink
+
+        self._lock = threading.Lock()  # the totals
+        self._events = 0
+        self._score = 0
+        self._experience = 0
+        self._players = {}  # player id -> score
+
+        self._writer = BatchWriter(
+            sink.write, "ledger-writer", flush_interval, batch_size, on_close=sink.close
+        )
+
+    def record(self, state, reason, score=0, experience=0, achievement=None, now=None):
+        """Award ``state`` for ``reason`` once; returns the :class:`Event` or ``None``.
+
+        ``None`` means the player was already awarded for ``reason``.
+        """
+        if reason in state.awarded:
+            return None
+        state.awarded.add(reason)
+        state.score += score
+        state.experience += experience
+        # Level up as soon as the experience is there, carrying the remainder
+        while state.experience >= EXPERIENCE_PER_LEVEL:
+            state.level += 1
+            state.experience -= EXPERIENCE_PER_LEVEL
+        if achievement:
+            state.add_achievement(achievement)
+
+        event = Event(
+            event_id=f"{state.player_id}:{reason}",
+            player_id=state.player_id,
+            reason=reason,
+            score=score,
+            experience=experience,
+            level=state.level,
+            achievement=achievement,
+            timestamp=(now or datetime.now()).isoformat(),
+        )
+        with self._lock:
+            self._events += 1
+            self._score += score
+            self._experience += experience
+            self._players[state.player_id] = state.score
+        self._writer.put(event.event_id, event)
+        return event
+
+    def summary(self):
+        """Cohort totals across every player recorded by this process."""
+        with self._lock:
+            scores = list(self._players.values())
+            return {
+                "players": len(scores),
+                "events": self._events,
+                "score": self._score,
+                "experience": self._experience,
+                "mean_score": self._score / len(scores) if scores else 0.0,
+                "top_score": max(scores, default=0),
+                "pending": len(self._writer),
+            }
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
+
+
+# URL scheme -> sink factory taking the part after "scheme://"
+SINK_FACTORIES = {
+    "sqlite": lambda location: SQLiteSink(file_location(location, "ledger.db")),
+    "jsonl": lambda location: JSONLSink(file_location(location, "ledger.jsonl")),
+    "memory": lambda location: MemorySink(),
+}
+
+
+def open_ledger(url=None):
+    """Open a :class:`Ledger` writing to the sink described by ``url``."""
+    return Ledger(open_url(url or DEFAULT_URL, SINK_FACTORIES, "ledger"))
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    """The process-wide ledger at ``DATA_ADVENTURE_LEDGER_URL``, opened on first use."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = open_ledger(os.environ.get("DATA_ADVENTURE_LEDGER_URL"))
+        return _ledger
@@ -0,0 +1,167 @@
+"""Vectorized outlier detection over all numeric columns at once.
+
+:func:`detect_outliers` computes the bounds for every column in one call
+(``df.quantile([0.25, 0.75])`` for IQR), then a boolean outlier matrix and
+per-column counts. Reports are cached per ``(dataset key, filter predicates,
+method)`` so the Analysis Tools and Insights tabs share one computation.
+
+For very large frames the bounds can be estimated from a random sample; the
+outlier matrix is still evaluated on every row. A filtered view is read
+through its row positions, gathering only the checked columns.
+"""
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+from data_adventure.cache import LRUCache
+from data_adventure.filters import normalize_predicates, take_rows
+
+# Method name -> (label, default threshold)
+OUTLIER_METHODS = {
+    "iqr": ("IQR (Q1/Q3 ± k·IQR)", 1.5),
+    "zscore": ("Z-score (mean ± k·std)", 3.0),
+    "mad": ("Median absolute deviation (median ± k·MAD)", 3.5),
+}
+
+# Above this many rows bounds are estimated from a sample unless told otherwise
+APPROX_ROWS = 1_000_000
+SAMPLE_SIZE = 200_000
+
+# Scales the MAD to a standard deviation for normally distributed data
+_MAD_SCALE = 1.4826
+
+_outlier_cache = LRUCache(
+    max_entries=16,
+    max_bytes=512 * 1024**2,
+    sizeof=lambda report: int(report.mask.memory_usage(index=False).sum()),
+)
+
+
+@dataclass(frozen=True)
+class OutlierReport:
+    method: str
+    threshold: float
+    approximate: bool
+    rows: int
+    lower: pd.Series
+    upper: pd.Series
+    counts: pd.Series
+    mask: pd.DataFrame  # True where a value is an outlier, one column per input
+
+    @property
+    def percentage(self):
+        if not self.rows:
+            return self.counts * 0.0
+        return self.counts / self.rows * 100
+
+    @property
+    def most_outliers(self):
+        """Return ``(column, count)`` for the column with the most outliers."""
+        column = self.counts.idxmax()
+        return column, int(self.counts[column])
+
+    def outlier_rows(self, df, column, positions=None):
+        """Return the rows of ``df`` (at ``positions``) flagged in ``column``."""
+        flagged = self.mask[column].to_numpy()
+        if positions is None:
+            return df[flagged]
+        return df.take(positions[flagged])
+
+
+def outlier_bounds(data, method="iqr", threshold=None):
+    """Return ``(lower, upper)`` Series of bounds for every column of ``data``."""
+    if method not in OUTLIER_METHODS:
+        raise ValueError(f"Unknown outlier method: {method!r}")
+    if threshold is None:
+        threshold = OUTLIER_METHODS[method][1]
+
+    if method == "iqr":
+        quartiles = data.quantile([0.25, 0.75])
+        q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+        spread = q3 - q1
+        return q1 - threshold * spread, q3 + threshold * spread
+    if method == "zscore":
+        center, spread = data.mean(), data.std()
+    else:
+        center = data.median()
+        spread = (data - center).abs().median() * _MAD_SCALE
+    return center - threshold * spread, center + threshold * spread
+
+
+def compute_outliers(
+    df, columns, method="iqr", threshold=None, approximate=None, positions=None
+):
+    """Flag outliers in ``columns`` of ``df``, or of its rows at ``positions``.
+
+    ``approximate=None`` samples :data:`SAMPLE_SIZE` rows to estimate the
+    bounds once there are more than :data:`APPROX_ROWS` rows.
+    """
+    if method not in OUTLIER_METHODS:
+        raise ValueError(f"Unknown outlier method: {method!r}")
+    columns = list(columns)
+    if threshold is None:
+        threshold = OUTLIER_METHODS[method][1]
+    data = take_rows(df, positions, columns)
+    if approximate is None:
+        approximate = len(data) > APPROX_ROWS
+    approximate = bool(approximate) and len(data) > SAMPLE_SIZE
+
+    sample = data.sample(n=SAMPLE_SIZE, random_state=0) if approximate else data
+    lower, upper = outlier_bounds(sample, method, threshold)
+
+    # Column by column so mixed int8/float32 data is never upcast as a block
+    mask = {}
+    for col in columns:
+        values = data[col].to_numpy()
+        mask[col] = (values < lower[col]) | (values > upper[col])
+    mask = pd.DataFrame(mask, index=data.index, columns=columns)
+
+    return OutlierReport(
+        method=method,
+        threshold=float(threshold),
+        approximate=approximate,
+        rows=len(data),
+        lower=lower,
+        upper=upper,
+        counts=mask.sum(),
+        mask=mask,
+    )
+
+
+def detect_outliers(
+    df,
+    columns,
+    method="iqr",
+    threshold=None,
+    approximate=None,
+    dataset_key=None,
+    predicates=(),
+    positions=None,
+):
+    """Return the (cached) :class:`OutlierReport` for ``df``.
+
+    ``dataset_key`` and ``predicates`` identify ``df`` as a filtered view of a
+    known dataset; without a key the report is computed and not cached. With
+    ``positions`` (see :func:`data_adventure.filters.select_rows`) ``df`` is
+    the whole dataset and only the rows at those positions are checked.
+    """
+
+    def build():
+        return compute_outliers(df, columns, method, threshold, approximate, positions)
+
+    if dataset_key is None:
+        return build()
+    key = (
+        dataset_key,
+        normalize_predicates(predicates),
+        tuple(columns),
+        method,
+        threshold,
+        approximate,
+    )
+    return _outlier_cache.get_or_create(key, build)
+
+
+def clear_outlier_cache():
+    _outlier_cache.clear()
@@ -0,0 +1,64 @@
+"""Server-side paging for large DataFrame views.
+
+Only the visible window of rows is sliced out and handed to Streamlit, so the
+Arrow payload per rerun depends on the page size, not on the case size. Sort
+orders are computed once per ``(view, column, direction)`` and cached as
+position arrays. A filtered view is paged through its row positions, so only
+the visible rows are ever copied.
+"""
+
+import numpy as np
+
+from data_adventure.cache import LRUCache
+
+PAGE_SIZES = [25, 50, 100, 250, 500]
+# Upper bound on rows shown at once in "load more" mode
+MAX_WINDOW_ROWS = 10_000
+
+_order_cache = LRUCache(
+    max_entries=16, max_bytes=512 * 1024**2, sizeof=lambda order: order.nbytes
+)
+
+
+def page_count(rows, page_size):
+    return max(1, -(-rows // page_size))
+
+
+def sort_order(df, column, ascending=True, view=None, positions=None):
+    """Return row positions of ``df`` (or into ``positions``) sorted by ``column``.
+
+    Missing values always sort last. When ``view`` identifies ``df`` (see
+    :func:`data_adventure.filters.view_key`) the order is cached.
+    """
+
+    def build():
+        values = df[column] if positions is None else df[column].take(positions)
+        ordered = values.reset_index(drop=True).sort_values(
+            ascending=ascending, kind="stable", na_position="last"
+        )
+        dtype = np.int32 if len(values) < np.iinfo(np.int32).max else np.int64
+        return ordered.index.to_numpy(dtype=dtype)
+
+    if view is None:
+        return build()
+    return _order_cache.get_or_create((view, column, ascending), build)
+
+
+def page_window(
+    df, start, stop, sort_by=None, ascending=True, view=None, positions=None
+):
+    """Return rows ``start:stop`` of ``df``, optionally in sorted order.
+
+    With ``positions`` the window is taken from the rows at those positions.
+    """
+    start = max(0, start)
+    stop = min(len(df) if positions is None else len(positions), stop)
+    if sort_by is None:
+        window = slice(start, stop)
+    else:
+        window = sort_order(df, sort_by, ascending, view, positions)[start:stop]
+    return df.iloc[window if positions is None else positions[window]]
+
+
+def clear_order_cache():
+    _order_cache.clear()
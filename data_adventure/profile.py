@@ -0,0 +1,115 @@
+"""Column profiles shared by every Data Lab tab.
+
+A :class:`ColumnProfile` holds the summary statistics the tabs used to
+recompute on their own (``describe``, ``dtypes``, missing counts, min/max for
+slider bounds, column kinds). It is computed once per ``(dataset key, filter
+predicates)`` and cached, so it only changes when the filters do. A filtered
+view is profiled through its row positions, a few columns at a time.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data_adventure.cache import LRUCache
+from data_adventure.filters import normalize_predicates, take_rows
+
+# Categorical columns with fewer distinct values than this get filter widgets
+MAX_FILTER_CATEGORIES = 20
+
+_profile_cache = LRUCache(max_entries=64)
+
+
+@dataclass(frozen=True)
+class ColumnProfile:
+    rows: int
+    dtypes: object  # pd.Series
+    numeric_columns: tuple
+    categorical_columns: tuple
+    missing: object  # pd.Series, missing count per column
+    minimum: object  # pd.Series over numeric columns
+    maximum: object  # pd.Series over numeric columns
+    describe: object  # pd.DataFrame
+    category_values: dict  # low-cardinality column -> values present
+
+    @property
+    def total_missing(self):
+        return int(self.missing.sum())
+
+    @property
+    def missing_percentage(self):
+        if not self.rows:
+            return self.missing * 0.0
+        return self.missing / self.rows * 100
+
+
+def compute_profile(df, positions=None):
+    """Profile ``df``, or its rows at ``positions``, in one pass over its columns.
+
+    A filtered view is never copied whole: the columns ``describe()`` covers
+    are gathered together, the others one at a time.
+    """
+    numeric_columns = tuple(df.select_dtypes(include=[np.number]).columns)
+    categorical_columns = tuple(
+        df.select_dtypes(include=["object", "category"]).columns
+    )
+    rows = len(df) if positions is None else len(positions)
+
+    # The columns describe() picks by default
+    described = df.select_dtypes(include=[np.number, "datetime"]).columns
+    describe = take_rows(
+        df, positions, described if len(described) else None
+    ).describe()
+    if numeric_columns and rows:
+        # describe() already scanned the numeric columns for min/max
+        minimum = describe.loc["min", list(numeric_columns)].astype(float)
+        maximum = describe.loc["max", list(numeric_columns)].astype(float)
+    else:
+        minimum = take_rows(df, positions, numeric_columns).min()
+        maximum = take_rows(df, positions, numeric_columns).max()
+
+    category_values = {}
+    for col in categorical_columns:
+        counts = take_rows(df, positions, [col])[col].value_counts(sort=False)
+        present = counts.index[counts.to_numpy() > 0]
+        if len(present) < MAX_FILTER_CATEGORIES:
+            category_values[col] = list(present)
+
+    if positions is None:
+        missing = df.isna().sum()
+    else:
+        missing = pd.Series(
+            [int(df[col].isna().to_numpy()[positions].sum()) for col in df.columns],
+            index=df.columns,
+            dtype=np.int64,
+        )
+
+    return ColumnProfile(
+        rows=rows,
+        dtypes=df.dtypes,
+        numeric_columns=numeric_columns,
+        categorical_columns=categorical_columns,
+        missing=missing,
+        minimum=minimum,
+        maximum=maximum,
+        describe=describe,
+        category_values=category_values,
+    )
+
+
+def get_profile(df, dataset_key=None, predicates=(), positions=None):
+    """Return the profile of ``df``, the result of ``predicates`` on a dataset.
+
+    ``positions`` are the rows ``predicates`` select (see
+    :func:`data_adventure.filters.select_rows`) when ``df`` is the whole
+    dataset. Without a ``dataset_key`` the profile is computed and not cached.
+    """
+    if dataset_key is None:
+        return compute_profile(df, positions)
+    key = (dataset_key, normalize_predicates(predicates))
+    return _profile_cache.get_or_create(key, lambda: compute_profile(df, positions))
+
+
+def clear_profile_cache():
+    _profile_cache.clear()
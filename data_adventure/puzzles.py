@@ -0,0 +1,288 @@
+"""The Puzzle Room's puzzle bank and per-player puzzle sets.
+
+Puzzles live in a JSON file (:data:`BANK_PATH`, one puzzle per line) that is
+read once per process and cached until the file changes, so reruns never
+touch the disk. The :class:`PuzzleBank` indexes puzzles by kind, difficulty
+and case, and every :class:`Puzzle` keeps its accepted answers normalized in
+a frozenset, so checking an answer is one hash lookup.
+
+Besides the bank, :func:`data_puzzles` writes questions about the player's
+case data from its cached :class:`~data_adventure.profile.ColumnProfile`,
+and :func:`deal` picks one puzzle of each kind per player, seeded by the
+player and case so reruns show the same puzzles.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+from data_adventure.cache import LRUCache
+
+BANK_PATH = os.environ.get(
+    "DATA_ADVENTURE_PUZZLE_BANK",
+    os.path.join(os.path.dirname(__file__), "puzzles.json"),
+)
+
+# Kind -> tab label, reward (score, experience), achievement, success and failure
+# messages; "{answer}" in a failure message is replaced by the expected answer
+PUZZLE_KINDS = {
+    "text": (
+        "📝 Text Puzzle",
+        (50, 20),
+        "Text puzzle solved!",
+        "Correct! The mayor thanks you.",
+        "Try again!",
+    ),
+    "math": (
+        "🔢 Math Challenge",
+        (75, 25),
+        "Math challenge solved!",
+        "Correct! You're a math wizard!",
+        "Try again! The correct answer is {answer}.",
+    ),
+    "logic": (
+        "🎯 Logic Problem",
+        (100, 30),
+        "Logic puzzle solved!",
+        "Correct! Logical thinking is key in data science!",
+        "Think about it logically!",
+    ),
+    "data": (
+        "🔬 Case Data",
+        (100, 40),
+        "Data puzzle solved!",
+        "Correct! You really know your case data.",
+        "Not quite. Check the Data Lab again!",
+    ),
+}
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+# Character Setup offers one more level than the bank has
+DIFFICULTY_ALIASES = {"Expert": "Hard"}
+
+_bank_cache = LRUCache(max_entries=2)
+_data_puzzle_cache = LRUCache(max_entries=256)
+
+
+def normalize_answer(answer, decimals=None):
+    """Canonical form of ``answer``: rounded numbers, or casefolded words.
+
+    With ``decimals`` numbers are compared at that precision, so ``25``,
+    ``"25.0"`` and ``"25"`` are the same answer.
+    """
+    if decimals is not None:
+        try:
+            return (
+                f"{round(float(str(answer).replace(',', '')), decimals):.{decimals}f}"
+            )
+        except ValueError:
+            pass
+    text = re.sub(r"\s+", " ", str(answer)).strip().casefold()
+    return text.rstrip(".!?")
+
+
+@dataclass(frozen=True)
+class Puzzle:
+    puzzle_id: str
+    kind: str  # key of PUZZLE_KINDS
+    difficulty: str
+    case: str  # "" for puzzles that fit any case
+    question: str
+    answer: str  # shown when revealing the answer
+    accepted: frozenset  # normalized accepted answers
+    options: tuple = ()  # choices for multiple-choice puzzles
+    decimals: int = None  # numeric answers are compared at this precision
+
+    def check(self, answer):
+        return normalize_answer(answer, self.decimals) in self.accepted
+
+    @property
+    def label(self):
+        return PUZZLE_KINDS[self.kind][0]
+
+    @property
+    def reward(self):
+        return PUZZLE_KINDS[self.kind][1]
+
+    @property
+    def achievement(self):
+        return PUZZLE_KINDS[self.kind][2]
+
+    @property
+    def success(self):
+        return PUZZLE_KINDS[self.kind][3]
+
+    @property
+    def failure(self):
+        return PUZZLE_KINDS[self.kind][4].format(answer=self.answer)
+
+
+def make_puzzle(
+    puzzle_id,
+    kind,
+    question,
+    answers,
+    difficulty="Medium",
+    case="",
+    options=(),
+    decimals=None,
+):
+    if kind not in PUZZLE_KINDS:
+        raise ValueError(f"Unknown puzzle kind: {kind!r}")
+    if not answers:
+        raise ValueError(f"Puzzle {puzzle_id!r} has no answers")
+    return Puzzle(
+        puzzle_id=puzzle_id,
+        kind=kind,
+        difficulty=difficulty,
+        case=case,
+        question=question,
+        answer=str(answers[0]),
+        accepted=frozenset(normalize_answer(answer, decimals) for answer in answers),
+        options=tuple(options),
+        decimals=decimals,
+    )
+
+
+class PuzzleBank:
+    """Puzzles indexed by id and by ``(kind, difficulty, case)``.
+
+    ``None`` in an index key matches any difficulty or case, so every lookup
+    in :meth:`find` is a single dict access.
+    """
+
+    def __init__(self, puzzles):
+        self.puzzles = {}
+        index = defaultdict(list)
+        for puzzle in puzzles:
+            if puzzle.puzzle_id in self.puzzles:
+                raise ValueError(f"Duplicate puzzle id: {puzzle.puzzle_id!r}")
+            self.puzzles[puzzle.puzzle_id] = puzzle
+            for difficulty in (puzzle.difficulty, None):
+                for case in (puzzle.case, None):
+                    index[(puzzle.kind, difficulty, case)].append(puzzle)
+        self._index = {key: tuple(found) for key, found in index.items()}
+
+    def __len__(self):
+        return len(self.puzzles)
+
+    def __getitem__(self, puzzle_id):
+        return self.puzzles[puzzle_id]
+
+    def find(self, kind, difficulty=None, case=None):
+        """Puzzles of ``kind``, optionally only one difficulty and/or case."""
+        return self._index.get((kind, difficulty, case), ())
+
+    def candidates(self, kind, difficulty, case):
+        """Puzzles for ``case`` and general ones at ``difficulty``, widening if none."""
+        difficulty = DIFFICULTY_ALIASES.get(difficulty, difficulty)
+        found = self.find(kind, difficulty, case) + self.find(kind, difficulty, "")
+        return found or self.find(kind)
+
+
+def read_bank(path):
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)["puzzles"]
+    return PuzzleBank(
+        make_puzzle(
+            entry["id"],
+            entry["kind"],
+            entry["question"],
+            entry["answers"],
+            difficulty=entry.get("difficulty", "Medium"),
+            case=entry.get("case", ""),
+            options=entry.get("options", ()),
+            decimals=entry.get("decimals"),
+        )
+        for entry in entries
+    )
+
+
+def puzzle_bank(path=None):
+    """Return the :class:`PuzzleBank` at ``path``, read once until it changes."""
+    path = path or BANK_PATH
+    key = (path, os.stat(path).st_mtime_ns)
+    return _bank_cache.get_or_create(key, lambda: read_bank(path))
+
+
+def data_puzzles(data):
+    """Numeric questions about ``data`` (a :class:`~data_adventure.game.CaseData`).
+
+    Answers come from the cached column profile, so this costs no pass over
+    the rows; the puzzles are cached per dataset view.
+    """
+
+    def build():
+        profile = data.profile
+        prefix = "data-" + hashlib.sha1(repr(data.view).encode()).hexdigest()[:8]
+        puzzles = [
+            make_puzzle(
+                f"{prefix}-rows",
+                "data",
+                "How many rows does your case data have?",
+                [profile.rows],
+                decimals=0,
+            )
+        ]
+        for col in profile.numeric_columns:
+            if profile.missing[col]:
+                puzzles.append(
+                    make_puzzle(
+                        f"{prefix}-missing-{col}",
+                        "data",
+                        f"How many values are missing in **{col}**?",
+                        [int(profile.missing[col])],
+                        decimals=0,
+                    )
+                )
+            if profile.rows > profile.missing[col]:
+                mean = profile.describe.loc["mean", col]
+                puzzles.append(
+                    make_puzzle(
+                        f"{prefix}-mean-{col}",
+                        "data",
+                        f"What is the mean of **{col}**, rounded to 1 decimal?",
+                        [f"{mean:.1f}"],
+                        decimals=1,
+                    )
+                )
+                puzzles.append(
+                    make_puzzle(
+                        f"{prefix}-max-{col}",
+                        "data",
+                        f"What is the largest **{col}** value, "
+                        "rounded to a whole number?",
+                        [f"{profile.maximum[col]:.0f}"],
+                        decimals=0,
+                    )
+                )
+        return tuple(puzzles)
+
+    return _data_puzzle_cache.get_or_create(data.view, build)
+
+
+def deal(player_id, case, difficulty, data=None, bank=None):
+    """Pick one puzzle of each kind for a player; same inputs, same puzzles.
+
+    Returns ``{kind: Puzzle}``; the "data" kind is only dealt with ``data``.
+    """
+    bank = bank or puzzle_bank()
+    rng = random.Random(f"{player_id}:{case}")
+    dealt = {}
+    for kind in PUZZLE_KINDS:
+        if kind == "data":
+            found = data_puzzles(data) if data is not None else ()
+        else:
+            found = bank.candidates(kind, difficulty, case)
+        if found:
+            dealt[kind] = rng.choice(found)
+    return dealt
+
+
+def clear_puzzle_cache():
+    _bank_cache.clear()
+    _data_puzzle_cache.clear()
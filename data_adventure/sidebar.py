@@ -0,0 +1,78 @@
+"""HTML for the game sidebar, rendered as one element per rerun.
+
+Stats, inventory and achievements used to be a dozen Streamlit elements (one
+``st.metric`` per stat, one ``st.markdown`` per achievement). They are now
+joined into a single HTML block styled by the app's CSS. The inventory and
+achievement sections are cached by their contents, so reruns that leave them
+unchanged reuse the built HTML and only the stats are formatted again.
+"""
+
+import html
+
+from data_adventure.cache import LRUCache
+from data_adventure.game import elapsed_seconds
+from data_adventure.ledger import EXPERIENCE_PER_LEVEL
+
+_section_cache = LRUCache(max_entries=1024)
+
+
+def stats_html(level, score, experience, elapsed=None):
+    """Experience bar plus the level, score, experience and timer tiles."""
+    filled = min(100, round(100 * experience / EXPERIENCE_PER_LEVEL))
+    stats = [
+        ("Level", level),
+        ("Score", score),
+        ("Experience", f"{experience}/{EXPERIENCE_PER_LEVEL}"),
+    ]
+    if elapsed is not None:
+        stats.append(("Time Elapsed", f"{elapsed // 60}m {elapsed % 60}s"))
+    tiles = "".join(
+        f'<div class="stat"><span>{label}</span><b>{value}</b></div>'
+        for label, value in stats
+    )
+    return (
+        "<h2>🎮 Game Stats</h2>"
+        f'<div class="xp-bar"><div style="width: {filled}%"></div></div>'
+        f'<div class="stat-grid">{tiles}</div>'
+    )
+
+
+def inventory_html(inventory):
+    inventory = tuple(inventory)
+    if not inventory:
+        return ""
+
+    def build():
+        items = "".join(f"<li>{html.escape(str(item))}</li>" for item in inventory)
+        return f"<h2>🎒 Inventory</h2><ul>{items}</ul>"
+
+    return _section_cache.get_or_create(("inventory", inventory), build)
+
+
+def achievements_html(achievements):
+    achievements = tuple(achievements)
+    if not achievements:
+        return ""
+
+    def build():
+        cards = "".join(
+            f'<div class="achievement-card">🏅 {html.escape(achievement)}</div>'
+            for achievement in achievements
+        )
+        return f"<h2>🏆 Achievements</h2>{cards}"
+
+    return _section_cache.get_or_create(("achievements", achievements), build)
+
+
+def sidebar_html(state, now=None):
+    """Return the whole sidebar (except the avatar image) for ``state``."""
+    elapsed = (
+        None if state.progress == "character_setup" else elapsed_seconds(state, now)
+    )
+    return (
+        '<div class="game-sidebar">'
+        + stats_html(state.level, state.score, state.experience, elapsed)
+        + inventory_html(state.inventory)
+        + achievements_html(state.achievements)
+        + "</div>"
+    )
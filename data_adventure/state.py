@@ -0,0 +1,140 @@
+"""Per-player game state with a fixed set of fields and bounded growth.
+
+Each Streamlit session keeps one :class:`PlayerState` under
+``st.session_state.player`` instead of a dozen loose keys. The class uses
+``__slots__`` so an instance carries no per-object ``__dict__``, achievements
+are de-duplicated (picking the same case twice records it once) and saved
+analyses live in a ring buffer of :data:`MAX_SAVED_ANALYSES` entries.
+
+:func:`memory_report` sizes every live player state, which is what limits how
+many concurrent sessions a server can hold.
+"""
+
+import sys
+import uuid
+import weakref
+from collections import deque
+from datetime import datetime
+
+MAX_SAVED_ANALYSES = 20
+
+# Every PlayerState still referenced by a session
+_live_states = weakref.WeakSet()
+
+
+class PlayerState:
+    """Everything the game remembers about one detective."""
+
+    __slots__ = (
+        "player_id",
+        "progress",
+        "name",
+        "specialty",
+        "case",
+        "score",
+        "level",
+        "experience",
+        "avatar",
+        "skills",
+        "inventory",
+        "completed_challenges",
+        "saved_analyses",
+        "start_time",
+        "preferences",
+        "puzzles",
+        "awarded",
+        "celebrated_level",
+        "_achievements",
+        "__weakref__",
+    )
+
+    def __init__(self, **fields):
+        self.player_id = uuid.uuid4().hex
+        self.progress = "character_setup"
+        self.name = ""
+        self.specialty = ""
+        self.case = ""
+        self.score = 0
+        self.level = 1
+        self.experience = 0
+        self.avatar = None  # data_adventure.avatar.Avatar thumbnail
+        self.skills = {}
+        self.inventory = []
+        self.completed_challenges = []
+        self.saved_analyses = deque(maxlen=MAX_SAVED_ANALYSES)
+        self.start_time = datetime.now()
+        # Character Setup choices (theme color, difficulty, sound, ...)
+        self.preferences = {}
+        # Puzzle kind -> the shared data_adventure.puzzles.Puzzle dealt to this player
+        self.puzzles = {}
+        # Reasons already awarded (see data_adventure.ledger), so none pays twice
+        self.awarded = set()
+        self.celebrated_level = 1
+        # A dict keeps achievements unique and in the order they were earned
+        self._achievements = {}
+        for key, value in fields.items():
+            setattr(self, key, value)
+        _live_states.add(self)
+
+    @property
+    def achievements(self):
+        return tuple(self._achievements)
+
+    @achievements.setter
+    def achievements(self, achievements):
+        self._achievements = dict.fromkeys(achievements)
+
+    def add_achievement(self, achievement):
+        """Record ``achievement``; returns ``False`` if it was already earned."""
+        if achievement in self._achievements:
+            return False
+        self._achievements[achievement] = None
+        return True
+
+    def nbytes(self):
+        """Approximate memory held by this state, including its containers."""
+        return deep_sizeof(self)
+
+    def memory_breakdown(self):
+        """Return ``{field: bytes}`` for the fields of this state."""
+        seen = {id(self)}
+        return {
+            name.lstrip("_"): deep_sizeof(getattr(self, name), seen)
+            for name in self.__slots__
+            if name != "__weakref__"
+        }
+
+
+def deep_sizeof(obj, seen=None):
+    """``sys.getsizeof`` of ``obj`` plus everything it contains (each object once)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, PlayerState):
+        for name in obj.__slots__:
+            if name != "__weakref__":
+                size += deep_sizeof(getattr(obj, name), seen)
+    elif hasattr(obj, "__dict__"):
+        # e.g. the dataclass holding the avatar thumbnail
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def memory_report():
+    """A ``{"player", "name", "stage", "bytes"}`` row per live state, largest first."""
+    rows = [
+        {
+            "player": state.player_id,
+            "name": state.name,
+            "stage": state.progress,
+            "bytes": state.nbytes(),
+        }
+        for state in list(_live_states)
+    ]
+    return sorted(rows, key=lambda row: row["bytes"], reverse=True)
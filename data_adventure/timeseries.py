@@ -0,0 +1,427 @@
+"""Vectorized time-series analysis for the Trend Analyzer case.
+
+Everything here is O(n) NumPy work, so multi-year minute-level series (tens of
+millions of rows) are analyzed without Python loops:
+
+* :func:`rolling_mean` and :func:`rolling_std` use cumulative sums instead of
+  re-summing every window;
+* :func:`resample` aggregates onto a coarser clock (daily to weekly...);
+* :func:`fit_trend` fits a least-squares polynomial over time, in closed form
+  for straight lines so no ``n x 2`` design matrix is built;
+* :func:`decompose` splits a regular series into trend, seasonal profile and
+  residual (classical additive decomposition); :func:`regular_grid` first
+  puts a gappy (e.g. filtered) series back on its clock, gaps as NaN;
+* :func:`forecast` extends the trend and seasonal profile into the future.
+
+:func:`analyze_series` and :func:`resample_series` cache their results per
+``(dataset key, filter predicates, columns...)`` like the other Data Lab
+engines, so the Insights tab and the Trend tool share one computation. A
+filtered view is read through its row positions.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from data_adventure.cache import LRUCache
+from data_adventure.filters import normalize_predicates, take_rows
+
+# Name -> pandas offset alias; "auto" picks the finest that fits MAX_POINTS
+RESAMPLE_RULES = {"none": None, "hour": "h", "day": "D", "week": "W", "month": "MS"}
+_RULE_LENGTHS = {"hour": "1h", "day": "1D", "week": "7D", "month": "31D"}
+RESAMPLE_AGGREGATIONS = ["mean", "sum", "min", "max"]
+MAX_POINTS = 2_000
+
+# Decomposition is skipped when the regular grid would be mostly gaps
+MAX_GRID_SLOTS_PER_SAMPLE = 10
+
+# Seasonal cycles tried longest first; decomposing needs two full cycles
+SEASONAL_PERIODS = {
+    "yearly": pd.Timedelta(days=365),
+    "weekly": pd.Timedelta(days=7),
+    "daily": pd.Timedelta(days=1),
+}
+
+
+def _result_nbytes(value):
+    if value is None:
+        return 0
+    if isinstance(value, TrendReport):
+        return value.nbytes
+    return int(value.memory_usage(index=True))
+
+
+_series_cache = LRUCache(max_entries=32, max_bytes=512 * 1024**2, sizeof=_result_nbytes)
+
+
+@dataclass(frozen=True)
+class TrendFit:
+    """Least-squares polynomial ``y = polyval(coefficients, x)``."""
+
+    coefficients: np.ndarray  # highest power first, as ``np.polyfit``
+    r_squared: float
+
+    @property
+    def slope(self):
+        return float(self.coefficients[-2]) if len(self.coefficients) > 1 else 0.0
+
+    def predict(self, x):
+        return np.polyval(self.coefficients, x)
+
+
+@dataclass(frozen=True)
+class Decomposition:
+    period: int  # samples per cycle
+    trend: np.ndarray  # centered moving average, NaN for half a cycle at each end
+    profile: np.ndarray  # seasonal offset for each of the ``period`` phases
+    residual: np.ndarray
+    strength: float  # share of the detrended variance explained by the season
+
+    @property
+    def seasonal(self):
+        return self.profile[np.arange(len(self.trend)) % self.period]
+
+    @property
+    def nbytes(self):
+        return self.trend.nbytes + self.profile.nbytes + self.residual.nbytes
+
+
+@dataclass(frozen=True)
+class TrendReport:
+    column: str
+    rows: int
+    start: pd.Timestamp
+    end: pd.Timestamp
+    spacing: pd.Timedelta  # median time between samples
+    fit: TrendFit  # over time in days since ``start``
+    season: str = None  # key of SEASONAL_PERIODS, or None
+    decomposition: Decomposition = None
+
+    @property
+    def direction(self):
+        if self.fit.slope > 0:
+            return "increasing"
+        return "decreasing" if self.fit.slope < 0 else "flat"
+
+    @property
+    def days(self):
+        return (self.end - self.start) / pd.Timedelta(days=1)
+
+    @property
+    def total_change(self):
+        return self.fit.slope * self.days
+
+    @property
+    def nbytes(self):
+        return self.decomposition.nbytes if self.decomposition is not None else 0
+
+
+def _window_sums(values, window, squares=False):
+    """Sums of the finite values (and their squares) in each trailing window."""
+    values = np.asarray(values, dtype=np.float64)
+    present = np.isfinite(values)
+    # Shifting by the mean keeps the cumulative sums small and accurate
+    shift = float(values[present].mean()) if present.any() else 0.0
+    centered = np.where(present, values - shift, 0.0)
+
+    def window_sum(x):
+        total = np.cumsum(x)
+        total[window:] -= total[:-window].copy()
+        return total
+
+    counts = window_sum(present.astype(np.float64))
+    sums = window_sum(centered)
+    return shift, counts, sums, window_sum(centered * centered) if squares else None
+
+
+def rolling_mean(values, window, min_periods=None):
+    """Trailing mean over ``window`` samples; NaNs are skipped like pandas.
+
+    Windows with fewer than ``min_periods`` (default ``window``) finite values
+    are NaN.
+    """
+    if window < 1:
+        raise ValueError(f"window must be at least 1, got {window}")
+    min_periods = window if min_periods is None else max(1, min_periods)
+    shift, counts, sums, _ = _window_sums(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = shift + sums / counts
+    mean[counts < min_periods] = np.nan
+    return mean
+
+
+def rolling_std(values, window, min_periods=None):
+    """Trailing sample standard deviation (``ddof=1``) over ``window`` samples."""
+    if window < 1:
+        raise ValueError(f"window must be at least 1, got {window}")
+    min_periods = window if min_periods is None else max(1, min_periods)
+    _, counts, sums, squares = _window_sums(values, window, squares=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = (squares - sums * sums / counts) / (counts - 1)
+    std = np.sqrt(np.clip(variance, 0.0, None))
+    std[(counts < min_periods) | (counts < 2)] = np.nan
+    return std
+
+
+def centered_mean(values, window):
+    """Moving average centered on each sample (a 2 x ``window`` MA if even)."""
+    values = np.asarray(values, dtype=np.float64)
+    min_periods = window // 2 + 1
+    mean = rolling_mean(values, window, min_periods)
+    mean[: window - 1] = np.nan
+    if window % 2 == 0:
+        # Averaging neighbouring windows centers an even window on a sample
+        mean = rolling_mean(mean, 2)
+    half = window // 2
+    centered = np.full(len(values), np.nan)
+    if half < len(values):
+        centered[: len(values) - half] = mean[half:]
+    return centered
+
+
+def resample(times, values, rule, how="mean"):
+    """Aggregate ``values`` at ``times`` onto the ``rule`` clock (e.g. ``"W"``)."""
+    if how not in RESAMPLE_AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation: {how!r}")
+    series = pd.Series(values, index=pd.DatetimeIndex(times))
+    return series.resample(rule).agg(how)
+
+
+def auto_rule(rows, start, end, max_points=MAX_POINTS):
+    """Finest entry of :data:`RESAMPLE_RULES` giving at most ``max_points`` points."""
+    if rows <= max_points:
+        return "none"
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for name, length in _RULE_LENGTHS.items():
+        if span / pd.Timedelta(length) <= max_points:
+            return name
+    return "month"
+
+
+def fit_trend(x, y, degree=1):
+    """Least-squares polynomial of ``y`` over ``x``, ignoring non-finite pairs."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = np.isfinite(x) & np.isfinite(y)
+    if not keep.all():
+        x, y = x[keep], y[keep]
+    if len(x) <= degree:
+        return TrendFit(np.zeros(degree + 1), float("nan"))
+
+    if degree == 1:
+        # Normal equations for a line: O(n) and no design matrix
+        x_mean, y_mean = x.mean(), y.mean()
+        dx = x - x_mean
+        spread = float(dx @ dx)
+        slope = float(dx @ (y - y_mean)) / spread if spread else 0.0
+        coefficients = np.array([slope, y_mean - slope * x_mean])
+    else:
+        coefficients = np.polyfit(x, y, degree)
+
+    residual = y - np.polyval(coefficients, x)
+    total = y - y.mean()
+    total_ss = float(total @ total)
+    r_squared = 1 - float(residual @ residual) / total_ss if total_ss else float("nan")
+    return TrendFit(coefficients, r_squared)
+
+
+def decompose(values, period):
+    """Classical additive decomposition of a regular series with ``period``."""
+    values = np.asarray(values, dtype=np.float64)
+    if period < 2 or len(values) < 2 * period:
+        raise ValueError(
+            f"Need at least two cycles of {period} samples, got {len(values)}"
+        )
+    trend = centered_mean(values, period)
+    detrended = values - trend
+
+    # Mean detrended value per phase, in one bincount pass
+    phase = np.arange(len(values)) % period
+    present = np.isfinite(detrended)
+    sums = np.bincount(
+        phase, weights=np.where(present, detrended, 0.0), minlength=period
+    )
+    counts = np.bincount(phase, weights=present, minlength=period)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        profile = sums / counts
+    profile = np.nan_to_num(profile - np.nanmean(profile))
+
+    seasonal = profile[phase]
+    residual = detrended - seasonal
+    with np.errstate(invalid="ignore"):
+        strength = 1 - np.nanvar(residual) / np.nanvar(detrended)
+    strength = float(np.clip(np.nan_to_num(strength), 0.0, 1.0))
+    # float32 halves what a cached multi-million-row decomposition holds
+    return Decomposition(
+        period=period,
+        trend=trend.astype(np.float32),
+        profile=profile,
+        residual=residual.astype(np.float32),
+        strength=strength,
+    )
+
+
+def regular_grid(times, values, spacing):
+    """Place ``values`` on a clock of ``spacing`` starting at ``times[0]``.
+
+    ``times`` must be sorted. Samples falling in the same slot are averaged
+    and empty slots are NaN, so every sample keeps its phase in the cycle.
+    """
+    elapsed = (times - times[0]) / np.asarray(spacing.to_timedelta64())
+    slots = np.round(elapsed).astype(np.int64)
+    size = int(slots[-1]) + 1
+    present = np.isfinite(values)
+    sums = np.bincount(slots, weights=np.where(present, values, 0.0), minlength=size)
+    counts = np.bincount(slots, weights=present, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def seasonal_period(rows, spacing):
+    """Longest :data:`SEASONAL_PERIODS` cycle with two full cycles in ``rows``.
+
+    Returns ``(name, samples per cycle)`` or ``(None, None)``.
+    """
+    if spacing <= pd.Timedelta(0):
+        return None, None
+    for name, length in SEASONAL_PERIODS.items():
+        period = int(round(length / spacing))
+        if period >= 2 and rows >= 2 * period:
+            return name, period
+    return None, None
+
+
+def time_columns(df):
+    """Names of the datetime columns of ``df``."""
+    return tuple(df.select_dtypes(include=["datetime", "datetimetz"]).columns)
+
+
+def median_spacing(times):
+    """Typical time between samples, from (at most) the first 10,000 gaps."""
+    if len(times) < 2:
+        return pd.Timedelta(0)
+    steps = np.diff(np.asarray(times[:10_001], dtype="datetime64[ns]")).astype(np.int64)
+    return pd.Timedelta(int(np.median(steps)), unit="ns")
+
+
+def series_arrays(df, time_col, value_col, positions=None):
+    """Return ``(times, values)`` sorted by time, without missing timestamps.
+
+    With ``positions`` only those rows of ``df`` are read.
+    """
+    if positions is not None:
+        df = take_rows(df, positions, [time_col, value_col])
+    times = df[time_col].to_numpy(dtype="datetime64[ns]")
+    values = df[value_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnat(times)
+    if not valid.all():
+        times, values = times[valid], values[valid]
+    if len(times) > 1 and (np.diff(times) < np.timedelta64(0)).any():
+        order = np.argsort(times, kind="stable")
+        times, values = times[order], values[order]
+    return times, values
+
+
+def compute_trend(df, time_col, value_col, positions=None):
+    times, values = series_arrays(df, time_col, value_col, positions)
+    if not len(times):
+        return None
+    start, end = pd.Timestamp(times[0]), pd.Timestamp(times[-1])
+    spacing = median_spacing(times)
+    days = (times - times[0]) / np.timedelta64(1, "D")
+    fit = fit_trend(days, values)
+
+    # Decomposition counts cycles in samples, so a filtered series with gaps
+    # is first put back on its clock; the gaps stay NaN
+    season = decomposition = None
+    if spacing > pd.Timedelta(0):
+        slots = (end - start) / spacing + 1
+        if slots <= MAX_GRID_SLOTS_PER_SAMPLE * len(values):
+            season, period = seasonal_period(int(round(slots)), spacing)
+    if season:
+        grid = regular_grid(times, values, spacing)
+        decomposition = decompose(grid, period)
+    return TrendReport(
+        column=value_col,
+        rows=len(values),
+        start=start,
+        end=end,
+        spacing=spacing,
+        fit=fit,
+        season=season,
+        decomposition=decomposition,
+    )
+
+
+def _cached(dataset_key, predicates, key, build):
+    if dataset_key is None:
+        return build()
+    key = (dataset_key, normalize_predicates(predicates)) + key
+    return _series_cache.get_or_create(key, build)
+
+
+def analyze_series(
+    df, time_col, value_col, dataset_key=None, predicates=(), positions=None
+):
+    """Return the (cached) :class:`TrendReport` for ``value_col`` over ``time_col``.
+
+    ``None`` when there are no timestamps. ``dataset_key``, ``predicates`` and
+    ``positions`` identify the rows of ``df`` to read, as in
+    :func:`data_adventure.outliers.detect_outliers`.
+    """
+    return _cached(
+        dataset_key,
+        predicates,
+        ("trend", time_col, value_col),
+        lambda: compute_trend(df, time_col, value_col, positions),
+    )
+
+
+def resample_series(
+    df,
+    time_col,
+    value_col,
+    rule="auto",
+    how="mean",
+    dataset_key=None,
+    predicates=(),
+    positions=None,
+):
+    """Return ``value_col`` resampled onto a :data:`RESAMPLE_RULES` clock (cached)."""
+
+    def build():
+        times, values = series_arrays(df, time_col, value_col, positions)
+        name = rule
+        if name == "auto":
+            name = auto_rule(len(times), times[0], times[-1]) if len(times) else "none"
+        if RESAMPLE_RULES[name] is None:
+            return pd.Series(values, index=pd.DatetimeIndex(times), name=value_col)
+        return resample(times, values, RESAMPLE_RULES[name], how).rename(value_col)
+
+    return _cached(
+        dataset_key, predicates, ("resample", time_col, value_col, rule, how), build
+    )
+
+
+def forecast(report, periods, step=None):
+    """Extend ``report``'s trend and seasonal profile ``periods`` steps ahead.
+
+    ``step`` defaults to the series' own sample spacing; pass e.g. a week to
+    forecast a weekly-resampled view. Returns a ``pd.Series`` by timestamp.
+    """
+    step = pd.Timedelta(step) if step is not None else report.spacing
+    if step <= pd.Timedelta(0):
+        return pd.Series(dtype=np.float64)
+    future = pd.date_range(report.end + step, periods=periods, freq=step)
+    elapsed = (future - report.start).to_numpy()
+    values = report.fit.predict(elapsed / np.timedelta64(1, "D"))
+    decomposition = report.decomposition
+    if decomposition is not None:
+        samples = np.round(elapsed / report.spacing.to_timedelta64()).astype(np.int64)
+        values = values + decomposition.profile[samples % decomposition.period]
+    return pd.Series(values, index=future, name=report.column)
+
+
+def clear_series_cache():
+    _series_cache.clear()
@@ -1,11 +1,17 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
-import time
+import os
+
+from data_adventure import game, instrumentation
+from data_adventure.instrumentation import timed
+from data_adventure.sidebar import sidebar_html
+
+# pandas, Plotly and the Data Lab engine are imported by the stage that uses
+# them (Python keeps them in sys.modules afterwards), so a fresh server process
+# can paint Character Setup without loading them.
+
+LEADERBOARD_SIZE = 50
 
 # Page configuration
 st.set_page_config(
@@ -33,6 +39,34 @@ st.markdown("""
         color: white;
         margin: 0.5rem 0;
     }
+    .game-sidebar h2 {
+        font-size: 1.3rem;
+        margin: 1rem 0 0.5rem;
+    }
+    .xp-bar {
+        background: #e6e8f0;
+        border-radius: 4px;
+        height: 8px;
+        overflow: hidden;
+    }
+    .xp-bar div {
+        background: #667eea;
+        height: 100%;
+    }
+    .stat-grid {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 0.5rem;
+        margin-top: 0.75rem;
+    }
+    .stat span {
+        display: block;
+        font-size: 0.8rem;
+        opacity: 0.7;
+    }
+    .stat b {
+        font-size: 1.4rem;
+    }
     .metric-card {
         background: #f0f2f6;
         padding: 1rem;
@@ -49,67 +83,147 @@ st.markdown(
     "Complete each challenge to unlock the next stage of your adventure."
 )
 
-# Initialize session state for game progress
-if 'progress' not in st.session_state:
-    st.session_state.progress = "character_setup"
-if 'achievements' not in st.session_state:
-    st.session_state.achievements = []
-if 'avatar' not in st.session_state:
-    st.session_state.avatar = None
-if 'name' not in st.session_state:
-    st.session_state.name = ""
-if 'specialty' not in st.session_state:
-    st.session_state.specialty = ""
-if 'case' not in st.session_state:
-    st.session_state.case = ""
-if 'leaderboard' not in st.session_state:
-    st.session_state.leaderboard = []
-if 'score' not in st.session_state:
-    st.session_state.score = 0
-if 'level' not in st.session_state:
-    st.session_state.level = 1
-if 'experience' not in st.session_state:
-    st.session_state.experience = 0
-if 'inventory' not in st.session_state:
-    st.session_state.inventory = []
-if 'completed_challenges' not in st.session_state:
-    st.session_state.completed_challenges = []
-if 'start_time' not in st.session_state:
-    st.session_state.start_time = datetime.now()
+# All game progress lives in one PlayerState per session
+player = game.player_state(st.session_state)
+
+# Opt-in rerun timing (DATA_ADVENTURE_PROFILE=1), see data_adventure.instrumentation
+instrumentation.recorder.begin_rerun(player.player_id, player.progress)
+
+# Fragments rerun on their own when one of their widgets changes: st.fragment
+# from Streamlit 1.37, st.experimental_fragment from 1.33. Older versions
+# simply rerun the whole page.
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+
+@st.cache_resource
+def get_leaderboard():
+    """One leaderboard store per server process, shared by every session."""
+    from data_adventure.leaderboard import open_leaderboard
+    
+    return open_leaderboard(os.environ.get("DATA_ADVENTURE_LEADERBOARD_URL"))
+
+
+def show_paginated_dataframe(df, key, view=None):
+    """Show ``df`` one page at a time; only the visible rows are sent to the browser."""
+    from data_adventure.pagination import MAX_WINDOW_ROWS, PAGE_SIZES, page_count, page_window
+    
+    ctrl1, ctrl2, ctrl3 = st.columns([2, 1, 1])
+    with ctrl1:
+        sort_by = st.selectbox("Sort by", ['(none)'] + list(df.columns), key=f"{key}_sort")
+    with ctrl2:
+        ascending = st.checkbox("Ascending", value=True, key=f"{key}_ascending")
+    with ctrl3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_page_size")
+    load_more = st.checkbox("Load more mode", key=f"{key}_load_more",
+                            help=f"Grow the table page by page, up to {MAX_WINDOW_ROWS:,} rows")
+    sort_by = None if sort_by == '(none)' else sort_by
+    
+    if load_more:
+        loaded = st.session_state.get(f"{key}_loaded", page_size)
+        start, stop = 0, min(loaded, MAX_WINDOW_ROWS, len(df))
+    else:
+        pages = page_count(len(df), page_size)
+        # The page count is part of the key so the widget resets when it changes
+        page = st.number_input(f"Page (of {pages:,})", 1, pages, 1, key=f"{key}_page_{pages}")
+        start = (page - 1) * page_size
+        stop = min(start + page_size, len(df))
+    
+    with timed("st.dataframe"):
+        st.dataframe(page_window(df, start, stop, sort_by, ascending, view), use_container_width=True)
+    if stop > start:
+        st.caption(f"Rows {start + 1:,}–{stop:,} of {len(df):,}")
+    else:
+        st.caption("No rows to show.")
+    
+    if load_more and stop < min(len(df), MAX_WINDOW_ROWS):
+        # A callback instead of st.rerun(), which would rerun the whole page
+        # even when the table sits in a fragment
+        st.button("Load more", key=f"{key}_more", on_click=st.session_state.__setitem__,
+                  args=(f"{key}_loaded", stop + page_size))
+
+
+# Paging and sorting rerun only the table
+paginated_table = fragment(show_paginated_dataframe)
 
-# Sidebar navigation and stats
-with st.sidebar:
-    st.header("🎮 Game Stats")
-    
-    # Progress bar for level
-    st.progress(st.session_state.experience / 100)
-    st.metric("Level", st.session_state.level)
-    st.metric("Score", st.session_state.score)
-    st.metric("Experience", f"{st.session_state.experience}/100")
-    
-    # Timer
-    if st.session_state.progress != "character_setup":
-        elapsed_time = datetime.now() - st.session_state.start_time
-        st.metric("Time Elapsed", f"{elapsed_time.seconds//60}m {elapsed_time.seconds%60}s")
-    
-    # Inventory
-    if st.session_state.inventory:
-        st.header("🎒 Inventory")
-        for item in st.session_state.inventory:
-            st.write(f"• {item}")
-    
-    # Achievements
-    if st.session_state.achievements:
-        st.header("🏆 Achievements")
-        for achievement in st.session_state.achievements:
-            st.markdown(f'<div class="achievement-card">🏅 {achievement}</div>', unsafe_allow_html=True)
-    
-    # Avatar display
-    if st.session_state.get('avatar'):
-        st.image(st.session_state.avatar, caption=f"{st.session_state.name}'s avatar", width=150)
+
+def show_puzzle_result(correct, message):
+    if correct:
+        st.success(message)
+        st.balloons()
+    else:
+        st.error(message)
+
+
+def get_query_param(name):
+    # st.query_params replaced st.experimental_get_query_params in Streamlit 1.30
+    if hasattr(st, 'query_params'):
+        return st.query_params.get(name)
+    values = st.experimental_get_query_params().get(name)
+    return values[0] if values else None
+
+
+def show_admin_panel():
+    """Rerun timings for operators; only shown with profiling on and ``?admin=<token>``."""
+    import pandas as pd
+    from data_adventure.cases import format_bytes
+    from data_adventure.charts import figure_cache_stats
+    from data_adventure.ledger import get_ledger
+    from data_adventure.state import memory_report
+    
+    recorder = instrumentation.recorder
+    with st.sidebar.expander("⏱️ Performance (admin)"):
+        scope = st.selectbox("Scope", ['All sessions', 'This session', 'Pick a session'],
+                             key="admin_scope")
+        session_id = None
+        if scope == 'This session':
+            session_id = player.player_id
+        elif scope == 'Pick a session':
+            session_id = st.selectbox("Session", recorder.sessions(), key="admin_session")
+        
+        summary = recorder.summary(session_id)
+        if summary:
+            st.dataframe(pd.DataFrame(summary), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No reruns recorded yet.")
+        
+        cache = figure_cache_stats()
+        st.caption(f"Figure cache: {cache['entries']} figures · {cache['hits']} hits / "
+                   f"{cache['misses']} misses")
+        
+        # Session memory is what limits concurrent sessions per server
+        sessions = memory_report()
+        st.caption(f"Player state: {len(sessions)} sessions · "
+                   f"{format_bytes(sum(row['bytes'] for row in sessions))} total · "
+                   f"this session {format_bytes(player.nbytes())}")
+        if st.checkbox("Show per-session memory", key="admin_memory"):
+            st.dataframe(pd.DataFrame(sessions), use_container_width=True, hide_index=True)
+            st.json({field: format_bytes(size) for field, size in player.memory_breakdown().items()})
+        
+        # Cohort totals are kept up to date by the ledger, not summed from sessions
+        cohort = get_ledger().summary()
+        st.caption(f"Scoring ledger: {cohort['players']} players · {cohort['events']} awards · "
+                   f"mean score {cohort['mean_score']:.0f} · top {cohort['top_score']} · "
+                   f"{cohort['pending']} waiting to be written")
+        
+        for record, trace in reversed(recorder.slow_reruns()):
+            st.markdown(f"**{record['stage']}** rerun took {record['total_ms']:.0f} ms")
+            st.code(trace, language=None)
+        
+        st.download_button("Download rerun log (JSONL)", recorder.export_jsonl(),
+                           file_name="reruns.jsonl", mime="application/jsonl")
+
+# Sidebar: stats, inventory and achievements in one element, then the avatar
+with st.sidebar, timed("sidebar"):
+    st.markdown(sidebar_html(player), unsafe_allow_html=True)
+    
+    if player.avatar:
+        st.image(player.avatar.data, caption=f"{player.name}'s avatar", width=150)
 
 ### Character Setup
-if st.session_state.progress == "character_setup":
+if player.progress == "character_setup":
+    from data_adventure.avatar import AvatarError, load_avatar
+    from data_adventure.charts import cached_figure, skills_figure
+    
     st.header("👤 Character Setup")
     
     # Create tabs for different setup sections
@@ -121,24 +235,28 @@ if st.session_state.progress == "character_setup":
         with col1:
             uploaded_avatar = st.file_uploader("Upload your avatar", type=['png', 'jpg', 'jpeg'])
             if uploaded_avatar is not None:
-                st.session_state.avatar = uploaded_avatar
-                st.image(st.session_state.avatar, caption="Your Avatar")
+                # Decoded once per distinct upload; only the thumbnail is kept
+                try:
+                    player.avatar = load_avatar(uploaded_avatar.getvalue())
+                    st.image(player.avatar.data, caption="Your Avatar")
+                except AvatarError as error:
+                    st.error(str(error))
         
         with col2:
-            st.session_state.name = st.text_input("Enter your detective name", placeholder="Sherlock Data")
+            player.name = st.text_input("Enter your detective name", placeholder="Sherlock Data")
             
             # Color picker for theme
             theme_color = st.color_picker("Choose your theme color", "#667eea")
-            st.session_state.theme_color = theme_color
+            player.preferences['theme_color'] = theme_color
             
             # Date picker for birth date
             birth_date = st.date_input("When did you start your data journey?")
-            st.session_state.birth_date = birth_date
+            player.preferences['birth_date'] = birth_date
     
     with tab2:
-        st.session_state.specialty = st.selectbox(
+        player.specialty = st.selectbox(
             "Choose your specialty",
-            ["Data Analyst", "Machine Learning Engineer", "Data Visualization Expert", "Statistical Detective", "Business Intelligence Agent"]
+            game.SPECIALTIES
         )
         
         # Skills with sliders
@@ -155,7 +273,7 @@ if st.session_state.progress == "character_setup":
             viz_skill = st.slider("Data Visualization", 1, 10, 5)
             domain_skill = st.slider("Domain Knowledge", 1, 10, 5)
         
-        st.session_state.skills = {
+        player.skills = {
             "Python": python_skill,
             "SQL": sql_skill,
             "Statistics": stats_skill,
@@ -164,492 +282,577 @@ if st.session_state.progress == "character_setup":
             "Domain Knowledge": domain_skill
         }
         
-        # Skills visualization
-        skills_df = pd.DataFrame(list(st.session_state.skills.items()), columns=['Skill', 'Level'])
-        fig = px.bar(skills_df, x='Skill', y='Level', title="Your Skills Profile")
+        # Skills visualization (figures are cached by their inputs)
+        skills = tuple(player.skills.items())
+        fig, _ = cached_figure(("skills", skills), lambda: skills_figure(skills))
         st.plotly_chart(fig, use_container_width=True)
     
     with tab3:
         # Preferences
         st.write("Game Preferences:")
-        st.session_state.difficulty = st.select_slider(
+        player.preferences['difficulty'] = st.select_slider(
             "Difficulty Level",
             options=["Easy", "Medium", "Hard", "Expert"],
             value="Medium"
         )
         
-        st.session_state.sound_enabled = st.checkbox("Enable sound effects", value=True)
-        st.session_state.animations = st.checkbox("Enable animations", value=True)
+        player.preferences['sound_enabled'] = st.checkbox("Enable sound effects", value=True)
+        player.preferences['animations'] = st.checkbox("Enable animations", value=True)
         
         # Time limit preference
         time_limit = st.radio("Case Time Limit", ["No Limit", "30 minutes", "1 hour", "2 hours"])
-        st.session_state.time_limit = time_limit
+        player.preferences['time_limit'] = time_limit
     
     # Begin adventure button
     if st.button("🚀 Begin Adventure!", type="primary", use_container_width=True):
-        if st.session_state.name:
-            st.session_state.progress = "case_selection"
-            st.session_state.achievements.append("Character created!")
-            st.session_state.score += 50
-            st.session_state.experience += 20
+        if game.begin_adventure(player):
             st.rerun()
         else:
             st.error("Please enter your detective name!")
 
 ### Case Selection
-elif st.session_state.progress == "case_selection":
+elif player.progress == "case_selection":
     st.header("📋 Case Selection")
     
-    st.write(f"Welcome, **{st.session_state.name}**! Choose your next mystery to solve.")
+    st.write(f"Welcome, **{player.name}**! Choose your next mystery to solve.")
     
     # Case cards with expandable details
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        with st.expander("🔍 Missing Data Case", expanded=True):
-            st.write("**Difficulty:** Easy")
-            st.write("**Skills needed:** Data cleaning, basic analysis")
-            st.write("**Reward:** 100 XP")
-            st.write("A local business has missing sales data. Help them recover and analyze the information.")
-            
-            if st.button("Take Case", key="case1"):
-                st.session_state.case = "Missing Data"
-                st.session_state.progress = "data_lab"
-                st.session_state.achievements.append(f"Case selected: {st.session_state.case}")
-                st.session_state.score += 25
-                st.rerun()
-    
-    with col2:
-        with st.expander("📊 Outlier Detective", expanded=True):
-            st.write("**Difficulty:** Medium")
-            st.write("**Skills needed:** Statistical analysis, visualization")
-            st.write("**Reward:** 200 XP")
-            st.write("Detect and investigate suspicious patterns in financial data.")
-            
-            if st.button("Take Case", key="case2"):
-                st.session_state.case = "Outlier Detective"
-                st.session_state.progress = "data_lab"
-                st.session_state.achievements.append(f"Case selected: {st.session_state.case}")
-                st.session_state.score += 50
-                st.rerun()
-    
-    with col3:
-        with st.expander("📈 Trend Analyzer", expanded=True):
-            st.write("**Difficulty:** Hard")
-            st.write("**Skills needed:** Time series analysis, forecasting")
-            st.write("**Reward:** 300 XP")
-            st.write("Analyze market trends and predict future patterns.")
-            
-            if st.button("Take Case", key="case3"):
-                st.session_state.case = "Trend Analyzer"
-                st.session_state.progress = "data_lab"
-                st.session_state.achievements.append(f"Case selected: {st.session_state.case}")
-                st.session_state.score += 75
-                st.rerun()
+    for column, (case, card) in zip(st.columns(len(game.CASES)), game.CASES.items()):
+        with column:
+            with st.expander(card["title"], expanded=True):
+                st.write(f"**Difficulty:** {card['difficulty']}")
+                st.write(f"**Skills needed:** {card['skills']}")
+                st.write(f"**Reward:** {card['reward']}")
+                st.write(card["description"])
+                
+                if st.button("Take Case", key=f"case_{case}"):
+                    game.select_case(player, case)
+                    st.rerun()
     
     # Back button
     if st.button("⬅️ Back to Setup"):
-        st.session_state.progress = "character_setup"
+        player.progress = "character_setup"
         st.rerun()
 
 ### Data Lab
-elif st.session_state.progress == "data_lab":
+elif player.progress == "data_lab":
+    import pandas as pd
+    from data_adventure.cases import case_sizes, default_rows, format_bytes, memory_footprint
+    from data_adventure.charts import (
+        LINE_METHODS,
+        bar_figure,
+        box_figure,
+        cached_figure,
+        correlation_figure,
+        histogram_figure,
+        line_figure,
+        missing_figure,
+        scatter_figure,
+        trend_figure,
+    )
+    from data_adventure.correlation import CORRELATION_MODES, correlation_matrix
+    from data_adventure.filters import isin_predicate, range_predicate, view_key
+    from data_adventure.imputation import IMPUTATION_METHODS, impute
+    from data_adventure.outliers import OUTLIER_METHODS, detect_outliers
+    from data_adventure.timeseries import (
+        RESAMPLE_AGGREGATIONS,
+        RESAMPLE_RULES,
+        analyze_series,
+        forecast,
+        median_spacing,
+        resample_series,
+        time_columns,
+    )
+    
     st.header("🔬 Data Lab")
     
-    # Case-specific data generation
-    if st.session_state.case == "Missing Data":
-        # Generate data with missing values
-        np.random.seed(42)
-        dates = pd.date_range('2024-01-01', periods=100, freq='D')
-        sales_data = pd.DataFrame({
-            'Date': dates,
-            'Sales': np.random.normal(1000, 200, 100),
-            'Customers': np.random.poisson(50, 100),
-            'Product_ID': np.random.choice(['A', 'B', 'C'], 100)
-        })
-        
-        # Add missing values
-        missing_indices = np.random.choice(100, 15, replace=False)
-        sales_data.loc[missing_indices, 'Sales'] = np.nan
-        sales_data.loc[missing_indices[:5], 'Customers'] = np.nan
-        
-        df = sales_data
-        
-    elif st.session_state.case == "Outlier Detective":
-        # Generate data with outliers
-        np.random.seed(42)
-        normal_data = np.random.normal(100, 20, 95)
-        outliers = np.random.uniform(200, 300, 5)
-        all_values = np.concatenate([normal_data, outliers])
-        
-        df = pd.DataFrame({
-            'Transaction_ID': range(1, 101),
-            'Amount': all_values,
-            'Category': np.random.choice(['Electronics', 'Clothing', 'Food', 'Books'], 100),
-            'Customer_Type': np.random.choice(['Regular', 'VIP', 'New'], 100),
-            'Hour': np.random.randint(0, 24, 100)
-        })
-        
-    else:  # Trend Analyzer
-        # Generate time series data
-        np.random.seed(42)
-        dates = pd.date_range('2023-01-01', periods=365, freq='D')
-        trend = np.linspace(100, 150, 365)
-        seasonal = 10 * np.sin(2 * np.pi * np.arange(365) / 365)
-        noise = np.random.normal(0, 5, 365)
-        
-        df = pd.DataFrame({
-            'Date': dates,
-            'Sales': trend + seasonal + noise,
-            'Temperature': np.random.normal(20, 10, 365),
-            'Marketing_Spend': np.random.uniform(100, 500, 365),
-            'Day_of_Week': dates.dayofweek
-        })
-    
-    st.write(f"**Case:** {st.session_state.case}")
+    data_source = st.radio("Data source", ["Case data", "Your own dataset"],
+                           horizontal=True, key="data_source")
+    
+    if data_source == "Case data":
+        # Case data is generated once per (case, seed, size) and shared by all sessions
+        case_rows = st.select_slider(
+            "Case size (rows)",
+            options=case_sizes(player.case),
+            value=default_rows(player.case),
+            format_func=lambda n: f"{n:,}",
+            key=f"case_rows_{player.case}"
+        )
+        with st.spinner(f"Preparing {case_rows:,} rows of case data..."):
+            with timed("case_generation"):
+                case_data = game.open_case(player.case, rows=case_rows)
+    else:
+        # Files are ingested once per content hash and shared by all sessions
+        case_data = None
+        source, filename, digest = None, None, None
+        uploaded = st.file_uploader("Upload a CSV or Parquet file", type=['csv', 'parquet', 'pq'])
+        
+        # Multi-GB files can be dropped in a server folder instead of uploaded
+        datasets_dir = os.environ.get("DATA_ADVENTURE_DATASETS")
+        shared_files = []
+        if datasets_dir and os.path.isdir(datasets_dir):
+            shared_files = sorted(
+                name for name in os.listdir(datasets_dir)
+                if os.path.splitext(name)[1].lower() in ('.csv', '.parquet', '.pq')
+            )
+        shared_file = '(none)'
+        if shared_files:
+            shared_file = st.selectbox("...or pick a dataset from your trainer",
+                                       ['(none)'] + shared_files)
+        
+        if uploaded is not None:
+            source, filename = uploaded, uploaded.name
+            # Hash each upload once, not on every rerun
+            upload_id = getattr(uploaded, 'file_id', None) or (uploaded.name, uploaded.size)
+            if st.session_state.get('upload_digest', (None,))[0] == upload_id:
+                digest = st.session_state.upload_digest[1]
+        elif shared_file != '(none)':
+            source, filename = os.path.join(datasets_dir, shared_file), shared_file
+        
+        if source is not None:
+            try:
+                with st.spinner(f"Loading {filename}..."), timed("dataset_ingest"):
+                    case_data = game.open_dataset(source, filename, digest)
+                if uploaded is not None:
+                    st.session_state.upload_digest = (upload_id, case_data.dataset_key[1])
+            except (ImportError, ValueError) as error:
+                st.error(str(error))
+        
+        if case_data is None:
+            st.info("Upload a CSV or Parquet file to explore it with the Data Lab tools.")
+            st.stop()
+    # Summary statistics are computed once per (dataset, filters) and reused by every tab
+    dataset_key, df, profile = case_data.dataset_key, case_data.df, case_data.profile
+    
+    st.write(f"**Case:** {player.case}")
+    st.caption(f"{len(df):,} rows · {format_bytes(memory_footprint(df))} in memory")
     st.write("Here is your case data. Explore, filter, and visualize to find clues!")
     
+    # A widget inside a fragment reruns only that fragment (the case data and
+    # the other tabs are left alone). Filters stay outside the fragments since
+    # changing them has to refresh every tab.
+    @fragment
+    def outlier_explorer(data):
+        df, profile, data_view = data.df, data.profile, data.view
+        with timed("data_lab.outliers"):
+            numeric_cols = list(profile.numeric_columns)
+            if len(numeric_cols) > 0:
+                selected_col = st.selectbox("Select column for outlier analysis", numeric_cols)
+                outlier_method = st.selectbox(
+                    "Detection method",
+                    list(OUTLIER_METHODS),
+                    format_func=lambda method: OUTLIER_METHODS[method][0]
+                )
+                
+                if selected_col:
+                    # Bounds for every numeric column come from one cached pass
+                    report = detect_outliers(df, numeric_cols, method=outlier_method,
+                                             dataset_key=data.dataset_key, predicates=data.predicates,
+                                             positions=data.positions)
+                    lower_bound = report.lower[selected_col]
+                    upper_bound = report.upper[selected_col]
+                    outliers = report.outlier_rows(df, selected_col, data.positions)
+                    
+                    col_out1, col_out2 = st.columns(2)
+                    with col_out1:
+                        st.metric("Total Outliers", len(outliers))
+                        st.metric("Outlier Percentage", f"{report.percentage[selected_col]:.2f}%")
+                    
+                    with col_out2:
+                        st.metric("Lower Bound", f"{lower_bound:.2f}")
+                        st.metric("Upper Bound", f"{upper_bound:.2f}")
+                    
+                    if report.approximate:
+                        st.caption("Bounds estimated from a random sample of the data.")
+                    
+                    if len(outliers) > 0:
+                        st.write("**Outlier Data:**")
+                        show_paginated_dataframe(
+                            outliers, "outlier_rows",
+                            view=(data_view, "outliers", outlier_method, selected_col)
+                        )
+    
+    @fragment
+    def correlation_explorer(data):
+        df, profile, data_view = data.df, data.profile, data.view
+        with timed("data_lab.correlation"):
+            if len(profile.numeric_columns) > 1:
+                corr_mode = st.selectbox(
+                    "Computation",
+                    CORRELATION_MODES,
+                    key="corr_mode",
+                    help="Large cases use a chunked (streaming) pass; sampled is faster but approximate."
+                )
+                corr = correlation_matrix(df, profile.numeric_columns, mode=corr_mode,
+                                          dataset_key=data.dataset_key, predicates=data.predicates,
+                                          positions=data.positions)
+                fig, _ = cached_figure(("correlation", data_view, corr_mode),
+                                       lambda: correlation_figure(corr.matrix, "Correlation Matrix"))
+                st.plotly_chart(fig, use_container_width=True)
+                if corr.error_bound is not None:
+                    st.caption(f"Sampled {corr.rows_used:,} rows: coefficients are within "
+                               f"±{corr.error_bound:.3f} of the full-data value (95%).")
+    
+    @fragment
+    def imputation_workbench(data):
+        df, profile, data_view = data.df, data.profile, data.view
+        with timed("data_lab.imputation"):
+            gap_cols = [col for col in profile.numeric_columns if profile.missing[col] > 0]
+            if not gap_cols:
+                st.info("No numeric column has missing values in this view.")
+                return
+            methods = list(IMPUTATION_METHODS)
+            if not time_columns(df):
+                methods.remove("time")
+            if not profile.categorical_columns:
+                methods.remove("group_mean")
+                methods.remove("group_median")
+            
+            imp_col1, imp_col2 = st.columns(2)
+            with imp_col1:
+                columns = st.multiselect("Columns to fill", gap_cols, default=gap_cols,
+                                         key="impute_columns")
+                method = st.selectbox("Method", methods, key="impute_method",
+                                      format_func=lambda method: IMPUTATION_METHODS[method])
+            time_col = group_col = None
+            k = 5
+            with imp_col2:
+                if method == "time":
+                    time_col = st.selectbox("Time column", time_columns(df), key="impute_time")
+                elif method in ("group_mean", "group_median"):
+                    group_col = st.selectbox("Group by", list(profile.categorical_columns),
+                                             key="impute_group")
+                elif method == "knn":
+                    k = st.slider("Neighbours (k)", 1, 25, 5, key="impute_k")
+            if not columns:
+                return
+            
+            # Cached per (view, method, params): switching back is instant
+            started = datetime.now()
+            result = impute(df, columns, method, time_col=time_col, group_col=group_col, k=k,
+                            dataset_key=data.dataset_key, predicates=data.predicates,
+                            positions=data.positions)
+            took = (datetime.now() - started).total_seconds()
+            
+            metric1, metric2, metric3 = st.columns(3)
+            metric1.metric("Values filled", f"{int(result.filled.sum()):,}")
+            metric2.metric("Still missing", f"{int(result.remaining.sum()):,}")
+            metric3.metric("Compute time", f"{result.seconds:.3f} s")
+            if took < result.seconds / 2:
+                st.caption(f"Served from cache in {took:.3f} s.")
+            
+            st.write(f"**Preview** (first changed rows of {len(result.changed):,}):")
+            show_paginated_dataframe(result.preview(df, positions=data.positions), "impute_preview",
+                                     view=(data_view, "imputation", method, tuple(columns),
+                                           time_col, group_col, k))
+    
+    @fragment
+    def trend_explorer(data):
+        df, profile, data_view = data.df, data.profile, data.view
+        with timed("data_lab.trend"):
+            time_col = time_columns(df)[0]
+            trend_col1, trend_col2 = st.columns(2)
+            with trend_col1:
+                value_col = st.selectbox("Series", list(profile.numeric_columns), key="trend_column")
+                rule = st.selectbox("Resample to", ['auto'] + list(RESAMPLE_RULES), key="trend_rule",
+                                    help="auto picks the finest clock that keeps the chart readable")
+                how = st.selectbox("Aggregate with", RESAMPLE_AGGREGATIONS, key="trend_how")
+            with trend_col2:
+                window = st.number_input("Rolling window (points)", 1, 365, 7, key="trend_window")
+                horizon = st.slider("Forecast (points)", 0, 100, 30, key="trend_horizon")
+            
+            # One cached pass over the full-resolution series
+            report = analyze_series(df, time_col, value_col,
+                                    dataset_key=data.dataset_key, predicates=data.predicates,
+                                    positions=data.positions)
+            if report is None:
+                st.info(f"No timestamps in {time_col}.")
+                return
+            series = resample_series(df, time_col, value_col, rule, how,
+                                     dataset_key=data.dataset_key, predicates=data.predicates,
+                                     positions=data.positions)
+            
+            metric1, metric2, metric3 = st.columns(3)
+            metric1.metric("Trend per day", f"{report.fit.slope:+,.3f}")
+            metric2.metric("R²", f"{report.fit.r_squared:.2f}")
+            if report.decomposition is not None:
+                metric3.metric(f"{report.season.title()} seasonality",
+                               f"{report.decomposition.strength:.0%}")
+            
+            step = median_spacing(series.index.to_numpy())
+            predicted = forecast(report, horizon, step) if horizon else None
+            fig, note = cached_figure(
+                ("trend", data_view, time_col, value_col, rule, how, window, horizon),
+                lambda: trend_figure(series, report, window, predicted)
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            if note:
+                st.caption(note)
+    
+    @fragment
+    def chart_builder(data):
+        # Figures only gather the columns they plot, and only on a cache miss
+        profile, data_view = data.profile, data.view
+        with timed("data_lab.visualizations"):
+            st.subheader("Data Visualizations")
+            
+            # Chart type selection
+            note = None
+            chart_type = st.selectbox("Select Chart Type", 
+                                     ["Line Chart", "Bar Chart", "Scatter Plot", "Histogram", "Box Plot", "Heatmap"])
+            
+            if chart_type == "Line Chart":
+                if len(profile.numeric_columns) >= 2:
+                    x_col = st.selectbox("X-axis", list(profile.numeric_columns))
+                    y_col = st.selectbox("Y-axis", list(profile.numeric_columns))
+                    line_method = st.radio("Decimation for large data", LINE_METHODS,
+                                           format_func=str.upper, horizontal=True)
+                    
+                    fig, note = cached_figure(
+                        ("line", data_view, x_col, y_col, line_method),
+                        lambda: line_figure(data.frame([x_col, y_col]), x_col, y_col, method=line_method)
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            elif chart_type == "Bar Chart":
+                if len(profile.numeric_columns) >= 1 and profile.categorical_columns:
+                    x_col = st.selectbox("X-axis (categorical)", list(profile.categorical_columns))
+                    y_col = st.selectbox("Y-axis (numeric)", list(profile.numeric_columns))
+                    
+                    fig, note = cached_figure(("bar", data_view, x_col, y_col),
+                                              lambda: bar_figure(data.frame([x_col, y_col]), x_col, y_col))
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            elif chart_type == "Scatter Plot":
+                if len(profile.numeric_columns) >= 2:
+                    x_col = st.selectbox("X-axis", list(profile.numeric_columns))
+                    y_col = st.selectbox("Y-axis", list(profile.numeric_columns))
+                    color_col = st.selectbox("Color by (optional)", ['None'] + list(profile.categorical_columns))
+                    
+                    color = None if color_col == 'None' else color_col
+                    fig, note = cached_figure(("scatter", data_view, x_col, y_col, color),
+                                              lambda: scatter_figure(data.frame([x_col, y_col, color] if color else [x_col, y_col]),
+                                                                     x_col, y_col, color=color))
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            elif chart_type == "Histogram":
+                if len(profile.numeric_columns) >= 1:
+                    col = st.selectbox("Select column", list(profile.numeric_columns))
+                    bins = st.slider("Number of bins", 5, 50, 20)
+                    
+                    fig, note = cached_figure(("histogram", data_view, col, bins),
+                                              lambda: histogram_figure(data.frame([col]), col, bins))
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            elif chart_type == "Box Plot":
+                if len(profile.numeric_columns) >= 1:
+                    y_col = st.selectbox("Y-axis", list(profile.numeric_columns))
+                    x_col = st.selectbox("X-axis (optional)", ['None'] + list(profile.categorical_columns))
+                    
+                    group_col = None if x_col == 'None' else x_col
+                    fig, note = cached_figure(("box", data_view, y_col, group_col),
+                                              lambda: box_figure(data.frame([y_col, group_col] if group_col else [y_col]),
+                                                                 y_col, x=group_col))
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            elif chart_type == "Heatmap":
+                if len(profile.numeric_columns) > 1:
+                    # Same cached matrix as the Correlation Analysis expander
+                    corr_mode = st.session_state.get("corr_mode", "auto")
+                    fig, _ = cached_figure(
+                        ("heatmap", data_view, corr_mode),
+                        lambda: correlation_figure(
+                            correlation_matrix(data.df, profile.numeric_columns, mode=corr_mode,
+                                               dataset_key=data.dataset_key, predicates=data.predicates,
+                                               positions=data.positions).matrix,
+                            "Correlation Heatmap"
+                        )
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+            
+            # Large cases are reduced on the server before plotting
+            if note:
+                st.caption(note)
+    
     # Create tabs for different analysis tools
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Data Explorer", "🔍 Analysis Tools", "📈 Visualizations", "🎯 Insights"])
     
-    with tab1:
+    with tab1, timed("data_lab.explorer"):
         col1, col2 = st.columns([2, 1])
         
         with col1:
             st.subheader("Raw Data")
-            st.dataframe(df, use_container_width=True)
+            paginated_table(df, "raw_data", view=view_key(dataset_key))
             
             # Data info
             with st.expander("📋 Data Information"):
                 buffer = st.empty()
-                buffer.dataframe(df.describe())
+                buffer.dataframe(profile.describe)
                 
                 col_info1, col_info2 = st.columns(2)
                 with col_info1:
                     st.write("**Data Types:**")
-                    st.write(df.dtypes)
+                    st.write(profile.dtypes)
                 with col_info2:
                     st.write("**Missing Values:**")
-                    st.write(df.isnull().sum())
+                    st.write(profile.missing)
         
         with col2:
             st.subheader("Filters")
             
-            # Dynamic filters based on data
-            for col in df.select_dtypes(include=[np.number]).columns:
-                if col in df.columns:
-                    min_val = float(df[col].min())
-                    max_val = float(df[col].min())
-                    if not pd.isna(min_val) and not pd.isna(max_val):
-                        min_val = float(df[col].min())
-                        max_val = float(df[col].max())
-                        filter_range = st.slider(f"Filter {col}", min_val, max_val, (min_val, max_val))
-                        df = df[(df[col] >= filter_range[0]) & (df[col] <= filter_range[1])]
+            # Dynamic filters based on data; only narrowed widgets become predicates
+            predicates = []
+            for col in profile.numeric_columns:
+                min_val = profile.minimum[col]
+                max_val = profile.maximum[col]
+                if not pd.isna(min_val) and not pd.isna(max_val) and min_val < max_val:
+                    filter_range = st.slider(f"Filter {col}", min_val, max_val, (min_val, max_val))
+                    if filter_range != (min_val, max_val):
+                        predicates.append(range_predicate(col, *filter_range))
             
             # Categorical filters
-            for col in df.select_dtypes(include=['object']).columns:
-                unique_vals = df[col].unique()
-                if len(unique_vals) < 20:  # Only show if not too many unique values
+            for col in profile.categorical_columns:
+                # Only columns with few unique values get a filter
+                unique_vals = profile.category_values.get(col)
+                if unique_vals:
                     selected_vals = st.multiselect(f"Filter {col}", unique_vals, default=unique_vals)
-                    df = df[df[col].isin(selected_vals)]
+                    if len(selected_vals) < len(unique_vals):
+                        predicates.append(isin_predicate(col, selected_vals))
+            
+            # All filters are combined into one mask and applied once
+            # The filtered view is just the selected row positions, not a copy
+            data = case_data.filtered(predicates)
+            profile, data_view = data.profile, data.view
     
-    with tab2:
+    with tab2, timed("data_lab.analysis"):
         st.subheader("Analysis Tools")
         
         # Missing data analysis
-        if df.isnull().sum().sum() > 0:
+        if profile.total_missing > 0:
             with st.expander("🔍 Missing Data Analysis"):
-                missing_data = df.isnull().sum()
-                missing_pct = (missing_data / len(df)) * 100
                 missing_df = pd.DataFrame({
-                    'Column': missing_data.index,
-                    'Missing_Count': missing_data.values,
-                    'Missing_Percentage': missing_pct.values
+                    'Column': profile.missing.index,
+                    'Missing_Count': profile.missing.values,
+                    'Missing_Percentage': profile.missing_percentage.values
                 })
                 st.dataframe(missing_df)
                 
                 # Missing data visualization
-                fig = px.bar(missing_df, x='Column', y='Missing_Percentage', 
-                           title="Missing Data Percentage by Column")
+                fig, _ = cached_figure(("missing", data_view),
+                                       lambda: missing_figure(profile.missing_percentage))
                 st.plotly_chart(fig, use_container_width=True)
+            
+            with st.expander("🩹 Imputation Workbench"):
+                imputation_workbench(data)
         
         # Outlier detection
         with st.expander("🎯 Outlier Detection"):
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) > 0:
-                selected_col = st.selectbox("Select column for outlier analysis", numeric_cols)
-                
-                if selected_col:
-                    Q1 = df[selected_col].quantile(0.25)
-                    Q3 = df[selected_col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    lower_bound = Q1 - 1.5 * IQR
-                    upper_bound = Q3 + 1.5 * IQR
-                    
-                    outliers = df[(df[selected_col] < lower_bound) | (df[selected_col] > upper_bound)]
-                    
-                    col_out1, col_out2 = st.columns(2)
-                    with col_out1:
-                        st.metric("Total Outliers", len(outliers))
-                        st.metric("Outlier Percentage", f"{(len(outliers)/len(df)*100):.2f}%")
-                    
-                    with col_out2:
-                        st.metric("Lower Bound", f"{lower_bound:.2f}")
-                        st.metric("Upper Bound", f"{upper_bound:.2f}")
-                    
-                    if len(outliers) > 0:
-                        st.write("**Outlier Data:**")
-                        st.dataframe(outliers)
+            outlier_explorer(data)
         
         # Correlation analysis
         with st.expander("📊 Correlation Analysis"):
-            numeric_df = df.select_dtypes(include=[np.number])
-            if len(numeric_df.columns) > 1:
-                corr_matrix = numeric_df.corr()
-                fig = px.imshow(corr_matrix, 
-                               title="Correlation Matrix",
-                               color_continuous_scale='RdBu')
-                st.plotly_chart(fig, use_container_width=True)
+            correlation_explorer(data)
+        
+        # Trend analysis for data with timestamps
+        if time_columns(df) and profile.numeric_columns:
+            with st.expander("📈 Trend Analysis"):
+                trend_explorer(data)
     
     with tab3:
-        st.subheader("Data Visualizations")
-        
-        # Chart type selection
-        chart_type = st.selectbox("Select Chart Type", 
-                                 ["Line Chart", "Bar Chart", "Scatter Plot", "Histogram", "Box Plot", "Heatmap"])
-        
-        if chart_type == "Line Chart":
-            if len(df.select_dtypes(include=[np.number]).columns) >= 2:
-                x_col = st.selectbox("X-axis", df.select_dtypes(include=[np.number]).columns)
-                y_col = st.selectbox("Y-axis", df.select_dtypes(include=[np.number]).columns)
-                
-                fig = px.line(df, x=x_col, y=y_col, title=f"{y_col} vs {x_col}")
-                st.plotly_chart(fig, use_container_width=True)
-        
-        elif chart_type == "Bar Chart":
-            if len(df.select_dtypes(include=[np.number]).columns) >= 1:
-                x_col = st.selectbox("X-axis (categorical)", df.select_dtypes(include=['object']).columns)
-                y_col = st.selectbox("Y-axis (numeric)", df.select_dtypes(include=[np.number]).columns)
-                
-                fig = px.bar(df, x=x_col, y=y_col, title=f"{y_col} by {x_col}")
-                st.plotly_chart(fig, use_container_width=True)
-        
-        elif chart_type == "Scatter Plot":
-            if len(df.select_dtypes(include=[np.number]).columns) >= 2:
-                x_col = st.selectbox("X-axis", df.select_dtypes(include=[np.number]).columns)
-                y_col = st.selectbox("Y-axis", df.select_dtypes(include=[np.number]).columns)
-                color_col = st.selectbox("Color by (optional)", ['None'] + list(df.select_dtypes(include=['object']).columns))
-                
-                if color_col == 'None':
-                    fig = px.scatter(df, x=x_col, y=y_col, title=f"{y_col} vs {x_col}")
-                else:
-                    fig = px.scatter(df, x=x_col, y=y_col, color=color_col, title=f"{y_col} vs {x_col}")
-                st.plotly_chart(fig, use_container_width=True)
-        
-        elif chart_type == "Histogram":
-            if len(df.select_dtypes(include=[np.number]).columns) >= 1:
-                col = st.selectbox("Select column", df.select_dtypes(include=[np.number]).columns)
-                bins = st.slider("Number of bins", 5, 50, 20)
-                
-                fig = px.histogram(df, x=col, nbins=bins, title=f"Distribution of {col}")
-                st.plotly_chart(fig, use_container_width=True)
-        
-        elif chart_type == "Box Plot":
-            if len(df.select_dtypes(include=[np.number]).columns) >= 1:
-                y_col = st.selectbox("Y-axis", df.select_dtypes(include=[np.number]).columns)
-                x_col = st.selectbox("X-axis (optional)", ['None'] + list(df.select_dtypes(include=['object']).columns))
-                
-                if x_col == 'None':
-                    fig = px.box(df, y=y_col, title=f"Box Plot of {y_col}")
-                else:
-                    fig = px.box(df, x=x_col, y=y_col, title=f"Box Plot of {y_col} by {x_col}")
-                st.plotly_chart(fig, use_container_width=True)
-        
-        elif chart_type == "Heatmap":
-            numeric_df = df.select_dtypes(include=[np.number])
-            if len(numeric_df.columns) > 1:
-                corr_matrix = numeric_df.corr()
-                fig = px.imshow(corr_matrix, 
-                               title="Correlation Heatmap",
-                               color_continuous_scale='RdBu')
-                st.plotly_chart(fig, use_container_width=True)
+        chart_builder(data)
     
-    with tab4:
+    with tab4, timed("data_lab.insights"):
         st.subheader("🎯 Key Insights")
         
         # Generate insights based on the case
-        if st.session_state.case == "Missing Data":
-            missing_count = df.isnull().sum().sum()
-            st.metric("Total Missing Values", missing_count)
-            
-            if missing_count > 0:
-                st.success("🔍 **Insight:** You found missing data! Consider imputation strategies.")
-                st.info("💡 **Tip:** Use forward fill, backward fill, or interpolation for time series data.")
-            else:
-                st.success("✅ **Insight:** No missing data found! Your data is clean.")
-        
-        elif st.session_state.case == "Outlier Detective":
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) > 0:
-                outlier_counts = {}
-                for col in numeric_cols:
-                    Q1 = df[col].quantile(0.25)
-                    Q3 = df[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    outliers = df[(df[col] < Q1 - 1.5 * IQR) | (df[col] > Q3 + 1.5 * IQR)]
-                    outlier_counts[col] = len(outliers)
-                
-                max_outliers = max(outlier_counts.values())
-                most_outlier_col = max(outlier_counts, key=outlier_counts.get)
-                
-                st.metric("Most Outliers Found", f"{max_outliers} in {most_outlier_col}")
-                st.warning(f"⚠️ **Alert:** {most_outlier_col} has the most outliers. Investigate further!")
-        
-        else:  # Trend Analyzer
-            if 'Sales' in df.columns:
-                trend_direction = "increasing" if df['Sales'].iloc[-1] > df['Sales'].iloc[0] else "decreasing"
-                st.metric("Trend Direction", trend_direction.title())
-                st.info(f"📈 **Trend:** Sales are {trend_direction} over time.")
+        insight = game.case_insight(player.case, data)
+        if insight is not None:
+            st.metric(insight.metric_label, insight.metric_value)
+            getattr(st, insight.level)(insight.message)
+            if insight.tip:
+                st.info(insight.tip)
         
         # General insights
         st.write("**Data Summary:**")
         col_ins1, col_ins2, col_ins3 = st.columns(3)
         with col_ins1:
-            st.metric("Total Records", len(df))
+            st.metric("Total Records", data.rows)
         with col_ins2:
-            st.metric("Numeric Columns", len(df.select_dtypes(include=[np.number]).columns))
+            st.metric("Numeric Columns", len(profile.numeric_columns))
         with col_ins3:
-            st.metric("Categorical Columns", len(df.select_dtypes(include=['object']).columns))
+            st.metric("Categorical Columns", len(profile.categorical_columns))
     
     # Navigation buttons
     col_nav1, col_nav2, col_nav3 = st.columns([1, 1, 1])
     
     with col_nav1:
         if st.button("⬅️ Back to Cases"):
-            st.session_state.progress = "case_selection"
+            player.progress = "case_selection"
             st.rerun()
     
     with col_nav2:
         if st.button("💾 Save Analysis"):
-            # Save current analysis
-            analysis_data = {
-                'case': st.session_state.case,
-                'timestamp': datetime.now().isoformat(),
-                'data_shape': df.shape,
-                'missing_values': df.isnull().sum().to_dict()
-            }
-            st.session_state.saved_analyses = st.session_state.get('saved_analyses', [])
-            st.session_state.saved_analyses.append(analysis_data)
+            game.save_analysis(player, data)
             st.success("Analysis saved!")
     
     with col_nav3:
-        if st.button("🔍 I found a clue!", type="primary"):
-            st.session_state.progress = "puzzle_room"
-            st.session_state.achievements.append("Clue found in data!")
-            st.session_state.score += 100
-            st.session_state.experience += 30
-            st.rerun()
+        # A callback, so the rerun it triggers starts in the Puzzle Room and
+        # the Data Lab fragments are not drawn on the way out
+        st.button("🔍 I found a clue!", type="primary", on_click=game.find_clue, args=(player, case_data))
 
 ### Puzzle Room
-elif st.session_state.progress == "puzzle_room":
+elif player.progress == "puzzle_room":
     st.header("🧩 Puzzle Room")
     
-    st.write("Time for a riddle! Here's your puzzle:")
-    
-    # Create tabs for different puzzle types
-    puzzle_tab1, puzzle_tab2, puzzle_tab3 = st.tabs(["📝 Text Puzzle", "🔢 Math Challenge", "🎯 Logic Problem"])
-    
-    with puzzle_tab1:
-        st.markdown("**What is the capital of DataLand?**")
-        answer = st.text_input("Your answer:", key="text_puzzle")
-        
-        if st.button("Submit Answer", key="submit_text"):
-            if answer.lower() == "datatown":
-                st.success("Correct! The mayor thanks you.")
-                st.session_state.achievements.append("Text puzzle solved!")
-                st.session_state.score += 50
-                st.session_state.experience += 20
-                st.balloons()
-            else:
-                st.error("Try again!")
-    
-    with puzzle_tab2:
-        st.markdown("**Math Challenge:** What is the mean of [15, 20, 25, 30, 35]?")
-        math_answer = st.number_input("Your answer:", key="math_puzzle")
-        
-        if st.button("Submit Answer", key="submit_math"):
-            if math_answer == 25:
-                st.success("Correct! You're a math wizard!")
-                st.session_state.achievements.append("Math challenge solved!")
-                st.session_state.score += 75
-                st.session_state.experience += 25
-                st.balloons()
-            else:
-                st.error("Try again! The correct answer is 25.")
-    
-    with puzzle_tab3:
-        st.markdown("**Logic Problem:** If all data scientists love coffee, and you are a data scientist, do you love coffee?**")
-        logic_answer = st.radio("Your answer:", ["Yes", "No", "Maybe"], key="logic_puzzle")
+    st.write("Time for a riddle! Here are your puzzles:")
+    
+    # Dealt once per player and case from the shared puzzle bank
+    puzzles = game.deal_puzzles(player)
+    
+    # Each puzzle is a fragment: typing or submitting an answer reruns only
+    # its own tab. The sidebar score catches up on the next full rerun.
+    @fragment
+    def puzzle_challenge(kind, puzzle):
+        st.markdown(f"**{puzzle.question}**")
+        if puzzle.options:
+            answer = st.radio("Your answer:", puzzle.options, key=f"{kind}_puzzle")
+        elif puzzle.decimals is not None:
+            answer = st.number_input("Your answer:", step=10.0 ** -puzzle.decimals,
+                                     format=f"%.{puzzle.decimals}f", key=f"{kind}_puzzle")
+        else:
+            answer = st.text_input("Your answer:", key=f"{kind}_puzzle")
         
-        if st.button("Submit Answer", key="submit_logic"):
-            if logic_answer == "Yes":
-                st.success("Correct! Logical thinking is key in data science!")
-                st.session_state.achievements.append("Logic puzzle solved!")
-                st.session_state.score += 100
-                st.session_state.experience += 30
-                st.balloons()
-            else:
-                st.error("Think about it logically!")
+        if st.button("Submit Answer", key=f"submit_{kind}"):
+            show_puzzle_result(*game.check_puzzle(player, kind, answer))
+    
+    # One tab per puzzle kind
+    puzzle_tabs = st.tabs([puzzle.label for puzzle in puzzles.values()])
+    for puzzle_tab, (kind, puzzle) in zip(puzzle_tabs, puzzles.items()):
+        with puzzle_tab:
+            puzzle_challenge(kind, puzzle)
     
     # Progress to next stage
     if st.button("Continue to Report", type="primary"):
-        st.session_state.progress = "report_station"
+        player.progress = "report_station"
         st.rerun()
     
     if st.button("Give up and return to Data Lab"):
-        st.session_state.progress = "data_lab"
+        player.progress = "data_lab"
         st.rerun()
 
 ### Report Station
-elif st.session_state.progress == "report_station":
+elif player.progress == "report_station":
+    import pandas as pd
+    from data_adventure.charts import cached_figure, leaderboard_figure
+    
     st.header("📋 Report Station")
     
     st.write("You solved the case—great job! Here's your final report:")
     
     # Create a comprehensive report
-    report = f"""
-    # Data Adventure RPG Case Report
-    
-    ## Detective Information
-    **Name:** {st.session_state.name}
-    **Specialty:** {st.session_state.specialty}
-    **Level:** {st.session_state.level}
-    **Score:** {st.session_state.score}
-    
-    ## Case Details
-    **Case Type:** {st.session_state.case}
-    **Completion Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-    **Time Elapsed:** {(datetime.now() - st.session_state.start_time).seconds//60} minutes
-    
-    ## Achievements Earned
-    {chr(10).join([f"- {achievement}" for achievement in st.session_state.achievements])}
-    
-    ## Skills Demonstrated
-    {chr(10).join([f"- {skill}: {level}/10" for skill, level in st.session_state.skills.items()])}
-    
-    ## Analysis Summary
-    - Data exploration completed
-    - Visualizations created
-    - Insights discovered
-    - Puzzle challenges solved
-    
-    ## Recommendations
-    - Continue practicing data analysis
-    - Explore more advanced techniques
-    - Share findings with the team
-    
-    **Report Generated by:** Data Adventure RPG System
-    """
+    now = datetime.now()
+    with timed("report_generation"):
+        report = game.build_report(player, now)
     
     st.markdown(report)
     
@@ -660,78 +863,58 @@ elif st.session_state.progress == "report_station":
         st.download_button(
             label="📄 Download Report (TXT)",
             data=report,
-            file_name=f"data_report_{st.session_state.name}_{datetime.now().strftime('%Y%m%d')}.txt",
+            file_name=f"data_report_{player.name}_{now.strftime('%Y%m%d')}.txt",
             mime="text/plain"
         )
     
     with col_dl2:
         # Create JSON report
-        json_report = {
-            "detective": st.session_state.name,
-            "specialty": st.session_state.specialty,
-            "case": st.session_state.case,
-            "score": st.session_state.score,
-            "level": st.session_state.level,
-            "achievements": st.session_state.achievements,
-            "skills": st.session_state.skills,
-            "completion_date": datetime.now().isoformat()
-        }
+        json_report = game.build_json_report(player, now)
         
         st.download_button(
             label="📊 Download Report (JSON)",
             data=json.dumps(json_report, indent=2),
-            file_name=f"data_report_{st.session_state.name}_{datetime.now().strftime('%Y%m%d')}.json",
+            file_name=f"data_report_{player.name}_{now.strftime('%Y%m%d')}.json",
             mime="application/json"
         )
     
     # Leaderboard
     st.header("🏆 Leaderboard")
     
-    # Add current player to leaderboard
-    player_entry = {
-        'Name': st.session_state.name,
-        'Case': st.session_state.case,
-        'Score': st.session_state.score,
-        'Level': st.session_state.level,
-        'Achievements': len(st.session_state.achievements),
-        'Completion_Date': datetime.now().strftime('%Y-%m-%d')
-    }
+    # Add current player to the shared leaderboard (one entry per player and case)
+    leaderboard = get_leaderboard()
+    player_entry = game.leaderboard_entry(player, now)
     
-    if player_entry not in st.session_state.leaderboard:
-        st.session_state.leaderboard.append(player_entry)
+    leaderboard.submit(player_entry)
     
-    # Sort leaderboard by score
-    leaderboard_df = pd.DataFrame(st.session_state.leaderboard)
+    # Top detectives come back already sorted by score
+    leaderboard_df = pd.DataFrame(leaderboard.top(LEADERBOARD_SIZE))
     if not leaderboard_df.empty:
-        leaderboard_df = leaderboard_df.sort_values('Score', ascending=False)
-        st.dataframe(leaderboard_df, use_container_width=True)
+        leaderboard_df = leaderboard_df.drop(columns='entry_id')
+        st.dataframe(leaderboard_df, use_container_width=True, hide_index=True)
         
         # Leaderboard visualization
         if len(leaderboard_df) > 1:
-            fig = px.bar(leaderboard_df.head(10), x='Name', y='Score', 
-                        title="Top 10 Detectives by Score")
+            top_entries = tuple(zip(leaderboard_df['Name'].head(10), leaderboard_df['Score'].head(10)))
+            fig, _ = cached_figure(("leaderboard", top_entries),
+                                   lambda: leaderboard_figure(top_entries))
             st.plotly_chart(fig, use_container_width=True)
     
     # Game completion celebration
     st.success("🎉 Congratulations! You've completed the case!")
     
     # Level up check
-    if st.session_state.experience >= 100:
-        st.session_state.level += 1
-        st.session_state.experience = 0
+    if game.check_level_up(player):
         st.balloons()
-        st.success(f"🎊 Level Up! You are now level {st.session_state.level}!")
+        st.success(f"🎊 Level Up! You are now level {player.level}!")
     
     # New adventure button
     if st.button("🚀 Start a New Adventure", type="primary", use_container_width=True):
         st.session_state.clear()
         st.rerun()
 
-# Display avatar and achievements (always visible after setup)
-if st.session_state.get('avatar'):
-    st.sidebar.image(st.session_state.avatar, caption=f"{st.session_state.name}'s avatar")
+# The panel shows every session's data, so the query value must be the admin token
+if instrumentation.recorder.enabled and instrumentation.is_admin(get_query_param('admin')):
+    show_admin_panel()
 
-if st.session_state.get('achievements'):
-    st.sidebar.header("🏆 Achievements")
-    for ach in st.session_state.achievements:
-        st.markdown(f'<div class="achievement-card">🏅 {ach}</div>', unsafe_allow_html=True)
+instrumentation.recorder.end_rerun()
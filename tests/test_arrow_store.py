@@ -0,0 +1,61 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from data_adventure import arrow_store  # noqa: E402
+from data_adventure.arrow_store import (  # noqa: E402
+    frame_to_table,
+    read_frame,
+    read_table,
+    write_frame,
+)
+from data_adventure.filters import take_rows  # noqa: E402
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "x": np.array([1.5, np.nan, 3.0, 4.0], dtype=np.float32),
+            "n": np.array([5, 2, 9, 1], dtype=np.int8),
+            "t": pd.date_range("2024-01-01", periods=4, freq="h"),
+            "cat": pd.Categorical(["a", "b", "a", "c"]),
+            "s": ["p", "q", None, "r"],
+        }
+    )
+
+
+def test_roundtrip_keeps_values_and_dtypes(df, tmp_path):
+    path = str(tmp_path / "case.arrow")
+    write_frame(df, path)
+    pd.testing.assert_frame_equal(read_frame(path), df)
+    # The write is atomic: no temporary file is left next to the result
+    assert [p.name for p in tmp_path.iterdir()] == ["case.arrow"]
+
+
+def test_nan_is_stored_as_a_value(df):
+    table = frame_to_table(df)
+    assert table.column("x").null_count == 0
+    assert table.column("s").null_count == 1
+
+
+def test_numeric_columns_point_into_the_map(df, tmp_path):
+    path = str(tmp_path / "case.arrow")
+    write_frame(df, path)
+    frame = read_frame(path)
+    for col in ["x", "n", "t"]:
+        assert not frame[col].to_numpy().flags.writeable
+    # A filtered view gathers its rows out of the read-only map
+    rows = take_rows(frame, np.array([3, 0], dtype=np.int32), ["x", "n"])
+    assert rows["n"].tolist() == [1, 5]
+    assert read_table(path).num_rows == len(df)
+
+
+def test_missing_pyarrow_explains_the_extra(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(ImportError, match=r"data-adventure-rpg\[arrow\]"):
+        arrow_store.require_pyarrow()
@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from PIL import Image
+
+from data_adventure import avatar
+from data_adventure.avatar import (
+    THUMBNAIL_SIZE,
+    AvatarError,
+    clear_avatar_cache,
+    load_avatar,
+    make_avatar,
+)
+
+
+def _encode(image, fmt, **params):
+    out = io.BytesIO()
+    image.save(out, format=fmt, **params)
+    return out.getvalue()
+
+
+def test_large_jpeg_becomes_a_small_thumbnail():
+    raw = _encode(Image.new("RGB", (4000, 3000), "navy"), "JPEG")
+    result = make_avatar(raw)
+    assert result.mime == "image/jpeg"
+    assert (result.width, result.height) == (256, 192)
+    assert max(Image.open(io.BytesIO(result.data)).size) <= max(THUMBNAIL_SIZE)
+
+
+def test_transparent_png_stays_png():
+    raw = _encode(Image.new("RGBA", (300, 300), (0, 0, 0, 0)), "PNG")
+    result = make_avatar(raw)
+    assert result.mime == "image/png"
+    assert Image.open(io.BytesIO(result.data)).mode == "RGBA"
+
+
+def test_multi_picture_phone_photo_uses_first_picture():
+    first = Image.new("RGB", (4000, 3000), (200, 0, 0))
+    second = Image.new("RGB", (4000, 3000), (0, 200, 0))
+    raw = _encode(first, "MPO", save_all=True, append_images=[second])
+    assert Image.open(io.BytesIO(raw)).format == "MPO"
+    result = make_avatar(raw)
+    assert result.mime == "image/jpeg"
+    red, green, _ = Image.open(io.BytesIO(result.data)).getpixel((10, 10))
+    assert red > 150 and green < 50
+
+
+def test_too_many_pixels_is_refused(monkeypatch):
+    monkeypatch.setattr(avatar, "MAX_PIXELS", 1_000_000)
+    raw = _encode(Image.new("RGB", (2000, 1000)), "PNG")
+    with pytest.raises(AvatarError, match="too large"):
+        make_avatar(raw)
+
+
+def test_too_many_bytes_is_refused(monkeypatch):
+    monkeypatch.setattr(avatar, "MAX_UPLOAD_BYTES", 10)
+    with pytest.raises(AvatarError, match="smaller than"):
+        make_avatar(_encode(Image.new("RGB", (64, 64)), "PNG"))
+
+
+def test_truncated_file_is_refused():
+    raw = _encode(Image.new("RGB", (800, 600), "teal"), "JPEG")
+    with pytest.raises(AvatarError, match="could not be read"):
+        make_avatar(raw[: len(raw) // 2])
+
+
+@pytest.mark.parametrize("raw", [b"not an image", None])
+def test_other_uploads_are_refused(raw):
+    raw = raw or _encode(Image.new("RGB", (64, 64)), "GIF")
+    with pytest.raises(AvatarError):
+        make_avatar(raw)
+
+
+def test_same_upload_decoded_once():
+    clear_avatar_cache()
+    raw = _encode(Image.new("RGB", (64, 64)), "PNG")
+    assert load_avatar(raw) is load_avatar(bytes(raw))
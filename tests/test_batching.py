@@ -0,0 +1,77 @@
+import sqlite3
+import threading
+
+import pytest
+
+from data_adventure.batching import BatchWriter, file_location, open_url
+
+
+class FlakySink:
+    """Fails the first ``failures`` writes, then records every batch."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+        self.closed = False
+        self.written = threading.Event()
+
+    def write(self, items):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        self.batches.append(items)
+        self.written.set()
+
+    def close(self):
+        self.closed = True
+
+
+def test_close_flushes_then_closes():
+    sink = FlakySink()
+    writer = BatchWriter(
+        sink.write, "test-writer", flush_interval=60, on_close=sink.close
+    )
+    writer.put("a", 1)
+    writer.put("b", 2)
+    writer.put("a", 3)  # replaces the waiting item in place
+    assert writer.pending() == [3, 2] and len(writer) == 2
+    writer.close()
+    assert sink.batches == [[3, 2]] and sink.closed
+    writer.close()  # closing twice is harmless
+
+
+def test_failed_batch_is_requeued_before_newer_items():
+    sink = FlakySink(failures=1)
+    writer = BatchWriter(sink.write, "test-writer", flush_interval=60)
+    writer.put("a", 1)
+    writer.put("b", 2)
+    with pytest.raises(sqlite3.OperationalError):
+        writer.flush()
+    writer.put("c", 3)
+    writer.put("b", 20)  # a newer item wins over the requeued one
+    assert writer.pending() == [1, 20, 3]
+    writer.flush()
+    assert sink.batches == [[1, 20, 3]]
+    writer.close()
+
+
+def test_full_batch_wakes_the_writer():
+    sink = FlakySink()
+    writer = BatchWriter(sink.write, "test-writer", flush_interval=60, batch_size=2)
+    writer.put("a", 1)
+    writer.put("b", 2)
+    assert sink.written.wait(5)
+    assert sink.batches == [[1, 2]]
+    writer.close()
+
+
+def test_urls():
+    assert file_location("/relative.db", "x.db") == "relative.db"
+    assert file_location("//abs/path.db", "x.db") == "/abs/path.db"
+    assert file_location("", "x.db") == "x.db"
+    factories = {"memory": lambda location: ("memory", location)}
+    assert open_url("memory://", factories, "store") == ("memory", "")
+    with pytest.raises(ValueError, match="Unsupported store URL"):
+        open_url("redis://host", factories, "store")
+    with pytest.raises(ValueError):
+        open_url("memory", factories, "store")
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from data_adventure import cases
+from data_adventure.cases import (
+    CASE_GENERATORS,
+    case_key,
+    clear_case_cache,
+    generate_case,
+    load_case,
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    clear_case_cache()
+    yield
+    clear_case_cache()
+
+
+def test_load_case_shares_one_frame_per_key():
+    first = load_case("Outlier Detective", seed=1)
+    assert load_case("Outlier Detective", seed=1) is first
+    assert load_case("Outlier Detective", seed=2) is not first
+
+
+@pytest.mark.parametrize("case", list(CASE_GENERATORS))
+def test_same_seed_same_data(case):
+    a = generate_case(case, seed=7, rows=500)
+    b = generate_case(case, seed=7, rows=500)
+    assert len(a) == 500
+    assert a.equals(b)
+    assert not a.equals(generate_case(case, seed=8, rows=500))
+
+
+def test_generation_leaves_global_random_state_alone():
+    np.random.seed(0)
+    expected = np.random.random()
+    np.random.seed(0)
+    generate_case("Trend Analyzer", rows=100)
+    assert np.random.random() == expected
+
+
+def test_case_key_defaults_and_validation():
+    assert case_key("Trend Analyzer") == ("Trend Analyzer", cases.DEFAULT_SEED, 365)
+    with pytest.raises(KeyError):
+        case_key("No Such Case")
+    with pytest.raises(ValueError):
+        case_key("Trend Analyzer", rows=0)
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Small chunks so a few thousand rows cross several chunk boundaries
+    monkeypatch.setattr(cases, "CHUNK_ROWS", 1_000)
+
+
+def test_compact_dtypes():
+    df = generate_case("Outlier Detective", rows=1_000)
+    assert df["Amount"].dtype == np.float32
+    assert df["Hour"].dtype == np.int8
+    assert df["Category"].dtype == "category"
+    sales = generate_case("Missing Data", rows=1_000)["Sales"]
+    assert sales.dtype == np.float32
+
+
+def test_outlier_tail_spans_chunks(small_chunks):
+    amount = generate_case("Outlier Detective", rows=4_500)["Amount"].to_numpy()
+    tail = 4_500 // 20
+    assert ((amount[-tail:] >= 200) & (amount[-tail:] <= 300)).all()
+    assert amount[:-tail].mean() == pytest.approx(100, abs=2)
+
+
+def test_missing_values_in_every_chunk(small_chunks):
+    df = generate_case("Missing Data", rows=5_000)
+    missing = df["Sales"].isna().to_numpy().reshape(5, 1_000).mean(axis=1)
+    assert ((missing > 0.1) & (missing < 0.2)).all()
+    # Customers only go missing where Sales is missing
+    assert not (df["Customers"].isna() & df["Sales"].notna()).any()
+
+
+def test_large_cases_switch_to_finer_timestamps():
+    dates = generate_case("Trend Analyzer", rows=40_000)["Date"]
+    assert dates.is_monotonic_increasing
+    assert (dates.iloc[1] - dates.iloc[0]) == np.timedelta64(1, "h")
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from data_adventure.charts import (
+    MAX_LINE_POINTS,
+    cached_figure,
+    clear_figure_cache,
+    line_figure,
+    lttb_indices,
+    minmax_indices,
+)
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.sin(x / 500)
+    y[4_321] = 50.0
+    indices = lttb_indices(x, y, 200)
+    assert len(indices) == 200
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert (np.diff(indices) > 0).all()
+    assert 4_321 in indices
+
+
+def test_lttb_small_input_is_unchanged():
+    x = np.arange(10.0)
+    np.testing.assert_array_equal(lttb_indices(x, x, 50), np.arange(10))
+
+
+def test_minmax_keeps_each_bucket_extremes():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=10_003)  # a partial last bucket
+    indices = minmax_indices(y, 100)
+    assert (np.diff(indices) > 0).all()
+    assert len(indices) <= 2 * 101
+    assert y.argmin() in indices and y.argmax() in indices
+    assert y[indices].min() == y.min() and y[indices].max() == y.max()
+
+
+def test_minmax_small_input_is_unchanged():
+    np.testing.assert_array_equal(minmax_indices(np.arange(6.0), 3), np.arange(6))
+
+
+def test_line_figure_payload_is_bounded():
+    df = pd.DataFrame({"t": np.arange(50_000), "v": np.sin(np.arange(50_000) / 99)})
+    fig, note = line_figure(df, "t", "v")
+    assert len(fig.data[0].x) == MAX_LINE_POINTS
+    assert note.startswith(f"Showing {MAX_LINE_POINTS:,} of 50,000 points")
+
+
+def test_figures_are_built_once_per_spec():
+    clear_figure_cache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return line_figure(pd.DataFrame({"t": [0, 1], "v": [2, 3]}), "t", "v")
+
+    first = cached_figure(("line", "t", "v"), build)
+    assert cached_figure(("line", "t", "v"), build) is first
+    cached_figure(("line", "t", "v", "other"), build)
+    assert len(builds) == 2
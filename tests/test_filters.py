@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_adventure.filters import (
+    apply_filters,
+    build_mask,
+    clear_filter_cache,
+    isin_predicate,
+    normalize_predicates,
+    range_predicate,
+    select_rows,
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    clear_filter_cache()
+    yield
+    clear_filter_cache()
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "x": rng.normal(size=1_000).astype(np.float32),
+            "n": rng.integers(0, 10, 1_000),
+            "cat": pd.Categorical(rng.choice(["a", "b", "c"], 1_000)),
+        }
+    )
+
+
+def test_mask_matches_pandas_query(df):
+    predicates = [range_predicate("x", -0.5, 1.0), isin_predicate("cat", ["a", "c"])]
+    expected = df["x"].between(-0.5, 1.0) & df["cat"].isin(["a", "c"])
+    np.testing.assert_array_equal(build_mask(df, predicates), expected.to_numpy())
+    pd.testing.assert_frame_equal(apply_filters(df, predicates), df[expected])
+
+
+def test_filters_are_order_insensitive(df):
+    a, b = range_predicate("n", 2, 5), isin_predicate("cat", ["b"])
+    assert normalize_predicates([a, b]) == normalize_predicates([b, a])
+    first = select_rows(df, [a, b], dataset_key="k")
+    assert select_rows(df, [b, a], dataset_key="k") is first
+
+
+def test_positions_are_compact(df):
+    positions = select_rows(df, [range_predicate("n", 0, 4)])
+    assert positions.dtype == np.int32
+    np.testing.assert_array_equal(positions, np.flatnonzero(df["n"] <= 4))
+
+
+def test_no_predicates_returns_the_frame(df):
+    assert apply_filters(df, [], dataset_key="k") is df
+
+
+def test_unknown_predicate(df):
+    with pytest.raises(ValueError):
+        build_mask(df, [("regex", "cat", "a")])
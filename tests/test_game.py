@@ -0,0 +1,129 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_adventure import game
+from data_adventure.cases import memory_footprint
+from data_adventure.correlation import compute_correlation
+from data_adventure.filters import clear_filter_cache, range_predicate
+from data_adventure.imputation import compute_imputation, impute
+from data_adventure.outliers import compute_outliers
+from data_adventure.pagination import page_window
+from data_adventure.profile import clear_profile_cache, compute_profile, get_profile
+from data_adventure.timeseries import compute_trend
+
+
+@pytest.fixture(autouse=True)
+def _empty_caches():
+    clear_filter_cache()
+    clear_profile_cache()
+    yield
+    clear_filter_cache()
+    clear_profile_cache()
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    rows = 5_000
+    df = pd.DataFrame(
+        {
+            "Date": pd.date_range("2020-01-01", periods=rows, freq="D"),
+            "Sales": rng.normal(100, 20, rows).astype(np.float32),
+            "Units": rng.integers(0, 50, rows),
+            "Region": pd.Categorical(rng.choice(["N", "S", "E"], rows)),
+        }
+    )
+    df.loc[rng.choice(rows, 300, replace=False), "Sales"] = np.nan
+    return game.CaseData(("test", rows), df, get_profile(df, ("test", rows)))
+
+
+PREDICATES = [range_predicate("Units", 10, 30)]
+
+
+def test_filtered_view_keeps_positions_not_a_copy(data):
+    view = data.filtered(PREDICATES)
+    expected = data.df[data.df["Units"].between(10, 30)]
+    assert view.df is data.df
+    assert view.rows == len(expected)
+    np.testing.assert_array_equal(
+        view.positions, np.flatnonzero(data.df["Units"].between(10, 30))
+    )
+    pd.testing.assert_frame_equal(
+        view.frame(["Sales", "Region"]), expected[["Sales", "Region"]]
+    )
+    assert data.filtered([]) is data
+
+
+def test_profile_through_positions(data):
+    view = data.filtered(PREDICATES)
+    expected = compute_profile(view.frame())
+    assert view.profile.rows == expected.rows
+    pd.testing.assert_series_equal(view.profile.missing, expected.missing)
+    pd.testing.assert_frame_equal(view.profile.describe, expected.describe)
+    assert view.profile.category_values == expected.category_values
+
+
+def test_engines_through_positions(data):
+    view = data.filtered(PREDICATES)
+    rows = view.frame()
+    columns = ["Sales", "Units"]
+
+    report = compute_outliers(data.df, columns, positions=view.positions)
+    expected = compute_outliers(rows, columns)
+    pd.testing.assert_frame_equal(report.mask, expected.mask)
+    pd.testing.assert_frame_equal(
+        report.outlier_rows(data.df, "Sales", view.positions),
+        expected.outlier_rows(rows, "Sales"),
+    )
+
+    for mode in ["exact", "streaming"]:
+        pd.testing.assert_frame_equal(
+            compute_correlation(
+                data.df, columns, mode, positions=view.positions
+            ).matrix,
+            compute_correlation(rows, columns, mode).matrix,
+            atol=1e-9,
+        )
+    sampled = compute_correlation(data.df, columns, "sampled", 500, view.positions)
+    pd.testing.assert_frame_equal(
+        sampled.matrix, compute_correlation(rows, columns, "sampled", 500).matrix
+    )
+
+    window = page_window(data.df, 5, 15, "Sales", False, positions=view.positions)
+    pd.testing.assert_frame_equal(window, page_window(rows, 5, 15, "Sales", False))
+
+    trend = compute_trend(data.df, "Date", "Sales", view.positions)
+    expected = compute_trend(rows, "Date", "Sales").fit
+    np.testing.assert_array_equal(trend.fit.coefficients, expected.coefficients)
+
+
+@pytest.mark.parametrize("method", ["linear", "knn"])
+def test_imputation_through_positions(data, method):
+    view = data.filtered(PREDICATES)
+    result = impute(data.df, ["Sales"], method, positions=view.positions)
+    expected = compute_imputation(view.frame(), ["Sales"], method)
+    pd.testing.assert_frame_equal(result.frame, expected.frame)
+    pd.testing.assert_frame_equal(
+        result.preview(data.df, positions=view.positions),
+        expected.preview(view.frame()),
+    )
+
+
+def test_sessions_add_positions_not_frames():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(200_000, 10)), columns=list("abcdefghij"))
+    data = game.CaseData(("wide", 1), df, get_profile(df, ("wide", 1)))
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    views = [data.filtered([range_predicate("a", -3 + i / 10, 3)]) for i in range(20)]
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    positions = sum(view.positions.nbytes for view in views)
+    # Twenty filtered copies would take several frames; positions are 4 bytes a row
+    assert grown < positions + memory_footprint(df) / 4
+    assert all(view.df is df for view in views)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_adventure.imputation import (
+    clear_imputation_cache,
+    compute_imputation,
+    fill_backward,
+    fill_forward,
+    impute,
+    interpolate,
+)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    rows = 500
+    sales = rng.normal(100, 10, rows).astype(np.float32)
+    sales[rng.choice(rows, 60, replace=False)] = np.nan
+    return pd.DataFrame(
+        {
+            "Date": pd.date_range("2024-01-01", periods=rows, freq="D"),
+            "Sales": sales,
+            "Customers": rng.integers(0, 50, rows),
+            "Store": pd.Categorical(rng.choice(["a", "b", "c"], rows)),
+        }
+    )
+
+
+def test_fill_forward_carries_last_value():
+    values = np.array([np.nan, 1.0, np.nan, np.nan, 4.0, np.nan])
+    np.testing.assert_array_equal(
+        fill_forward(values), [np.nan, 1.0, 1.0, 1.0, 4.0, 4.0]
+    )
+
+
+def test_fill_forward_matches_pandas():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=10_000)
+    values[rng.random(10_000) < 0.4] = np.nan
+    np.testing.assert_array_equal(fill_forward(values), pd.Series(values).ffill())
+    np.testing.assert_array_equal(fill_backward(values), pd.Series(values).bfill())
+
+
+def test_fill_forward_all_missing():
+    assert np.isnan(fill_forward(np.full(4, np.nan))).all()
+
+
+def test_interpolate_keeps_edges_at_nearest_value():
+    values = np.array([np.nan, 1.0, np.nan, 3.0, np.nan])
+    filled = interpolate(values, np.arange(5.0))
+    np.testing.assert_array_equal(filled, [1.0, 1.0, 2.0, 3.0, 3.0])
+
+
+def test_group_mean_matches_pandas(df):
+    result = compute_imputation(df, ["Sales"], "group_mean", group_col="Store")
+    means = df.groupby("Store", observed=True)["Sales"].transform("mean")
+    pd.testing.assert_series_equal(result.frame["Sales"], df["Sales"].fillna(means))
+
+
+def test_time_interpolation_matches_pandas(df):
+    gappy = df.set_index("Date")["Sales"].astype(np.float64)
+    expected = gappy.interpolate(method="time").bfill().ffill()
+    result = compute_imputation(df, ["Sales"], "time", time_col="Date")
+    np.testing.assert_allclose(result.frame["Sales"], expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize("method", ["ffill", "linear", "knn"])
+def test_imputation_fills_and_keeps_dtype(df, method):
+    result = compute_imputation(df, ["Sales"], method)
+    assert result.frame["Sales"].dtype == np.float32
+    assert int(result.filled["Sales"]) == 60
+    assert int(result.remaining["Sales"]) == 0
+    np.testing.assert_array_equal(result.changed, np.flatnonzero(df["Sales"].isna()))
+    preview = result.preview(df, rows=5)
+    assert list(preview.columns) == ["Sales (before)", "Sales (after)"]
+    assert preview["Sales (before)"].isna().all()
+
+
+def test_group_methods_need_a_group(df):
+    with pytest.raises(ValueError):
+        compute_imputation(df, ["Sales"], "group_mean")
+    with pytest.raises(ValueError):
+        compute_imputation(df, ["Sales"], "spline")
+
+
+def test_results_cached_per_method(df):
+    clear_imputation_cache()
+    first = impute(df, ["Sales"], "ffill", dataset_key="k")
+    assert impute(df, ["Sales"], "ffill", dataset_key="k") is first
+    assert impute(df, ["Sales"], "bfill", dataset_key="k") is not first
+    clear_imputation_cache()
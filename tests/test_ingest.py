@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from data_adventure import ingest as ingest_module  # noqa: E402
+from data_adventure.ingest import (  # noqa: E402
+    IngestError,
+    clear_dataset_cache,
+    content_digest,
+    ingest,
+)
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_module, "DATA_DIR", str(tmp_path / "datasets"))
+    clear_dataset_cache()
+    yield
+    clear_dataset_cache()
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    rows = 5_000
+    value = rng.normal(50, 10, rows)
+    value[rng.choice(rows, 300, replace=False)] = np.nan
+    cat = rng.choice(["red", "green", "blue"], rows).astype(object)
+    cat[rng.choice(rows, 40, replace=False)] = None
+    return pd.DataFrame(
+        {
+            "n": rng.integers(-100, 100, rows),
+            "value": value,
+            "cat": cat,
+            "id": [f"row-{i}" for i in range(rows)],
+        }
+    )
+
+
+def _write(frame, path):
+    if path.suffix == ".csv":
+        frame.to_csv(path, index=False)
+    else:
+        frame.to_parquet(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_profile_matches_pandas(frame, tmp_path, suffix):
+    path = _write(frame, tmp_path / f"data{suffix}")
+    dataset = ingest(str(path), path.name)
+    profile = dataset.profile
+
+    assert profile.rows == len(frame)
+    assert profile.missing.to_dict() == frame.isna().sum().to_dict()
+    assert profile.category_values["cat"] == ["blue", "green", "red"]
+    assert dataset.df["n"].dtype == np.int8
+    assert dataset.df["cat"].dtype == "category"
+
+    expected = frame[["n", "value"]].describe()
+    pd.testing.assert_frame_equal(
+        profile.describe, expected, check_exact=False, rtol=1e-9
+    )
+
+
+def test_csv_and_parquet_profiles_agree(frame, tmp_path):
+    csv = ingest(str(_write(frame, tmp_path / "a.csv")), "a.csv").profile
+    parquet = ingest(str(_write(frame, tmp_path / "a.parquet")), "a.parquet").profile
+    pd.testing.assert_series_equal(csv.missing, parquet.missing)
+    assert csv.category_values == parquet.category_values
+    pd.testing.assert_frame_equal(csv.describe, parquet.describe)
+
+
+def test_quartiles_from_a_sample_on_big_files(frame, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_module, "QUANTILE_SAMPLE_ROWS", 1_000)
+    path = _write(frame, tmp_path / "data.parquet")
+    describe = ingest(str(path), path.name).profile.describe
+    expected = frame["value"].describe()
+    assert describe.loc["count", "value"] == expected["count"]
+    assert describe.loc["mean", "value"] == pytest.approx(expected["mean"])
+    assert describe.loc["50%", "value"] == pytest.approx(expected["50%"], abs=1.0)
+
+
+def test_same_content_is_ingested_once(frame, tmp_path):
+    path = _write(frame, tmp_path / "data.csv")
+    first = ingest(str(path), path.name)
+    with open(path, "rb") as f:
+        assert content_digest(f) == first.key[1]
+        assert ingest(f, "copy.csv") is first
+
+
+def test_bad_files(tmp_path):
+    with pytest.raises(IngestError):
+        ingest(str(tmp_path / "data.xlsx"), "data.xlsx")
+    empty = tmp_path / "empty.csv"
+    empty.write_text("a,b\n")
+    with pytest.raises(IngestError):
+        ingest(str(empty), "empty.csv")
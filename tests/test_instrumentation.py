@@ -0,0 +1,56 @@
+import json
+import threading
+
+import pytest
+
+from data_adventure.instrumentation import Recorder, is_admin
+
+
+@pytest.mark.parametrize(
+    "configured,token,allowed",
+    [
+        (None, "1", False),
+        ("", "", False),
+        ("s3cret", None, False),
+        ("s3cret", "1", False),
+        ("s3cret", "s3cret ", False),
+        ("s3cret", "s3cret", True),
+    ],
+)
+def test_admin_needs_the_configured_token(monkeypatch, configured, token, allowed):
+    if configured is None:
+        monkeypatch.delenv("DATA_ADVENTURE_ADMIN_TOKEN", raising=False)
+    else:
+        monkeypatch.setenv("DATA_ADVENTURE_ADMIN_TOKEN", configured)
+    assert is_admin(token) is allowed
+
+
+def test_reruns_are_logged(tmp_path):
+    path = tmp_path / "reruns.jsonl"
+    recorder = Recorder(enabled=True, log_path=str(path))
+    recorder.begin_rerun("s1", "data_lab")
+    with recorder.timed("data_lab.filters"):
+        pass
+    recorder.end_rerun()
+    (line,) = path.read_text().splitlines()
+    record = json.loads(line)
+    assert (record["session"], record["stage"]) == ("s1", "data_lab")
+    assert "data_lab.filters" in record["sections"]
+
+
+def test_slow_log_write_does_not_block_recording(tmp_path):
+    recorder = Recorder(enabled=True, log_path=str(tmp_path / "reruns.jsonl"))
+    # Another session stuck writing the log file
+    recorder._log_lock.acquire()
+    try:
+        done = threading.Event()
+
+        def report():
+            recorder.record("section", 0.1, "s2")
+            recorder.summary()
+            done.set()
+
+        threading.Thread(target=report, daemon=True).start()
+        assert done.wait(5)
+    finally:
+        recorder._log_lock.release()
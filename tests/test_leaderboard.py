@@ -0,0 +1,43 @@
+import pytest
+
+from data_adventure.leaderboard import MemoryLeaderboardStore, SQLiteLeaderboardStore
+
+
+def _entry(entry_id, name, score):
+    return {
+        "entry_id": entry_id,
+        "Name": name,
+        "Case": "Outlier Detective",
+        "Score": score,
+        "Level": 1,
+        "Achievements": 0,
+        "Completion_Date": "2024-01-01 00:00",
+    }
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = MemoryLeaderboardStore()
+    else:
+        store = SQLiteLeaderboardStore(str(tmp_path / "leaderboard.db"), read_ttl=0)
+    yield store
+    store.close()
+
+
+def test_resubmitted_entry_appears_once(store):
+    store.submit(_entry("p1:case", "Ada", 100))
+    store.submit(_entry("p1:case", "Ada", 150))
+    store.submit(_entry("p2:case", "Bob", 120))
+    assert [(e["Name"], e["Score"]) for e in store.top()] == [
+        ("Ada", 150),
+        ("Bob", 120),
+    ]
+
+
+def test_dedup_survives_flush(store):
+    store.submit(_entry("p1:case", "Ada", 100))
+    store.flush()
+    store.submit(_entry("p1:case", "Ada", 90))
+    store.flush()
+    assert [e["Score"] for e in store.top()] == [90]
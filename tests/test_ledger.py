@@ -0,0 +1,37 @@
+import sqlite3
+
+from data_adventure.ledger import EXPERIENCE_PER_LEVEL, Ledger, MemorySink, open_ledger
+from data_adventure.state import PlayerState
+
+
+def test_same_reason_is_awarded_once():
+    ledger = Ledger(MemorySink())
+    state = PlayerState()
+    first = ledger.record(state, "case:Outlier Detective", score=100, experience=30)
+    second = ledger.record(state, "case:Outlier Detective", score=100, experience=30)
+    assert first is not None and second is None
+    assert (state.score, state.experience) == (100, 30)
+    ledger.close()
+    assert [e.event_id for e in ledger.sink.events] == [first.event_id]
+    assert ledger.summary()["events"] == 1
+
+
+def test_level_up_carries_experience():
+    ledger = Ledger(MemorySink())
+    state = PlayerState()
+    event = ledger.record(state, "puzzle:a", experience=2 * EXPERIENCE_PER_LEVEL + 10)
+    assert (state.level, state.experience) == (3, 10)
+    assert event.level == 3
+    ledger.close()
+
+
+def test_sqlite_sink_stores_duplicate_batches_once(tmp_path):
+    path = tmp_path / "ledger.db"
+    ledger = open_ledger(f"sqlite:///{path}")
+    state = PlayerState()
+    event = ledger.record(state, "clue:Trend Analyzer", score=25)
+    ledger.flush()
+    ledger.sink.write([event])  # e.g. a batch retried after a timeout
+    ledger.close()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM events").fetchone() == (1,)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_adventure import outliers
+from data_adventure.outliers import compute_outliers, detect_outliers
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    amount = rng.normal(100, 20, 1_000).astype(np.float32)
+    amount[-50:] = rng.uniform(200, 300, 50)
+    amount[3] = np.nan
+    return pd.DataFrame({"Amount": amount, "Hour": rng.integers(0, 24, 1_000, np.int8)})
+
+
+def _iqr_reference(series, k=1.5):
+    # The per-column loop the Analysis Tools tab used to run
+    q1, q3 = series.quantile(0.25), series.quantile(0.75)
+    iqr = q3 - q1
+    return (series < q1 - k * iqr) | (series > q3 + k * iqr)
+
+
+def test_iqr_matches_per_column_reference(df):
+    report = compute_outliers(df, ["Amount", "Hour"])
+    for col in ["Amount", "Hour"]:
+        pd.testing.assert_series_equal(
+            report.mask[col], _iqr_reference(df[col]), check_names=False
+        )
+    assert report.counts["Amount"] >= 50
+    assert report.most_outliers[0] == "Amount"
+    assert not report.mask["Amount"].iloc[3]  # NaN is never an outlier
+
+
+@pytest.mark.parametrize("method", ["zscore", "mad"])
+def test_other_methods_flag_the_tail(method, df):
+    # A few extreme values: a 5% tail would inflate the standard deviation
+    df = df.iloc[:-40]
+    report = compute_outliers(df, ["Amount"], method=method)
+    assert report.mask["Amount"].iloc[-10:].all()
+    assert report.percentage["Amount"] < 3
+
+
+def test_outlier_rows(df):
+    report = compute_outliers(df, ["Amount"])
+    rows = report.outlier_rows(df, "Amount")
+    assert len(rows) == report.counts["Amount"]
+    assert set(df.index[-50:]) <= set(rows.index)
+
+
+def test_approximate_bounds_from_sample(monkeypatch, df):
+    monkeypatch.setattr(outliers, "SAMPLE_SIZE", 500)
+    report = compute_outliers(df, ["Amount"], approximate=True)
+    exact = compute_outliers(df, ["Amount"])
+    assert report.approximate and not exact.approximate
+    assert report.upper["Amount"] == pytest.approx(exact.upper["Amount"], rel=0.1)
+
+
+def test_report_shared_per_view(df):
+    outliers.clear_outlier_cache()
+    first = detect_outliers(df, ["Amount"], dataset_key="k")
+    assert detect_outliers(df, ["Amount"], dataset_key="k") is first
+
+
+def test_unknown_method(df):
+    with pytest.raises(ValueError):
+        compute_outliers(df, ["Amount"], method="percentile")
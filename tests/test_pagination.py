@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_adventure.pagination import (
+    clear_order_cache,
+    page_count,
+    page_window,
+    sort_order,
+)
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {"v": [3.0, np.nan, 1.0, 2.0, 1.0], "s": list("abcde")},
+        index=[10, 11, 12, 13, 14],
+    )
+
+
+def test_page_count():
+    assert page_count(0, 25) == 1
+    assert page_count(25, 25) == 1
+    assert page_count(26, 25) == 2
+
+
+def test_window_is_a_slice(df):
+    pd.testing.assert_frame_equal(page_window(df, 1, 3), df.iloc[1:3])
+    assert len(page_window(df, 3, 100)) == 2
+    assert page_window(df, -5, 1).index.tolist() == [10]
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_sorted_window_matches_sort_values(df, ascending):
+    expected = df.sort_values("v", ascending=ascending, kind="stable")
+    pd.testing.assert_frame_equal(
+        page_window(df, 0, 5, sort_by="v", ascending=ascending), expected
+    )
+    # Missing values sort last either way
+    assert np.isnan(page_window(df, 4, 5, sort_by="v", ascending=ascending)["v"]).all()
+
+
+def test_sort_order_cached_per_view(df):
+    clear_order_cache()
+    order = sort_order(df, "v", view="k")
+    assert sort_order(df, "v", view="k") is order
+    assert order.dtype == np.int32
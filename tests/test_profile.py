@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_adventure.profile import (
+    MAX_FILTER_CATEGORIES,
+    clear_profile_cache,
+    compute_profile,
+    get_profile,
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    clear_profile_cache()
+    yield
+    clear_profile_cache()
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {
+            "x": np.array([1.0, np.nan, 3.0, 4.0], dtype=np.float32),
+            "n": [5, 2, 9, 1],
+            "cat": pd.Categorical(["a", "b", "a", None], categories=["a", "b", "z"]),
+            "many": [f"v{i}" for i in range(4)],
+        }
+    )
+
+
+def test_profile_matches_pandas(df):
+    profile = compute_profile(df)
+    assert profile.rows == 4
+    assert profile.numeric_columns == ("x", "n")
+    assert profile.categorical_columns == ("cat", "many")
+    pd.testing.assert_series_equal(profile.missing, df.isna().sum())
+    pd.testing.assert_frame_equal(profile.describe, df.describe())
+    assert profile.minimum.to_dict() == {"x": 1.0, "n": 1.0}
+    assert profile.maximum.to_dict() == {"x": 4.0, "n": 9.0}
+    assert profile.total_missing == 2
+    assert profile.missing_percentage["x"] == 25.0
+
+
+def test_filter_options_only_list_present_categories(df):
+    values = compute_profile(df).category_values
+    assert values["cat"] == ["a", "b"]  # unused "z" and the missing value are left out
+    wide = pd.DataFrame({"c": [f"v{i}" for i in range(MAX_FILTER_CATEGORIES)]})
+    assert "c" not in compute_profile(wide).category_values
+
+
+def test_empty_frame(df):
+    profile = compute_profile(df.iloc[:0])
+    assert profile.rows == 0
+    assert profile.missing_percentage.eq(0).all()
+
+
+def test_profile_cached_per_view(df):
+    first = get_profile(df, dataset_key="k", predicates=[("range", "x", 0.0, 9.0)])
+    assert (
+        get_profile(df, dataset_key="k", predicates=[("range", "x", 0.0, 9.0)]) is first
+    )
+    assert get_profile(df, dataset_key="k") is not first
@@ -0,0 +1,49 @@
+import pytest
+
+from data_adventure.puzzles import (
+    PUZZLE_KINDS,
+    deal,
+    make_puzzle,
+    normalize_answer,
+    puzzle_bank,
+)
+
+
+@pytest.mark.parametrize(
+    "answer,decimals,expected",
+    [
+        ("  Hello   World! ", None, "hello world"),
+        ("MEAN.", None, "mean"),
+        ("25", 1, "25.0"),
+        (25, 1, "25.0"),
+        ("1,000", 0, "1000"),
+        ("3.14159", 2, "3.14"),
+        ("not a number", 1, "not a number"),
+    ],
+)
+def test_normalize_answer(answer, decimals, expected):
+    assert normalize_answer(answer, decimals) == expected
+
+
+def test_check_accepts_any_listed_form():
+    puzzle = make_puzzle("t", "text", "Q?", ["Median", "the median"])
+    assert puzzle.check("median")
+    assert puzzle.check(" The  Median. ")
+    assert not puzzle.check("mean")
+    assert puzzle.answer == "Median"
+
+
+def test_numeric_check_compares_rounded():
+    puzzle = make_puzzle("m", "math", "Q?", ["25"], decimals=1)
+    assert puzzle.check(25.0) and puzzle.check("25.04")
+    assert not puzzle.check("25.1")
+
+
+def test_bank_deal_is_stable_per_player():
+    bank = puzzle_bank()
+    assert len(bank)
+    dealt = deal("player-1", "Outlier Detective", "Expert", bank=bank)
+    assert set(dealt) == set(PUZZLE_KINDS) - {"data"}
+    assert dealt == deal("player-1", "Outlier Detective", "Expert", bank=bank)
+    for puzzle in dealt.values():
+        assert puzzle.check(puzzle.answer)
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from data_adventure.sidebar import achievements_html, inventory_html, sidebar_html
+from data_adventure.state import PlayerState
+
+
+def test_one_block_with_stats_inventory_and_achievements():
+    state = PlayerState(progress="data_lab", score=120, experience=40)
+    state.inventory = ["🔍 Magnifying Glass"]
+    state.add_achievement("Case chosen")
+    html = sidebar_html(state, now=state.start_time + timedelta(seconds=125))
+    assert html.startswith('<div class="game-sidebar">') and html.endswith("</div>")
+    assert "<b>120</b>" in html and "<b>40/100</b>" in html
+    assert 'style="width: 40%"' in html
+    assert "<b>2m 5s</b>" in html
+    assert "Magnifying Glass" in html and "Case chosen" in html
+
+
+def test_no_timer_during_character_setup():
+    assert "Time Elapsed" not in sidebar_html(PlayerState())
+
+
+def test_empty_sections_are_left_out():
+    assert inventory_html([]) == achievements_html(()) == ""
+
+
+def test_sections_are_escaped_and_reused():
+    first = achievements_html(["<script>"])
+    assert "&lt;script&gt;" in first and "<script>" not in first
+    assert achievements_html(("<script>",)) is first
@@ -0,0 +1,55 @@
+import gc
+
+import pytest
+
+from data_adventure.state import (
+    MAX_SAVED_ANALYSES,
+    PlayerState,
+    deep_sizeof,
+    memory_report,
+)
+
+
+def test_fixed_fields():
+    state = PlayerState(name="Ada", score=10)
+    assert (state.name, state.score, state.level) == ("Ada", 10, 1)
+    assert not hasattr(state, "__dict__")
+    with pytest.raises(AttributeError):
+        state.typo = 1
+
+
+def test_achievements_are_unique_and_ordered():
+    state = PlayerState()
+    assert state.add_achievement("First case")
+    assert state.add_achievement("Puzzle")
+    assert not state.add_achievement("First case")
+    assert state.achievements == ("First case", "Puzzle")
+    state.achievements = ["b", "a", "b"]
+    assert state.achievements == ("b", "a")
+
+
+def test_saved_analyses_are_bounded():
+    state = PlayerState()
+    for i in range(MAX_SAVED_ANALYSES + 5):
+        state.saved_analyses.append({"n": i})
+    assert len(state.saved_analyses) == MAX_SAVED_ANALYSES
+    assert state.saved_analyses[0] == {"n": 5}
+
+
+def test_memory_report_tracks_live_states():
+    state = PlayerState(name="Report me")
+    rows = [row for row in memory_report() if row["player"] == state.player_id]
+    assert rows[0]["name"] == "Report me"
+    assert rows[0]["bytes"] == state.nbytes()
+    player_id = state.player_id
+    del state, rows
+    gc.collect()
+    assert player_id not in {row["player"] for row in memory_report()}
+
+
+def test_deep_sizeof_counts_shared_objects_once():
+    item = "x" * 1000
+    assert deep_sizeof([item, item]) < deep_sizeof([item, "y" * 1000])
+    breakdown = PlayerState(inventory=[item]).memory_breakdown()
+    assert breakdown["inventory"] > 1000
+    assert "achievements" in breakdown
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_adventure.timeseries import (
+    compute_trend,
+    fit_trend,
+    regular_grid,
+    rolling_mean,
+    rolling_std,
+)
+
+
+def _values(rows=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    values = 1e5 + np.cumsum(rng.normal(0, 1, rows))
+    values[rng.choice(rows, 150, replace=False)] = np.nan
+    return values
+
+
+@pytest.mark.parametrize("window,min_periods", [(1, None), (7, None), (30, 10), (7, 1)])
+def test_rolling_mean_matches_pandas(window, min_periods):
+    values = _values()
+    expected = pd.Series(values).rolling(window, min_periods=min_periods).mean()
+    np.testing.assert_allclose(
+        rolling_mean(values, window, min_periods), expected, rtol=1e-9, equal_nan=True
+    )
+
+
+@pytest.mark.parametrize("window,min_periods", [(2, None), (7, None), (30, 10)])
+def test_rolling_std_matches_pandas(window, min_periods):
+    values = _values(seed=1)
+    expected = pd.Series(values).rolling(window, min_periods=min_periods).std()
+    # Differences of running sums of squares lose a few digits on ~1e5 values
+    np.testing.assert_allclose(
+        rolling_std(values, window, min_periods),
+        expected,
+        rtol=1e-6,
+        atol=1e-5,
+        equal_nan=True,
+    )
+
+
+def test_rolling_rejects_empty_window():
+    with pytest.raises(ValueError):
+        rolling_mean(np.arange(5.0), 0)
+
+
+def test_fit_trend_recovers_line():
+    x = np.arange(100, dtype=np.float64)
+    fit = fit_trend(x, 3.0 * x - 2.0)
+    assert fit.slope == pytest.approx(3.0)
+    assert fit.r_squared == pytest.approx(1.0)
+    np.testing.assert_allclose(fit.predict(np.array([200.0])), [598.0])
+
+
+def _seasonal_frame(days=4 * 365, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    return pd.DataFrame(
+        {
+            "Date": pd.date_range("2020-01-01", periods=days, freq="D"),
+            "Sales": 100
+            + 0.05 * t
+            + 10 * np.sin(2 * np.pi * t / 365)
+            + rng.normal(0, 3, days),
+            "Temperature": rng.normal(20, 10, days),
+        }
+    )
+
+
+def test_regular_grid_keeps_gaps():
+    times = pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-05"]).to_numpy()
+    grid = regular_grid(times, np.array([1.0, 2.0, 5.0]), pd.Timedelta(days=1))
+    np.testing.assert_array_equal(grid, [1.0, 2.0, np.nan, np.nan, 5.0])
+
+
+@pytest.mark.parametrize("low", [15, 25])
+def test_filtered_series_keeps_its_seasonal_strength(low):
+    df = _seasonal_frame()
+    full = compute_trend(df, "Date", "Sales")
+    # Filtering on an unrelated column leaves gaps all over the timeline
+    kept = np.flatnonzero(df["Temperature"].between(low, 40))
+    filtered = compute_trend(df, "Date", "Sales", kept)
+    assert full.season == filtered.season == "yearly"
+    assert full.decomposition.strength > 0.7
+    assert filtered.decomposition.strength == pytest.approx(
+        full.decomposition.strength, abs=0.1
+    )
+
+
+def test_sparse_series_is_not_decomposed():
+    df = _seasonal_frame()
+    # A few samples spread over years: the grid would be mostly gaps
+    kept = np.r_[np.arange(0, 40), np.arange(len(df) - 40, len(df))]
+    assert compute_trend(df, "Date", "Sales", kept).decomposition is None